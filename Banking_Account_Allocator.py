@@ -0,0 +1,120 @@
+import csv
+import os
+from datetime import datetime
+from Banking_File_Lock import FileLock, atomic_write
+
+"""
+`AccountNumberAllocator` class:
+   - This class hands out account numbers in the `YYMM` + 6 digit scheme from a sequence per month, kept in a small
+    `.sequence` file next to the user details. Every number is issued once, so no lookup or retry is needed.
+   - The very first allocation, while there is no `.sequence` file yet, scans the storage once for the numbers issued
+    randomly before the allocator existed. The suffixes of every month found are recorded in a bitmap file
+    (`.sequence.YYMM`, one bit per suffix) and skipped, so a sequence still starts at the lowest free suffix and the
+    month keeps every unused number. The `.sequence` file then marks that this cutover has happened: a month used for
+    the first time later starts at the first suffix without a scan.
+   - The sequence file is updated under its own `FileLock`, so several processes can allocate at the same time.
+   - `reserve(count)` takes a whole block of numbers in one update, for bulk account creation.
+"""
+
+FIRST_SUFFIX = 100000
+LAST_SUFFIX = 999999
+
+
+class AccountNumbersExhausted(Exception):
+    pass
+
+
+class AccountNumberAllocator:
+    def __init__(self, sequence_file, storage=None):
+        self.sequence_file = sequence_file
+        self.storage = storage
+        self.file_lock = FileLock(sequence_file)
+
+    def read_sequences(self):
+        sequences = {}
+        if os.path.exists(self.sequence_file):
+            with open(self.sequence_file, "r", newline="") as read_csv:
+                for record in csv.reader(read_csv):
+                    if len(record) == 2 and record[1].isdigit():
+                        sequences[record[0]] = int(record[1])
+        return sequences
+
+    def write_sequences(self, sequences):
+        with atomic_write(self.sequence_file) as temp_file:
+            writer = csv.writer(temp_file)
+            for month, next_suffix in sorted(sequences.items()):
+                writer.writerow([month, next_suffix])
+
+    def used_suffixes_file(self, month):
+        return f"{self.sequence_file}.{month}"
+
+    """
+    `used_suffixes(self)`: Scans the storage once and returns a bitmap of the suffixes already stored for every `YYMM`
+    month found in the account numbers.
+    """
+    def used_suffixes(self):
+        used = {}
+        if self.storage is None or not self.storage.exists():
+            return used
+        for row in self.storage.accounts():
+            account_number = row["ACCOUNTNUMBER"]
+            month, suffix = account_number[:4], account_number[4:]
+            if len(account_number) == 10 and account_number.isdigit() and FIRST_SUFFIX <= int(suffix) <= LAST_SUFFIX:
+                if month not in used:
+                    used[month] = bytearray((LAST_SUFFIX - FIRST_SUFFIX) // 8 + 1)
+                position = int(suffix) - FIRST_SUFFIX
+                used[month][position // 8] |= 1 << position % 8
+        return used
+
+    def read_used_suffixes(self, month):
+        try:
+            with open(self.used_suffixes_file(month), "rb") as read_bitmap:
+                return read_bitmap.read()
+        except FileNotFoundError:
+            return None
+
+    """
+    `free_suffixes(self, start, count, used)`: Returns up to `count` suffixes from `start` on whose bit is not set in the
+    `used` bitmap.
+    """
+    @staticmethod
+    def free_suffixes(start, count, used):
+        if used is None:
+            return list(range(start, min(start + count, LAST_SUFFIX + 1)))
+        suffixes = []
+        for suffix in range(start, LAST_SUFFIX + 1):
+            position = suffix - FIRST_SUFFIX
+            if not used[position // 8] >> position % 8 & 1:
+                suffixes.append(suffix)
+                if len(suffixes) == count:
+                    break
+        return suffixes
+
+    """
+    `reserve(self, count, month=None)`: Reserves the next `count` free account numbers of the month (`YYMM`, the current
+    month by default) and returns them as a list of strings.
+        - Raises `AccountNumbersExhausted` when the month has fewer than `count` numbers left.
+    """
+    def reserve(self, count, month=None):
+        if count <= 0:
+            return []
+        month = month or datetime.now().strftime("%y%m")
+        # Only the cutover scans the storage, before taking the sequence lock: a writer holding the storage lock may be
+        # waiting for it.
+        used = self.used_suffixes() if not os.path.exists(self.sequence_file) else None
+        with self.file_lock.exclusive():
+            if used is not None and not os.path.exists(self.sequence_file):
+                for used_month, bitmap in used.items():
+                    with atomic_write(self.used_suffixes_file(used_month)) as temp_file:
+                        temp_file.buffer.write(bitmap)
+            sequences = self.read_sequences()
+            start = sequences.get(month, FIRST_SUFFIX)
+            suffixes = self.free_suffixes(start, count, self.read_used_suffixes(month))
+            if len(suffixes) < count:
+                raise AccountNumbersExhausted(f"Only {len(suffixes)} account numbers are left for {month}")
+            sequences[month] = suffixes[-1] + 1
+            self.write_sequences(sequences)
+        return [f"{month}{suffix}" for suffix in suffixes]
+
+    def allocate(self, month=None):
+        return self.reserve(1, month)[0]
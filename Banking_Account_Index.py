@@ -0,0 +1,169 @@
+import contextlib
+import csv
+import os
+from Banking_Account_Records import AccountTable
+from Banking_Metrics import metrics
+
+"""
+`AccountIndex` class:
+   - This class keeps an in-memory index of the user details CSV file, keyed on `ACCOUNTNUMBER` and `PHONENUMBER`.
+   - The file is read once when it is first needed, after that every lookup is a dictionary access. The rows are held
+    in a columnar `AccountTable`, not one dictionary per row.
+   - The index remembers the modification time and size of the file, and reloads itself when another writer
+    changes the file behind it.
+   - When a `BalanceJournal` is given, its entries are replayed on top of the CSV rows while loading.
+   - When a `BalanceFile` is given and exists, its balances replace the `AMOUNT` column while loading.
+   - When a `FileLock` is given, the file and the journal are read under its shared lock, so a reload never sees a
+    write that is only half done.
+"""
+
+
+class AccountIndex:
+    def __init__(self, csv_file, journal=None, file_lock=None, balance_file=None):
+        self.csv_file = csv_file
+        self.journal = journal
+        self.balance_file = balance_file
+        self.file_lock = file_lock
+        self.fieldnames = []
+        self.table = AccountTable()
+        self.account_by_phone = {}
+        self.file_stamp = None
+
+    """
+    `file_signature(self)`: Returns the (mtime, size) pair of the CSV file, used to detect changes made outside the index.
+    """
+    def file_signature(self):
+        stat = os.stat(self.csv_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self.journal is not None:
+            signature += (self.journal.signature(),)
+        if self.balance_file is not None:
+            signature += (self.balance_file.signature(),)
+        return signature
+
+    """
+    `load(self)`: Reads the CSV file once and builds the account number and phone number lookups.
+    """
+    def load(self):
+        table = AccountTable()
+        account_by_phone = {}
+        with open(self.csv_file, "r") as read_csv:
+            reader = csv.DictReader(read_csv)
+            fieldnames = reader.fieldnames or []
+            for row in reader:
+                table.append(row)
+                account_by_phone[row["PHONENUMBER"]] = row["ACCOUNTNUMBER"]
+        if self.journal is not None:
+            phone_numbers = table.text_columns["PHONENUMBER"]
+            for account_number, column, value in self.journal.entries():
+                position = table.positions.get(account_number)
+                if position is None:
+                    continue
+                if column == "PHONENUMBER":
+                    account_by_phone.pop(phone_numbers[position], None)
+                    account_by_phone[value] = account_number
+                table.set_value(account_number, column, value)
+        if self.balance_file is not None and self.balance_file.exists():
+            for account_number, balance in self.balance_file.balances():
+                table.set_value(account_number, "AMOUNT", balance)
+        metrics.file_scanned(self.csv_file)
+        if self.journal is not None and metrics.enabled:
+            metrics.count("csv_bytes_read", self.journal.size())
+        self.fieldnames = list(fieldnames)
+        self.table = table
+        self.account_by_phone = account_by_phone
+        self.file_stamp = self.file_signature()
+
+    """
+    `refresh(self)`: Reloads the index when the file has never been read, or when its mtime or size has changed.
+    """
+    def refresh(self):
+        if self.file_stamp is None or self.file_signature() != self.file_stamp:
+            with self.file_lock.shared() if self.file_lock is not None else contextlib.nullcontext():
+                self.load()
+
+    """
+    `mark_synced(self)`: Records the current state of the file after the index has been updated for our own write.
+    """
+    def mark_synced(self):
+        if self.file_stamp is not None:
+            self.file_stamp = self.file_signature()
+
+    def has_account(self, account_number):
+        self.refresh()
+        return account_number in self.table
+
+    def get_row(self, account_number):
+        self.refresh()
+        return self.table.get_row(account_number)
+
+    def rows(self):
+        return self.table.rows()
+
+    def get_account_number(self, phone_number):
+        self.refresh()
+        return self.account_by_phone.get(phone_number)
+
+    """
+    `phone_numbers(self)`: Returns a set-like view of all phone numbers, so membership checks are O(1).
+    """
+    def phone_numbers(self):
+        self.refresh()
+        return self.account_by_phone.keys()
+
+    def get_fieldnames(self):
+        self.refresh()
+        return self.fieldnames
+
+    """
+    `update_row(self, account_number, column, value)`: Applies a single column change to the index after it was written
+    to the CSV file.
+    """
+    def update_row(self, account_number, column, value):
+        if self.file_stamp is None:
+            return
+        position = self.table.positions.get(account_number)
+        if position is not None:
+            value = str(value)
+            if column == "PHONENUMBER":
+                self.account_by_phone.pop(self.table.text_columns["PHONENUMBER"][position], None)
+                self.account_by_phone[value] = account_number
+            self.table.set_value(account_number, column, value)
+        self.mark_synced()
+
+    """
+    `update_balances(self, balances)`: Applies new balances of many accounts to the index after they were written.
+    """
+    def update_balances(self, balances):
+        if self.file_stamp is None:
+            return
+        self.table.set_balances(balances)
+        self.mark_synced()
+
+    """
+    `add_row(self, row)`: Adds a newly appended account to the index.
+    """
+    def add_row(self, row):
+        if self.file_stamp is None:
+            return
+        row = {key: str(value) for key, value in row.items()}
+        if not self.fieldnames:
+            self.fieldnames = list(row.keys())
+        self.table.append(row)
+        self.account_by_phone[row["PHONENUMBER"]] = row["ACCOUNTNUMBER"]
+        self.mark_synced()
+
+    """
+    `replace_rows(self, rows)`: Puts rows that were rewritten in the CSV file back into the index.
+    """
+    def replace_rows(self, rows):
+        if self.file_stamp is None:
+            return
+        phone_numbers = self.table.text_columns["PHONENUMBER"]
+        for row in rows:
+            position = self.table.positions.get(row["ACCOUNTNUMBER"])
+            if position is not None:
+                self.account_by_phone.pop(phone_numbers[position], None)
+            self.table.append(row)
+            self.account_by_phone[row["PHONENUMBER"]] = row["ACCOUNTNUMBER"]
+        self.mark_synced()
@@ -0,0 +1,245 @@
+import sys
+from array import array
+
+"""
+`AccountRecord` class:
+   - This class is one account with typed fields: the balance (`AMOUNT`) and the age are integers, the other columns
+    are strings. `__slots__` keeps each record to a fixed set of attributes, without a per-record dictionary.
+   - `from_row` and `to_row` convert from and to the CSV row dictionaries the storage backends use. An age that is not a
+    whole number is kept as the string it was stored as.
+"""
+
+# Attribute name of every CSV column, in `ACCOUNT_FIELDNAMES` order.
+RECORD_ATTRIBUTES = {
+    "ACCOUNTNUMBER": "account_number",
+    "FIRSTNAME": "first_name",
+    "LASTNAME": "last_name",
+    "DATE_OF_BIRTH": "date_of_birth",
+    "AGE": "age",
+    "GENDER": "gender",
+    "PROFESSION": "profession",
+    "PHONENUMBER": "phone_number",
+    "EMAIL": "email",
+    "AMOUNT": "amount",
+}
+ACCOUNT_FIELDNAMES = list(RECORD_ATTRIBUTES)
+CATEGORY_FIELDS = ("GENDER", "PROFESSION")
+TEXT_FIELDS = ("ACCOUNTNUMBER", "FIRSTNAME", "LASTNAME", "DATE_OF_BIRTH", "PHONENUMBER", "EMAIL")
+# Text columns whose values often repeat between customers, one string object is shared by all equal values.
+SHARED_TEXT_FIELDS = ("FIRSTNAME", "LASTNAME", "DATE_OF_BIRTH")
+
+
+class MalformedBalanceError(ValueError):
+    pass
+
+
+# Largest age the `array("H")` age column holds.
+MAXIMUM_AGE = 0xFFFF
+
+
+"""
+`to_age(value)`: Converts a stored `AGE` to an integer, or returns None when it is not a whole number the age column
+can hold. Such a value is kept as its string rather than being read as 0.
+"""
+
+
+def to_age(value):
+    value = str(value).strip()
+    return int(value) if value.isdigit() and int(value) <= MAXIMUM_AGE else None
+
+
+"""
+`to_balance(value, account_number="")`: Converts a stored `AMOUNT` to an integer. A value that is not a whole number
+raises `MalformedBalanceError` instead of being read as 0, which the next deposit would then store as the balance.
+"""
+
+
+def to_balance(value, account_number=""):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise MalformedBalanceError(f"Malformed AMOUNT {value!r} stored for account {account_number}") from None
+
+
+class AccountRecord:
+    __slots__ = tuple(RECORD_ATTRIBUTES.values())
+
+    def __init__(self, account_number, first_name, last_name, date_of_birth, age, gender, profession, phone_number,
+                 email, amount):
+        self.account_number = account_number
+        self.first_name = first_name
+        self.last_name = last_name
+        self.date_of_birth = date_of_birth
+        self.age = age
+        self.gender = gender
+        self.profession = profession
+        self.phone_number = phone_number
+        self.email = email
+        self.amount = amount
+
+    @classmethod
+    def from_row(cls, row):
+        values = {attribute: str(row.get(field, "")) for field, attribute in RECORD_ATTRIBUTES.items()}
+        age = to_age(values["age"])
+        values["age"] = age if age is not None else values["age"]
+        values["amount"] = to_balance(values["amount"], values["account_number"])
+        return cls(**values)
+
+    def to_row(self):
+        return {field: str(getattr(self, attribute)) for field, attribute in RECORD_ATTRIBUTES.items()}
+
+    def __repr__(self):
+        return f"AccountRecord({self.account_number!r}, amount={self.amount})"
+
+
+"""
+`CategoryColumn` class:
+   - A dictionary-encoded column for values that repeat in many rows, such as `GENDER` and `PROFESSION`. Every distinct
+    value is stored once, each row only keeps its small integer code in an `array`.
+"""
+
+
+class CategoryColumn:
+    def __init__(self):
+        self.values = []
+        self.codes_by_value = {}
+        self.codes = array("I")
+
+    def encode(self, value):
+        code = self.codes_by_value.get(value)
+        if code is None:
+            code = self.codes_by_value[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self.encode(value))
+
+    def __getitem__(self, position):
+        return self.values[self.codes[position]]
+
+    def __setitem__(self, position, value):
+        self.codes[position] = self.encode(value)
+
+
+"""
+`AccountTable` class:
+   - This class holds the whole customer set column by column: balances and ages in integer `array`s, `GENDER` and
+    `PROFESSION` as `CategoryColumn`s and the remaining columns as lists of strings, with a dictionary from account
+    number to row position.
+   - Compared with one `csv.DictReader` dictionary per row this drops the per-row dictionaries and the repeated
+    category strings, and the balances can be scanned (or handed to NumPy with `numpy.frombuffer`) as one block.
+   - First names, last names and dates of birth are interned, so a repeated value is stored once.
+   - `get_row` and `rows` still hand out row dictionaries of strings, so the storage interface stays the same, and
+    `get_record` an `AccountRecord`. Columns other than `ACCOUNT_FIELDNAMES` are kept per row in a side dictionary.
+   - A balance that is not a whole number raises `MalformedBalanceError` while loading, rather than being read as 0. An
+    age that is not one is kept as its string in the side dictionary, so the next rewrite stores it unchanged.
+"""
+
+
+class AccountTable:
+    def __init__(self):
+        self.text_columns = {field: [] for field in TEXT_FIELDS}
+        self.category_columns = {field: CategoryColumn() for field in CATEGORY_FIELDS}
+        self.balances = array("q")
+        self.ages = array("H")
+        self.integer_columns = {"AMOUNT": self.balances, "AGE": self.ages}
+        self.positions = {}
+        self.extra_columns = {}
+
+    def __len__(self):
+        return len(self.balances)
+
+    def __contains__(self, account_number):
+        return account_number in self.positions
+
+    def append(self, row):
+        account_number = str(row["ACCOUNTNUMBER"])
+        if account_number in self.positions:
+            self.update(account_number, row)
+            return
+        self.positions[account_number] = len(self.balances)
+        for field, column in self.text_columns.items():
+            value = str(row.get(field, ""))
+            column.append(sys.intern(value) if field in SHARED_TEXT_FIELDS else value)
+        for field, column in self.category_columns.items():
+            column.append(str(row.get(field, "")))
+        self.ages.append(0)
+        self.balances.append(to_balance(row.get("AMOUNT", ""), account_number))
+        self.set_age(len(self.balances) - 1, row.get("AGE", ""))
+        extra = {key: str(value) for key, value in row.items() if key not in ACCOUNT_FIELDNAMES and key is not None}
+        if extra:
+            self.extra_columns.setdefault(len(self.balances) - 1, {}).update(extra)
+
+    def set_age(self, position, value):
+        age = to_age(value)
+        if age is not None:
+            self.ages[position] = age
+            self.extra_columns.get(position, {}).pop("AGE", None)
+        else:
+            self.ages[position] = 0
+            self.extra_columns.setdefault(position, {})["AGE"] = str(value)
+
+    def set_value(self, account_number, column, value):
+        position = self.positions.get(account_number)
+        if position is None:
+            return False
+        if column in self.text_columns:
+            value = str(value)
+            self.text_columns[column][position] = sys.intern(value) if column in SHARED_TEXT_FIELDS else value
+        elif column in self.category_columns:
+            self.category_columns[column][position] = str(value)
+        elif column == "AGE":
+            self.set_age(position, value)
+        elif column == "AMOUNT":
+            self.balances[position] = to_balance(value, account_number)
+        else:
+            self.extra_columns.setdefault(position, {})[column] = str(value)
+        return True
+
+    def update(self, account_number, row):
+        for column, value in row.items():
+            if column is not None and column != "ACCOUNTNUMBER":
+                self.set_value(account_number, column, value)
+
+    def row_at(self, position):
+        row = {}
+        for field in ACCOUNT_FIELDNAMES:
+            if field in self.text_columns:
+                row[field] = self.text_columns[field][position]
+            elif field in self.category_columns:
+                row[field] = self.category_columns[field][position]
+            else:
+                row[field] = str(self.integer_columns[field][position])
+        row.update(self.extra_columns.get(position, ()))
+        return row
+
+    def get_row(self, account_number):
+        position = self.positions.get(account_number)
+        return self.row_at(position) if position is not None else None
+
+    def get_record(self, account_number):
+        position = self.positions.get(account_number)
+        if position is None:
+            return None
+        text, category = self.text_columns, self.category_columns
+        age = self.extra_columns.get(position, {}).get("AGE", self.ages[position])
+        return AccountRecord(
+            text["ACCOUNTNUMBER"][position], text["FIRSTNAME"][position], text["LASTNAME"][position],
+            text["DATE_OF_BIRTH"][position], age, category["GENDER"][position], category["PROFESSION"][position],
+            text["PHONENUMBER"][position], text["EMAIL"][position], self.balances[position],
+        )
+
+    def get_balance(self, account_number):
+        position = self.positions.get(account_number)
+        return self.balances[position] if position is not None else None
+
+    def set_balances(self, balances):
+        for account_number, balance in balances.items():
+            position = self.positions.get(account_number)
+            if position is not None:
+                self.balances[position] = to_balance(balance, account_number)
+
+    def rows(self):
+        for position in range(len(self.balances)):
+            yield self.row_at(position)
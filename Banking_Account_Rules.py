@@ -0,0 +1,70 @@
+import re
+from datetime import date, datetime
+
+"""
+Account rules:
+   - These are the checks `validate` applies to the account creation and edit fields, kept in one place so the menu and
+    `BankingApi` accept exactly the same values.
+   - Each check returns the message the menu prints when the value is rejected, or `None` when the value is valid.
+"""
+
+MINIMUM_AGE = 18
+MAXIMUM_AGE = 130
+MINIMUM_OPENING_DEPOSIT = 500
+
+NAME_PATTERN = re.compile(r"^[a-zA-Z\s]+$")
+PHONE_NUMBER_PATTERN = re.compile(r"^\d{10}$")  # Assuming a 10-digit phone number format
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z]+[a-zA-Z0-9]*@[a-zA-Z]+\.[a-zA-Z]{2,3}$")
+DATE_OF_BIRTH_PATTERN = re.compile(r"^\d{4}-\d{1,2}-\d{1,2}$")
+
+NAME_FIELDS = ("FIRSTNAME", "LASTNAME", "PROFESSION")
+# Fields the account holder can change from the Edit Account menu.
+EDITABLE_FIELDS = ("FIRSTNAME", "LASTNAME", "DATE_OF_BIRTH", "GENDER", "PROFESSION", "PHONENUMBER", "EMAIL")
+# The options of the menu's gender selection, the only genders an account can have.
+GENDERS = ("Male", "Female", "Transgender", "Not mention")
+
+
+def calculate_age(dob):
+    born = datetime.strptime(dob, "%Y-%m-%d")
+    today = date.today()
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def age_error(age):
+    age = str(age)
+    if not age.isdigit() or int(age) > MAXIMUM_AGE:
+        return "Please input the valid Age"
+    if int(age) < MINIMUM_AGE:
+        return f"Sorry! your age must be greater than {MINIMUM_AGE} to create an account "
+    return None
+
+
+def field_error(key, value):
+    value = str(value)
+    if key == "AGE":
+        return age_error(value)
+    elif key == "AMOUNT":
+        if not value.isdigit() or int(value) < MINIMUM_OPENING_DEPOSIT:
+            return f"Minimum deposit amount will be {MINIMUM_OPENING_DEPOSIT} or more"
+    elif key == "PHONENUMBER":
+        if not PHONE_NUMBER_PATTERN.match(value):
+            return "Please enter only a 10-digit phone number"
+    elif key == "EMAIL":
+        if not EMAIL_PATTERN.match(value):
+            return "Email address must contain A-Z, a-z, @, . are Mandatory"
+    elif key == "DATE_OF_BIRTH":
+        if not DATE_OF_BIRTH_PATTERN.match(value):
+            return "Enter the Date of Birth in mention format."
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            return "Enter the Date of Birth in mention format."
+    elif key == "GENDER":
+        if value not in GENDERS:
+            return f"Invalid GENDER. Please select one of {', '.join(GENDERS)}."
+    elif key in NAME_FIELDS:
+        if not NAME_PATTERN.match(value):
+            return f"Invalid {key}. Please enter a valid value."
+    else:
+        return "Keyword not matched.."
+    return None
@@ -0,0 +1,90 @@
+import calendar
+import datetime
+from collections import namedtuple
+import numpy as np
+from Banking_Loan_Rules import MAXIMUM_LOAN_TERM, MINIMUM_LOAN_AMOUNT, MINIMUM_LOAN_TERM
+
+"""
+`AmortizationSchedule` class:
+   - This class computes the whole EMI schedule of a loan at once with NumPy, instead of one month at a time.
+   - The outstanding balance follows the same recurrence as the original month-by-month loop, run as a single
+    cumulative `accumulate`, so every column is bit-for-bit identical to the values the loop produced.
+   - The interest, principal and balance columns are then derived from the balances with array operations, and the
+    `Month - Year` labels are generated in bulk from `numpy.datetime64` days.
+"""
+
+MONTH_ABBREVIATIONS = np.array(calendar.month_abbr[1:])
+
+# Interest rate slabs used by the Student, SeniorCitizen and GeneralCitizen loans.
+INTEREST_RATE_SLABS = (6, 8, 10, 12, 14)
+
+EmiQuotes = namedtuple("EmiQuotes", ["monthly_emi", "amount_payable", "total_interest"])
+
+
+def monthly_emi(loanRequired, interest, loanTerm):
+    roi = interest / 12 / 100
+    totalMonths = loanTerm * 12
+    ci = (1 + interest / 12 / 100) ** totalMonths
+    return loanRequired * roi * ci / (ci - 1)
+
+
+class AmortizationSchedule:
+    def __init__(self, loanRequired, interest, loanTerm):
+        self.loan_amount = loanRequired
+        self.interest_rate = interest
+        self.loan_term = loanTerm
+        self.total_months = loanTerm * 12
+        roi = interest / 12 / 100
+        self.monthly_emi = monthly_emi(loanRequired, interest, loanTerm)
+        self.amount_payable = self.monthly_emi * self.total_months
+        self.total_interest = self.amount_payable - loanRequired
+
+        emi = self.monthly_emi
+        step = np.frompyfunc(lambda balance, _: balance - (emi - balance * roi), 2, 1)
+        seed = np.empty(self.total_months + 1, dtype=object)
+        seed[0] = float(loanRequired)
+        balances = step.accumulate(seed).astype(np.float64)
+
+        self.interest_components = balances[:-1] * roi
+        self.principal_components = emi - self.interest_components
+        self.remaining_principal = balances[:-1] - self.principal_components
+
+    """
+    `month_labels(self, start_date)`: Returns the `%b-%Y` label of every row, stepping 30 days per month from the start date.
+    """
+    def month_labels(self, start_date):
+        if isinstance(start_date, datetime.datetime):
+            start_date = start_date.date()
+        days = np.datetime64(start_date, "D") + 30 * np.arange(self.total_months)
+        months = days.astype("datetime64[M]").astype(np.int64)
+        years = (months // 12 + 1970).astype(str)
+        return np.char.add(np.char.add(MONTH_ABBREVIATIONS[months % 12], "-"), years).tolist()
+
+
+"""
+`quote_emi_grid(loan_amounts, loan_terms, interest_rates)`: Quotes every combination of loan amount, term (years) and
+annual interest rate in one vectorized call.
+    - Returns `EmiQuotes` arrays of shape (len(loan_amounts), len(loan_terms), len(interest_rates)), computed with the
+    same formula as `monthly_emi`. A rate of 0 is quoted as the loan amount spread evenly over the term.
+    - Raises `ValueError` when a term is outside 1-30 years, an amount is below 1 lakh or a rate is negative.
+"""
+
+
+def quote_emi_grid(loan_amounts, loan_terms, interest_rates):
+    amounts = np.asarray(loan_amounts, dtype=np.float64).reshape(-1, 1, 1)
+    terms = np.asarray(loan_terms, dtype=np.int64).reshape(1, -1, 1)
+    rates = np.asarray(interest_rates, dtype=np.float64).reshape(1, 1, -1)
+    if np.any(terms < MINIMUM_LOAN_TERM) or np.any(terms > MAXIMUM_LOAN_TERM):
+        raise ValueError(f"Loan terms must be between {MINIMUM_LOAN_TERM} and {MAXIMUM_LOAN_TERM} years.")
+    if np.any(amounts < MINIMUM_LOAN_AMOUNT):
+        raise ValueError("Minimum loan amount should be 1 lakh.")
+    if np.any(rates < 0):
+        raise ValueError("Interest rates must not be negative.")
+
+    roi = rates / 12 / 100
+    totalMonths = terms * 12
+    ci = (1 + rates / 12 / 100) ** totalMonths
+    with np.errstate(divide="ignore", invalid="ignore"):
+        monthly = np.where(roi > 0, amounts * roi * ci / (ci - 1), amounts / totalMonths)
+    amount_payable = monthly * totalMonths
+    return EmiQuotes(monthly, amount_payable, amount_payable - amounts)
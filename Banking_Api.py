@@ -0,0 +1,246 @@
+from collections import namedtuple
+from datetime import datetime
+from Banking_Account_Allocator import AccountNumberAllocator
+from Banking_Account_Rules import EDITABLE_FIELDS, calculate_age, field_error
+from Banking_Loan_Rules import (MAXIMUM_LOAN_TERM, MINIMUM_LOAN_AGE, MINIMUM_LOAN_AMOUNT, MINIMUM_LOAN_TERM,
+                               loan_interest_rate)
+from Banking_Ledger import Ledger, Posting
+from Banking_Metrics import instrument
+from Banking_Storage import ACCOUNT_FIELDNAMES
+from Banking_Transaction_Rules import deposit_error, transfer_error, withdrawal_error
+
+"""
+`BankingApi` class:
+   - This class is the headless side of the E-con Banking System: every operation takes its values as arguments and
+    returns a result, nothing is read from `input()` or printed.
+   - Values are checked with the same rules as the menu (`Banking_Account_Rules`, `Banking_Transaction_Rules` and
+    `Banking_Loan_Rules`). A rejected value raises a `BankingError` whose message is the one the menu prints.
+   - A phone number can only belong to one account, as in bulk onboarding, and an account number given to
+    `create_account` must not be in use yet. Both raise `DuplicateAccountError`.
+   - The interactive `BankingSystem` menu only collects input and prints results, all its operations go through here.
+   - Every change of a balance is also posted to the `Ledger`, under the same write lock, so `statement` can list the
+    transactions of an account.
+"""
+
+AccountDetails = namedtuple("AccountDetails", ACCOUNT_FIELDNAMES)
+TransactionResult = namedtuple("TransactionResult", ["account_number", "amount", "previous_balance", "balance"])
+TransferResult = namedtuple("TransferResult", ["from_account", "to_account", "amount", "from_balance", "to_balance"])
+EmiQuote = namedtuple("EmiQuote", ["interest_rate", "monthly_emi", "amount_payable", "total_interest"])
+
+
+class BankingError(Exception):
+    pass
+
+
+class ValidationError(BankingError):
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
+
+
+class AccountNotFoundError(BankingError):
+    pass
+
+
+class TransactionRuleError(BankingError):
+    pass
+
+
+class DuplicateAccountError(BankingError):
+    pass
+
+
+class BankingApi:
+    def __init__(self, storage, allocator=None, ledger=None):
+        self.storage = storage
+        self.allocator = allocator or AccountNumberAllocator(storage.sidecar_file(".sequence"), storage)
+        self.ledger = ledger or Ledger(storage.sidecar_file(".ledger"))
+
+    @staticmethod
+    def check_field(key, value):
+        error = field_error(key, value)
+        if error is not None:
+            raise ValidationError(key, error)
+        return str(value)
+
+    """
+    `check_phone_number_free(self, phone_number, account_number=None)`: Raises `DuplicateAccountError` when the phone
+    number is registered to an account other than `account_number`. Called under the storage's write lock.
+    """
+    def check_phone_number_free(self, phone_number, account_number=None):
+        registered = self.storage.get_account_number(phone_number) if self.storage.exists() else None
+        if registered is not None and registered != account_number:
+            raise DuplicateAccountError("Phone Number already registered")
+
+    @staticmethod
+    def check_amount(amount):
+        if isinstance(amount, bool) or not isinstance(amount, int):
+            raise ValidationError("AMOUNT", "Amount must be a whole number")
+        return amount
+
+    """
+    `new_account_number(self)`: Returns the next unused account number, the current `YYMM` followed by six digits, from
+    the `AccountNumberAllocator`.
+    """
+    def new_account_number(self):
+        return self.allocator.allocate()
+
+    """
+    `get_account(self, account_number)`: Returns the `AccountDetails` of an account, or raises `AccountNotFoundError`.
+    """
+    @instrument("get_account")
+    def get_account(self, account_number):
+        account_number = str(account_number)
+        row = self.storage.get_account(account_number) if self.storage.exists() else None
+        if row is None:
+            raise AccountNotFoundError(f"Account Number {account_number} doesn't exist")
+        return AccountDetails(**{field: row.get(field, "") for field in ACCOUNT_FIELDNAMES})
+
+    @instrument("get_account_by_phone")
+    def get_account_by_phone(self, phone_number):
+        phone_number = str(phone_number)
+        account_number = self.storage.get_account_number(phone_number) if self.storage.exists() else None
+        if account_number is None:
+            raise AccountNotFoundError("Phone Number doesn't exist!")
+        return self.get_account(account_number)
+
+    @instrument("get_balance")
+    def get_balance(self, account_number):
+        account_number = str(account_number)
+        balance = self.storage.get_balance(account_number) if self.storage.exists() else None
+        if balance is None:
+            raise AccountNotFoundError(f"Account Number {account_number} doesn't exist")
+        return balance
+
+    """
+    `create_account(self, first_name, last_name, date_of_birth, gender, profession, phone_number, email, amount,
+    account_number=None)`: Validates the details, stores the new account and returns its `AccountDetails`.
+        - The age is calculated from the date of birth, and a new account number is generated unless one is given.
+    """
+    @instrument("create_account")
+    def create_account(self, first_name, last_name, date_of_birth, gender, profession, phone_number, email, amount,
+                       account_number=None):
+        row = {
+            "FIRSTNAME": self.check_field("FIRSTNAME", first_name),
+            "LASTNAME": self.check_field("LASTNAME", last_name),
+            "DATE_OF_BIRTH": self.check_field("DATE_OF_BIRTH", date_of_birth),
+            "GENDER": self.check_field("GENDER", gender),
+            "PROFESSION": self.check_field("PROFESSION", profession),
+            "PHONENUMBER": self.check_field("PHONENUMBER", phone_number),
+            "EMAIL": self.check_field("EMAIL", email),
+            "AMOUNT": self.check_field("AMOUNT", amount),
+        }
+        row["AGE"] = self.check_field("AGE", calculate_age(row["DATE_OF_BIRTH"]))
+        with self.storage.write_lock():
+            self.check_phone_number_free(row["PHONENUMBER"])
+            if account_number and self.storage.exists() and self.storage.has_account(str(account_number)):
+                raise DuplicateAccountError(f"Account Number {account_number} already exists")
+            row["ACCOUNTNUMBER"] = str(account_number) if account_number else self.new_account_number()
+            account = AccountDetails(**row)
+            file_exists = self.storage.exists()
+            self.storage.add_account(account._asdict(), ACCOUNT_FIELDNAMES, write_header=not file_exists)
+            self.ledger.append([Posting(account.ACCOUNTNUMBER, "OPENING", int(account.AMOUNT), int(account.AMOUNT))])
+        return account
+
+    """
+    `edit_field(self, account_number, field, value)`: Validates and stores a new value for one of the `EDITABLE_FIELDS`
+    and returns the updated `AccountDetails`.
+    """
+    @instrument("edit_field")
+    def edit_field(self, account_number, field, value):
+        if field not in EDITABLE_FIELDS:
+            raise ValidationError(field, "Invalid field selected")
+        value = self.check_field(field, value)
+        with self.storage.write_lock():
+            account = self.get_account(account_number)
+            if field == "PHONENUMBER":
+                self.check_phone_number_free(value, account.ACCOUNTNUMBER)
+            self.storage.update_field(account.ACCOUNTNUMBER, field, value)
+        return account._replace(**{field: value})
+
+    @instrument("deposit")
+    def deposit(self, account_number, amount):
+        amount = self.check_amount(amount)
+        # The balance is read and written under the storage's write lock, so concurrent tellers cannot lose an update.
+        with self.storage.write_lock():
+            balance = self.get_balance(account_number)
+            error = deposit_error(balance, amount)
+            if error is not None:
+                raise TransactionRuleError(error)
+            self.storage.update_field(str(account_number), "AMOUNT", balance + amount)
+            self.ledger.append([Posting(account_number, "DEPOSIT", amount, balance + amount)])
+        return TransactionResult(str(account_number), amount, balance, balance + amount)
+
+    @instrument("withdraw")
+    def withdraw(self, account_number, amount):
+        amount = self.check_amount(amount)
+        with self.storage.write_lock():
+            balance = self.get_balance(account_number)
+            error = withdrawal_error(balance, amount)
+            if error is not None:
+                raise TransactionRuleError(error)
+            self.storage.update_field(str(account_number), "AMOUNT", balance - amount)
+            self.ledger.append([Posting(account_number, "WITHDRAW", amount, balance - amount)])
+        return TransactionResult(str(account_number), amount, balance, balance - amount)
+
+    """
+    `transfer(self, from_account, to_account, amount)`: Moves money from one account to another and returns the
+    `TransferResult` with both new balances.
+        - The sending account keeps the minimum balance, as for a withdrawal, and both balances are stored with one
+        `update_balances` write.
+    """
+    @instrument("transfer")
+    def transfer(self, from_account, to_account, amount):
+        amount = self.check_amount(amount)
+        from_account, to_account = str(from_account), str(to_account)
+        if from_account == to_account:
+            raise ValidationError("ACCOUNTNUMBER", "Cannot transfer money to the same account")
+        with self.storage.write_lock():
+            from_balance = self.get_balance(from_account)
+            to_balance = self.get_balance(to_account)
+            error = transfer_error(from_balance, amount) or deposit_error(to_balance, amount)
+            if error is not None:
+                raise TransactionRuleError(error)
+            self.storage.update_balances({from_account: from_balance - amount, to_account: to_balance + amount})
+            self.ledger.append([
+                Posting(from_account, "TRANSFER_OUT", amount, from_balance - amount, to_account),
+                Posting(to_account, "TRANSFER_IN", amount, to_balance + amount, from_account),
+            ])
+        return TransferResult(from_account, to_account, amount, from_balance - amount, to_balance + amount)
+
+    """
+    `statement(self, account_number, start_date=None, end_date=None)`: Returns the `LedgerEntry`s of an account from
+    `start_date` to `end_date` (`YYYY-MM-DD`, both included), oldest first. A missing date leaves that end open.
+    """
+    @instrument("statement")
+    def statement(self, account_number, start_date=None, end_date=None):
+        account_number = str(account_number)
+        dates = []
+        for field, value in (("START_DATE", start_date), ("END_DATE", end_date)):
+            try:
+                dates.append(datetime.strptime(value, "%Y-%m-%d").date() if value else None)
+            except ValueError:
+                raise ValidationError(field, "Please enter the date as YYYY-MM-DD")
+        if not (self.storage.exists() and self.storage.has_account(account_number)):
+            raise AccountNotFoundError(f"Account Number {account_number} doesn't exist")
+        return self.ledger.statement(account_number, *dates)
+
+    """
+    `quote_emi(self, age, loan_amount, loan_term)`: Returns the `EmiQuote` of a loan at the rate the EMI screens would
+    give for the age and term (years).
+    """
+    @instrument("quote_emi")
+    def quote_emi(self, age, loan_amount, loan_term):
+        if int(age) < MINIMUM_LOAN_AGE:
+            raise ValidationError("AGE", f"You must be {MINIMUM_LOAN_AGE}+ to take a loan.")
+        if not MINIMUM_LOAN_TERM <= int(loan_term) <= MAXIMUM_LOAN_TERM:
+            raise ValidationError("LOANTERM", "Please Enter the loan term in years like (1,3,5,12) etc.")
+        if int(loan_amount) < MINIMUM_LOAN_AMOUNT:
+            raise ValidationError("LOANAMOUNT", "Invalid loan amount. Minimum loan amount should be 1 lakh.")
+        # NumPy is only imported once the first quote is needed.
+        from Banking_Amortization import monthly_emi
+
+        interest_rate = loan_interest_rate(age, int(loan_term))
+        emi = monthly_emi(int(loan_amount), interest_rate, int(loan_term))
+        amount_payable = emi * int(loan_term) * 12
+        return EmiQuote(interest_rate, emi, amount_payable, amount_payable - int(loan_amount))
@@ -0,0 +1,291 @@
+import argparse
+import contextlib
+import csv
+import os
+import struct
+import sys
+import zlib
+from Banking_Account_Records import to_balance
+from Banking_File_Lock import atomic_write
+
+"""
+`BalanceFile` class:
+   - This class keeps the balances in a fixed-width binary file next to the user details CSV file, one slot per account
+    in the row order of the CSV file, so storing a new balance is one positional write of a few bytes instead of a
+    rewrite of every customer.
+   - A slot holds the account number and two copies (A and B) of (sequence, balance, crc32). A write goes to the older
+    copy with the next sequence number. A write torn by a crash leaves that copy with a wrong crc32, and the reader
+    takes the other copy, which still holds the previous balance.
+   - The file is built from the CSV file the first time it is needed, new accounts get a slot appended. An account
+    without a slot (added by a program not using the balance file) keeps the balance of its CSV row.
+   - `set_many` changes several balances together (both sides of a transfer). The new balances are first written to a
+    `.pending` file, which is applied again on the next open if a crash cut the positional writes short. A batch that
+    changes a large share of the accounts (a month-end interest run) patches the slots in memory and writes the file
+    back with one write, instead of one positional write per account.
+   - `export_csv` writes the user details in the existing CSV layout with the balances from this file.
+"""
+
+MAGIC = b"BANKING-BALANCES\n"
+ACCOUNT = struct.Struct("<16s")
+COPY = struct.Struct("<QqI")
+SLOT_SIZE = ACCOUNT.size + 2 * COPY.size
+
+
+def write_at(file, data, offset):
+    if hasattr(os, "pwrite"):
+        os.pwrite(file.fileno(), data, offset)
+    else:  # Windows has no pwrite.
+        file.seek(offset)
+        file.write(data)
+
+
+def read_at(file, size, offset):
+    if hasattr(os, "pread"):
+        return os.pread(file.fileno(), size, offset)
+    file.seek(offset)
+    return file.read(size)
+
+
+def pack_copy(account, sequence, balance):
+    values = struct.pack("<Qq", sequence, balance)
+    return values + struct.pack("<I", zlib.crc32(account + values))
+
+
+"""
+`read_slot(data)`: Returns the account number, the newest valid copy's (sequence, balance) and the offset of the copy
+the next write goes to. The sequence and balance are None when neither copy is valid.
+"""
+
+
+def read_slot(data):
+    account = data[:ACCOUNT.size]
+    newest = None
+    for position in (0, 1):
+        start = ACCOUNT.size + position * COPY.size
+        sequence, balance, crc = COPY.unpack_from(data, start)
+        if sequence and zlib.crc32(account + data[start:start + 16]) == crc and \
+                (newest is None or sequence > newest[0]):
+            newest = (sequence, balance, position)
+    account_number = account.rstrip(b"\0").decode()
+    if newest is None:
+        return account_number, None, None, ACCOUNT.size
+    sequence, balance, position = newest
+    return account_number, sequence, balance, ACCOUNT.size + (1 - position) * COPY.size
+
+
+class BalanceFile:
+    def __init__(self, balance_file, file_lock=None, fsync=False):
+        self.balance_file = balance_file
+        self.file_lock = file_lock
+        self.fsync = fsync
+        self.slot_by_account = {}
+        self.slots = 0
+        self.file = None
+
+    def exclusive(self):
+        return self.file_lock.exclusive() if self.file_lock is not None else contextlib.nullcontext()
+
+    def exists(self):
+        return os.path.isfile(self.balance_file)
+
+    def open(self):
+        if self.file is None:
+            self.file = open(self.balance_file, "r+b", buffering=0)
+            self.load_slots()
+            self.recover()
+        return self.file
+
+    def pending_file(self):
+        return self.balance_file + ".pending"
+
+    """
+    `recover(self)`: Applies the balances of a `set_many` that did not finish. They are absolute values, so applying
+    them a second time is harmless.
+    """
+    def recover(self):
+        if not os.path.isfile(self.pending_file()):
+            return
+        with self.exclusive():
+            if os.path.isfile(self.pending_file()):
+                with open(self.pending_file(), "r", newline="") as pending:
+                    balances = {account_number: int(balance) for account_number, balance in csv.reader(pending)}
+                self.set_many(balances)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def signature(self):
+        try:
+            stat = os.stat(self.balance_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    """
+    `build(self, csv_file)`: Creates the balance file with one slot per row of the CSV file, in row order.
+    """
+    def build(self, csv_file):
+        with self.exclusive():
+            self.close()
+            with open(csv_file, "r", newline="") as read_csv, \
+                    atomic_write(self.balance_file, self.fsync) as temp_file:
+                binary = temp_file.buffer
+                binary.write(MAGIC)
+                for row in csv.DictReader(read_csv):
+                    account = ACCOUNT.pack(row["ACCOUNTNUMBER"].encode())
+                    amount = to_balance(row["AMOUNT"], row["ACCOUNTNUMBER"])
+                    binary.write(account + pack_copy(account, 1, amount) + bytes(COPY.size))
+
+    def load_slots(self):
+        self.slot_by_account = {}
+        data = read_at(self.file, os.fstat(self.file.fileno()).st_size, 0)
+        # A last slot cut short by a crash while it was appended is left out, the next append overwrites it.
+        self.slots = (len(data) - len(MAGIC)) // SLOT_SIZE
+        for slot in range(self.slots):
+            start = len(MAGIC) + slot * SLOT_SIZE
+            account_number = data[start:start + ACCOUNT.size].rstrip(b"\0").decode()
+            self.slot_by_account[account_number] = slot
+
+    def slot_offset(self, slot):
+        return len(MAGIC) + slot * SLOT_SIZE
+
+    def find_slot(self, account_number):
+        self.open()
+        slot = self.slot_by_account.get(account_number)
+        if slot is None and os.fstat(self.file.fileno()).st_size != self.slot_offset(self.slots):
+            # Another process appended slots since they were read.
+            self.load_slots()
+            slot = self.slot_by_account.get(account_number)
+        return slot
+
+    """
+    `get(self, account_number)`: Returns the stored balance of an account, or None when it has no valid slot.
+    """
+    def get(self, account_number):
+        slot = self.find_slot(account_number)
+        if slot is None:
+            return None
+        return read_slot(read_at(self.file, SLOT_SIZE, self.slot_offset(slot)))[2]
+
+    """
+    `set(self, account_number, balance)`: Stores a balance with one positional write into the older copy of the slot.
+    Accounts without a slot get one appended. Callers hold the storage's write lock.
+    """
+    def set(self, account_number, balance):
+        slot = self.find_slot(account_number)
+        if slot is None:
+            self.add(account_number, balance)
+            return
+        offset = self.slot_offset(slot)
+        data = read_at(self.file, SLOT_SIZE, offset)
+        _, sequence, _, copy_offset = read_slot(data)
+        write_at(self.file, pack_copy(data[:ACCOUNT.size], (sequence or 0) + 1, int(balance)), offset + copy_offset)
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    """
+    `set_many(self, balances)`: Stores several balances, given as a dictionary of account number to balance, so that
+    after a crash either all or none of them are in place.
+    """
+    def set_many(self, balances):
+        if len(balances) <= 1:
+            for account_number, balance in balances.items():
+                self.set(account_number, balance)
+            return
+        self.open()
+        with atomic_write(self.pending_file(), fsync=True) as pending:
+            csv.writer(pending).writerows(balances.items())
+        if len(balances) * 8 >= self.slots:
+            self.patch_slots(balances)
+        else:
+            for account_number, balance in balances.items():
+                self.set(account_number, balance)
+        # Every new balance must be on disk before the redo file goes, whichever path wrote it.
+        os.fsync(self.file.fileno())
+        os.remove(self.pending_file())
+
+    """
+    `patch_slots(self, balances)`: Writes new balances into a copy of the whole file read in one go, and writes it back
+    in one go. Only the older copy of each slot changes, as with `set`. Accounts without a slot are appended after.
+    """
+    def patch_slots(self, balances):
+        if os.fstat(self.file.fileno()).st_size != self.slot_offset(self.slots):
+            self.load_slots()
+        data = bytearray(read_at(self.file, self.slot_offset(self.slots), 0))
+        new_accounts = {}
+        for account_number, balance in balances.items():
+            slot = self.slot_by_account.get(str(account_number))
+            if slot is None:
+                new_accounts[account_number] = balance
+                continue
+            start = self.slot_offset(slot)
+            _, sequence, _, copy_offset = read_slot(data[start:start + SLOT_SIZE])
+            data[start + copy_offset:start + copy_offset + COPY.size] = pack_copy(
+                bytes(data[start:start + ACCOUNT.size]), (sequence or 0) + 1, int(balance)
+            )
+        write_at(self.file, data, 0)
+        for account_number, balance in new_accounts.items():
+            self.add(account_number, balance)
+
+    def add(self, account_number, balance):
+        self.open()
+        if os.fstat(self.file.fileno()).st_size > self.slot_offset(self.slots):
+            self.load_slots()
+        account = ACCOUNT.pack(str(account_number).encode())
+        slot = self.slots
+        write_at(self.file, account + pack_copy(account, 1, int(balance)) + bytes(COPY.size), self.slot_offset(slot))
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.slot_by_account[str(account_number)] = slot
+        self.slots += 1
+
+    """
+    `balances(self)`: Yields the (ACCOUNTNUMBER, balance) pair of every slot with a valid copy, in slot order.
+    """
+    def balances(self):
+        self.open()
+        data = read_at(self.file, os.fstat(self.file.fileno()).st_size, 0)
+        for slot in range((len(data) - len(MAGIC)) // SLOT_SIZE):
+            start = self.slot_offset(slot)
+            account_number, _, balance, _ = read_slot(data[start:start + SLOT_SIZE])
+            if balance is not None:
+                yield account_number, balance
+
+
+"""
+`export_csv(csv_file, balance_file, output_file)`: Writes the rows of the CSV file to `output_file` in the same layout,
+with `AMOUNT` taken from the balance file.
+"""
+
+
+def export_csv(csv_file, balance_file, output_file):
+    balances = dict(BalanceFile(balance_file).balances())
+    with open(csv_file, "r", newline="") as read_csv, atomic_write(output_file) as write_csv:
+        reader = csv.DictReader(read_csv)
+        writer = csv.DictWriter(write_csv, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        for row in reader:
+            balance = balances.get(row["ACCOUNTNUMBER"])
+            if balance is not None:
+                row["AMOUNT"] = str(balance)
+            writer.writerow(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export User_details.csv with the balances of its balance file.")
+    parser.add_argument("csv_file", help="User_details.csv")
+    parser.add_argument("output_file", help="CSV file to write, may be the same as csv_file")
+    args = parser.parse_args(argv)
+    balance_file = os.path.splitext(args.csv_file)[0] + ".balances"
+    if not os.path.isfile(balance_file):
+        print(f"File not found in the given path: {balance_file}")
+        return 1
+    export_csv(args.csv_file, balance_file, args.output_file)
+    print(f"User details with current balances written to {args.output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
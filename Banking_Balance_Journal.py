@@ -0,0 +1,90 @@
+import contextlib
+import csv
+import io
+import os
+from Banking_File_Lock import atomic_write
+from Banking_Metrics import metrics
+
+"""
+`BalanceJournal` class:
+   - This class keeps an append-only journal of balance and field changes next to the user details CSV file.
+   - A change is written as one (ACCOUNTNUMBER, column, value) line, so a deposit no longer rewrites every customer.
+   - Readers replay the journal on top of the CSV file, and `compact` folds the journal back into the CSV file once
+    it grows past `compact_threshold` bytes.
+   - Appends and compaction hold the storage's `FileLock` exclusively when one is given, and `fsync=True` flushes
+    every append to disk before it returns.
+"""
+
+
+class BalanceJournal:
+    def __init__(self, csv_file, compact_threshold=1024 * 1024, file_lock=None, fsync=False):
+        self.csv_file = csv_file
+        self.journal_file = os.path.splitext(csv_file)[0] + ".journal"
+        self.compact_threshold = compact_threshold
+        self.file_lock = file_lock
+        self.fsync = fsync
+
+    def exclusive(self):
+        return self.file_lock.exclusive() if self.file_lock is not None else contextlib.nullcontext()
+
+    """
+    `append(self, account_number, column, value)`: Appends a single change to the journal file.
+    """
+    def append(self, account_number, column, value):
+        self.append_changes([(account_number, column, value)])
+
+    """
+    `append_changes(self, changes)`: Appends several (ACCOUNTNUMBER, column, value) changes in a single write, for
+    changes that belong together such as both sides of a transfer.
+    """
+    def append_changes(self, changes):
+        lines = io.StringIO()
+        csv.writer(lines).writerows(changes)
+        with self.exclusive(), open(self.journal_file, "a", newline="") as journal:
+            written = journal.write(lines.getvalue())
+            metrics.count("csv_bytes_written", written)
+            if self.fsync:
+                journal.flush()
+                os.fsync(journal.fileno())
+
+    """
+    `entries(self)`: Yields the (ACCOUNTNUMBER, column, value) changes in the order they were written.
+    """
+    def entries(self):
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "r", newline="") as journal:
+            for entry in csv.reader(journal):
+                if len(entry) == 3:
+                    yield entry
+
+    def size(self):
+        try:
+            return os.path.getsize(self.journal_file)
+        except FileNotFoundError:
+            return 0
+
+    def signature(self):
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def needs_compaction(self):
+        return self.size() >= self.compact_threshold
+
+    """
+    `compact(self, account_index)`: Writes the replayed rows held by the account index back to the CSV file and empties
+    the journal. Journal entries hold absolute values, so replaying them again after a crash is harmless.
+    """
+    def compact(self, account_index):
+        with self.exclusive():
+            account_index.refresh()
+            with atomic_write(self.csv_file, self.fsync) as temp_file:
+                writer = csv.DictWriter(temp_file, fieldnames=account_index.fieldnames)
+                writer.writeheader()
+                writer.writerows(account_index.rows())
+            metrics.file_rewritten(self.csv_file)
+            open(self.journal_file, "w").close()
+            account_index.mark_synced()
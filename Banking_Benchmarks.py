@@ -0,0 +1,241 @@
+import argparse
+import builtins
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from Banking_Account_Rules import GENDERS
+from Banking_Api import BankingApi
+from Banking_Loan_Rules import loan_interest_rate
+from Banking_Storage import ACCOUNT_FIELDNAMES, CSVStorage
+
+"""
+Benchmark suite:
+   - Generates synthetic `User_details.csv` files of 1k, 100k and 1M accounts and times the core operations on each:
+    finding an account by phone number (`get_account_number`), reading a balance (`get_current_balance`), storing a
+    balance (`update_amount`), changing a field (`update_user_details`) and building the account table
+    (`display_account`), with the storage modes given on the command line.
+   - `calculate_emi_and_save_as_csv` is timed for every loan term from 1 to 30 years, writing the loan CSV file and
+    printing every page of the schedule into a buffer.
+   - Results are written as JSON. Given a baseline file of an earlier run, every benchmark is compared with it and the
+    run fails when a median is more than `--threshold` times slower.
+"""
+
+SIZES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+FIRST_NAMES = ["Asha", "Ravi", "Priya", "Kumar", "Anita", "Suresh", "Meena", "Arjun"]
+LAST_NAMES = ["Rao", "Shah", "Iyer", "Patel", "Singh", "Nair"]
+PROFESSIONS = ["Engineer", "Doctor", "Teacher", "Clerk", "Farmer", "Student"]
+EMI_LOAN_AMOUNT = 500000
+EMI_AGE = 30
+
+
+"""
+`generate_user_details(csv_file, count, seed=0)`: Writes a `User_details.csv` file with `count` synthetic accounts and
+returns their (account number, phone number) pairs.
+"""
+
+
+def generate_user_details(csv_file, count, seed=0):
+    generator = random.Random(seed)
+    accounts = []
+    with open(csv_file, "w", newline="") as write_csv:
+        writer = csv.writer(write_csv)
+        writer.writerow(ACCOUNT_FIELDNAMES)
+        for number in range(count):
+            # 900,000 account numbers fit in one month, larger files spill over into the following months.
+            month = 2401 + number // 900000
+            account_number = f"{month}{100000 + number % 900000}"
+            phone_number = f"9{number:09d}"
+            year = generator.randint(1950, 2004)
+            writer.writerow([
+                account_number,
+                generator.choice(FIRST_NAMES),
+                generator.choice(LAST_NAMES),
+                f"{year}-{generator.randint(1, 12):02d}-{generator.randint(1, 28):02d}",
+                2024 - year,
+                generator.choice(GENDERS),
+                generator.choice(PROFESSIONS),
+                phone_number,
+                f"customer{number}@mail.com",
+                generator.randint(1000, 500000),
+            ])
+            accounts.append((account_number, phone_number))
+    return accounts
+
+
+"""
+`time_operation(operation, arguments, repeat)`: Calls `operation(argument)` once for every argument, at most `repeat`
+times, and returns the timings in microseconds.
+"""
+
+
+def time_operation(operation, arguments, repeat):
+    timings = []
+    for argument in arguments[:repeat]:
+        start = time.perf_counter()
+        operation(argument)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return {
+        "runs": len(timings),
+        "min_us": min(timings),
+        "median_us": statistics.median(timings),
+        "mean_us": statistics.fmean(timings),
+        "max_us": max(timings),
+    }
+
+
+def account_table(api, account_number):
+    from prettytable import PrettyTable
+
+    details = api.get_account(account_number)._asdict()
+    table = PrettyTable()
+    table.field_names = details.keys()
+    table.add_row(details.values())
+    return table.get_string()
+
+
+def run_storage_benchmarks(workdir, size_name, count, journal_mode, repeat, seed):
+    mode = "journal" if journal_mode else "csv"
+    # One file per mode, a journal left by an earlier run would open the next file in journal mode.
+    csv_file = os.path.join(workdir, f"User_details_{mode}_{size_name}.csv")
+    start = time.perf_counter()
+    accounts = generate_user_details(csv_file, count, seed)
+    generate_seconds = time.perf_counter() - start
+    prefix = f"{mode}-{size_name}"
+    generator = random.Random(seed)
+    sample = [generator.choice(accounts) for _ in range(repeat)]
+    account_numbers = [account_number for account_number, _ in sample]
+    phone_numbers = [phone_number for _, phone_number in sample]
+
+    storage = CSVStorage(csv_file, journal_mode)
+    api = BankingApi(storage)
+    results = {}
+    load = time.perf_counter()
+    storage.account_index.refresh()
+    results[f"{prefix}/load_index"] = {"runs": 1, "median_us": (time.perf_counter() - load) * 1e6}
+    results[f"{prefix}/get_account_number"] = time_operation(storage.get_account_number, phone_numbers, repeat)
+    results[f"{prefix}/get_current_balance"] = time_operation(api.get_balance, account_numbers, repeat)
+    # Full-file rewrites take seconds on the largest files, so fewer of them are timed.
+    write_repeat = repeat if journal_mode or count <= 100000 else min(repeat, 5)
+    results[f"{prefix}/update_amount"] = time_operation(
+        lambda account_number: api.deposit(account_number, 100), account_numbers, write_repeat
+    )
+    results[f"{prefix}/update_user_details"] = time_operation(
+        lambda account_number: api.edit_field(account_number, "EMAIL", "updated@mail.com"), account_numbers,
+        write_repeat
+    )
+    results[f"{prefix}/display_account"] = time_operation(
+        lambda account_number: account_table(api, account_number), account_numbers, repeat
+    )
+    for name in results:
+        results[name]["accounts"] = count
+    print(f"{prefix}: generated in {generate_seconds:.1f} s")
+    return results
+
+
+def run_emi_benchmarks(workdir, repeat):
+    from Banking_Emi_Calculation import EMI_Calculator
+
+    emi = EMI_Calculator()
+    emi.loan_details_path = os.path.join(workdir, "LoanDetails")
+    os.makedirs(emi.loan_details_path, exist_ok=True)
+    results = {}
+    original_input = builtins.input
+    builtins.input = lambda prompt="": ""
+    try:
+        for loan_term in range(1, 31):
+            interest = loan_interest_rate(EMI_AGE, loan_term)
+            emi.interestRate = interest
+
+            def calculate(_):
+                emi.schedule_cache.clear()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    emi.calculate_emi_and_save_as_csv(EMI_AGE, interest, loan_term, EMI_LOAN_AMOUNT)
+                os.remove(emi.loan_details_path_csv)
+
+            results[f"emi/calculate_emi_and_save_as_csv/{loan_term}y"] = time_operation(
+                calculate, list(range(repeat)), repeat
+            )
+    finally:
+        builtins.input = original_input
+    return results
+
+
+"""
+`compare(results, baseline, threshold)`: Prints every benchmark next to its baseline median and returns the names of
+those that are more than `threshold` times slower.
+"""
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'benchmark':<55} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<55} {'-':>12} {result['median_us']:>10.1f}us {'new':>7}")
+            continue
+        ratio = result["median_us"] / previous["median_us"] if previous["median_us"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<55} {previous['median_us']:>10.1f}us {result['median_us']:>10.1f}us {ratio:>6.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the core banking and EMI paths.")
+    parser.add_argument("--sizes", default="1k,100k", help="comma separated sizes out of 1k, 100k and 1m")
+    parser.add_argument("--modes", default="csv,journal", help="storage modes to time, csv and/or journal")
+    parser.add_argument("--repeat", type=int, default=50, help="timed calls per benchmark")
+    parser.add_argument("--no-emi", action="store_true", help="skip the EMI benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="banking-benchmarks-")
+    try:
+        for size_name in args.sizes.split(","):
+            for mode in args.modes.split(","):
+                results.update(run_storage_benchmarks(
+                    workdir, size_name, SIZES[size_name], mode == "journal", args.repeat, args.seed
+                ))
+        if not args.no_emi:
+            results.update(run_emi_benchmarks(workdir, max(1, args.repeat // 10)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w") as write_json:
+        json.dump(report, write_json, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as read_json:
+            baseline = json.load(read_json)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks are more than {args.threshold}x slower than the baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
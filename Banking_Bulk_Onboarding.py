@@ -0,0 +1,156 @@
+import argparse
+import csv
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from Banking_Account_Allocator import AccountNumberAllocator
+from Banking_Account_Rules import calculate_age, field_error
+from Banking_Ledger import Ledger, Posting
+from Banking_Storage import ACCOUNT_FIELDNAMES, default_user_details_file, open_storage
+
+"""
+`BulkOnboarding` class:
+   - This class opens accounts for a whole file of prospective customers, for example a company payroll tie-up, instead
+    of one `Account_Creation` session per person.
+   - The customers file has the columns FIRSTNAME, LASTNAME, DATE_OF_BIRTH, GENDER, PROFESSION, PHONENUMBER, EMAIL and
+    AMOUNT, with a header line.
+   - Rows are validated in chunks across a process pool with the same rules as `validate`: the age is calculated from
+    the date of birth and must be 18 or more, the phone number has 10 digits, the email matches the pattern and the
+    opening deposit is 500 or more. A phone number that is already registered, or repeated in the file, is rejected.
+   - Accepted customers get a block of account numbers from the `AccountNumberAllocator` and are appended in one
+    buffered write, and their opening deposits are posted to the `Ledger` in one write. Rejected rows are written to a
+    reject file together with the reason.
+"""
+
+CUSTOMER_FIELDNAMES = ["FIRSTNAME", "LASTNAME", "DATE_OF_BIRTH", "GENDER", "PROFESSION", "PHONENUMBER", "EMAIL", "AMOUNT"]
+REJECT_FIELDNAMES = ["LINE"] + CUSTOMER_FIELDNAMES + ["REASON"]
+
+
+"""
+`validate_chunk(chunk)`: Validates a list of (line, customer) pairs and returns (line, account row, reason) triples,
+with the account row set for accepted customers and the reason set for rejected ones. Runs in the worker processes.
+"""
+
+
+def validate_chunk(chunk):
+    results = []
+    for line, customer in chunk:
+        row = {field: (customer.get(field) or "").strip() for field in CUSTOMER_FIELDNAMES}
+        reason = None
+        for field in CUSTOMER_FIELDNAMES:
+            reason = field_error(field, row[field])
+            if reason is not None:
+                break
+        if reason is None:
+            row["AGE"] = str(calculate_age(row["DATE_OF_BIRTH"]))
+            reason = field_error("AGE", row["AGE"])
+        results.append((line, row if reason is None else None, reason.strip() if reason else None))
+    return results
+
+
+class BulkOnboarding:
+    def __init__(self, storage, allocator=None, workers=None, chunk_size=5000, ledger=None):
+        self.storage = storage
+        self.allocator = allocator or AccountNumberAllocator(storage.sidecar_file(".sequence"), storage)
+        self.ledger = ledger or Ledger(storage.sidecar_file(".ledger"))
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.rejects = []
+
+    def reject(self, line, customer, reason):
+        reject = {field: customer.get(field, "") for field in CUSTOMER_FIELDNAMES}
+        reject.update({"LINE": line, "REASON": reason})
+        self.rejects.append(reject)
+
+    def read_chunks(self, customers_file):
+        chunk = []
+        with open(customers_file, "r", newline="") as read_csv:
+            for line, customer in enumerate(csv.DictReader(read_csv), start=2):
+                chunk.append((line, customer))
+                if len(chunk) == self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    """
+    `validate(self, customers_file)`: Validates every customer, in parallel when the file has more than one chunk, and
+    yields the results in file order.
+    """
+    def validate(self, customers_file):
+        chunks = list(self.read_chunks(customers_file))
+        if len(chunks) <= 1 or self.workers == 1:
+            for chunk in chunks:
+                yield from validate_chunk(chunk)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for results in executor.map(validate_chunk, chunks):
+                yield from results
+
+    """
+    `process(self, customers_file, rejects_file)`: Opens an account for every valid customer, writes the reject file
+    and returns the number of opened accounts and rejected rows.
+    """
+    def process(self, customers_file, rejects_file):
+        self.rejects = []
+        accepted = []
+        rejected_lines = {}
+        with self.storage.write_lock():
+            registered = self.storage.phone_numbers() if self.storage.exists() else set()
+            seen = set()
+            for line, row, reason in self.validate(customers_file):
+                if row is None:
+                    rejected_lines[line] = reason
+                    continue
+                if row["PHONENUMBER"] in registered or row["PHONENUMBER"] in seen:
+                    rejected_lines[line] = "Phone Number already registered"
+                    continue
+                seen.add(row["PHONENUMBER"])
+                accepted.append(row)
+
+            account_numbers = self.allocator.reserve(len(accepted))
+            for account_number, row in zip(account_numbers, accepted):
+                row["ACCOUNTNUMBER"] = account_number
+            accepted = [{field: row[field] for field in ACCOUNT_FIELDNAMES} for row in accepted]
+            if accepted:
+                self.storage.add_accounts(accepted)
+                self.ledger.append(
+                    [Posting(row["ACCOUNTNUMBER"], "OPENING", int(row["AMOUNT"]), int(row["AMOUNT"])) for row in accepted]
+                )
+
+        if rejected_lines:
+            # The file is read a second time only when there are rejects, to copy them into the reject file as given.
+            with open(customers_file, "r", newline="") as read_csv:
+                for line, customer in enumerate(csv.DictReader(read_csv), start=2):
+                    if line in rejected_lines:
+                        self.reject(line, customer, rejected_lines[line])
+        with open(rejects_file, "w", newline="") as write_csv:
+            writer = csv.DictWriter(write_csv, fieldnames=REJECT_FIELDNAMES, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(self.rejects)
+        return len(accepted), len(self.rejects)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open accounts for a file of prospective customers.")
+    parser.add_argument("customers_file", help="CSV file of FIRSTNAME, LASTNAME, DATE_OF_BIRTH, GENDER, PROFESSION, "
+                                               "PHONENUMBER, EMAIL, AMOUNT records with a header line")
+    parser.add_argument("rejects_file", help="CSV file the rejected customers are written to")
+    parser.add_argument("--user-details", default=default_user_details_file(),
+                        help="User_details.csv, a SQLite .db file created by the SQLite storage engine, or a "
+                             "shard directory")
+    parser.add_argument("--workers", type=int, help="number of validation processes, one per CPU by default")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="customers validated per task")
+    args = parser.parse_args(argv)
+
+    onboarding = BulkOnboarding(open_storage(args.user_details), workers=args.workers, chunk_size=args.chunk_size)
+    try:
+        opened, rejected = onboarding.process(args.customers_file, args.rejects_file)
+    except FileNotFoundError as e:
+        print(f"File not found in the given path: {e.filename}")
+        return 1
+    print(f"{opened} accounts opened, {rejected} rejected. Rejected customers are in {args.rejects_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import argparse
+import csv
+import sys
+from Banking_Account_Records import to_balance
+from Banking_Ledger import Ledger, Posting
+from Banking_Storage import default_user_details_file, open_storage
+from Banking_Transaction_Rules import deposit_error, transfer_error, withdrawal_error
+
+"""
+`BulkTransactionProcessor` class:
+   - This class posts a whole file of deposits and withdrawals, for example the month-end salary credits, in one go.
+   - The records file has the columns ACCOUNTNUMBER, TYPE (DEPOSIT or WITHDRAW) and AMOUNT, one posting per line.
+   - Every record is checked with the same rules as the `Transaction` menu, in the order it appears in the file, and
+    all accepted records are applied in a single pass over the user details, and posted to the `Ledger` in one write.
+   - Rejected records are written to a reject file together with the reason.
+"""
+
+TRANSACTION_TYPES = {
+    "DEPOSIT": "DEPOSIT",
+    "CREDIT": "DEPOSIT",
+    "WITHDRAW": "WITHDRAW",
+    "WITHDRAWAL": "WITHDRAW",
+    "DEBIT": "WITHDRAW",
+}
+
+REJECT_FIELDNAMES = ["LINE", "ACCOUNTNUMBER", "TYPE", "AMOUNT", "REASON"]
+SETTLEMENT_REJECT_FIELDNAMES = ["LINE", "FROM_ACCOUNT", "TO_ACCOUNT", "AMOUNT", "REASON"]
+
+
+class BulkTransactionProcessor:
+    def __init__(self, storage, ledger=None):
+        self.storage = storage
+        self.ledger = ledger or Ledger(storage.sidecar_file(".ledger"))
+        self.rejects = []
+        self.accepted = 0
+
+    def reject(self, line, account_number, transaction_type, amount, reason):
+        self.rejects.append(
+            {
+                "LINE": line,
+                "ACCOUNTNUMBER": account_number,
+                "TYPE": transaction_type,
+                "AMOUNT": amount,
+                "REASON": reason,
+            }
+        )
+
+    """
+    `read_records(self, records_file)`: Reads the records file and groups the well-formed postings by account number.
+    Malformed lines are rejected straight away.
+    """
+    def read_records(self, records_file):
+        postings = {}
+        with open(records_file, "r", newline="") as read_csv:
+            for line, record in enumerate(csv.reader(read_csv), start=1):
+                if not record or (line == 1 and record[0].strip().upper() == "ACCOUNTNUMBER"):
+                    continue
+                if len(record) != 3:
+                    self.reject(line, ",".join(record), "", "", "Expected ACCOUNTNUMBER, TYPE, AMOUNT")
+                    continue
+                account_number, transaction_type, amount = (value.strip() for value in record)
+                kind = TRANSACTION_TYPES.get(transaction_type.upper())
+                if kind is None:
+                    self.reject(line, account_number, transaction_type, amount, "Unknown transaction type")
+                elif not amount.isdigit():
+                    self.reject(line, account_number, transaction_type, amount, "Amount must be a whole number")
+                else:
+                    postings.setdefault(account_number, []).append((line, kind, int(amount)))
+        return postings
+
+    """
+    `process(self, records_file, rejects_file)`: Validates and applies every record, writes the reject file and returns
+    the number of accepted and rejected records.
+    """
+    def process(self, records_file, rejects_file):
+        self.rejects = []
+        self.accepted = 0
+        postings = self.read_records(records_file)
+        ledger_postings = []
+
+        def apply_postings(row):
+            account_postings = postings.pop(row["ACCOUNTNUMBER"], None)
+            if account_postings is None:
+                return False
+            balance = to_balance(row["AMOUNT"], row["ACCOUNTNUMBER"])
+            changed = False
+            for line, kind, amount in account_postings:
+                if kind == "DEPOSIT":
+                    error = deposit_error(balance, amount)
+                else:
+                    error = withdrawal_error(balance, amount)
+                if error is not None:
+                    self.reject(line, row["ACCOUNTNUMBER"], kind, amount, error.strip())
+                    continue
+                balance = balance + amount if kind == "DEPOSIT" else balance - amount
+                ledger_postings.append(Posting(row["ACCOUNTNUMBER"], kind, amount, balance))
+                self.accepted += 1
+                changed = True
+            if changed:
+                row["AMOUNT"] = balance
+            return changed
+
+        if postings:
+            with self.storage.write_lock():
+                self.storage.rewrite_rows(apply_postings)
+                self.ledger.append(ledger_postings)
+        for account_number, account_postings in postings.items():
+            for line, kind, amount in account_postings:
+                self.reject(line, account_number, kind, amount, "Account Number doesn't exist")
+
+        self.rejects.sort(key=lambda reject: reject["LINE"])
+        with open(rejects_file, "w", newline="") as write_csv:
+            writer = csv.DictWriter(write_csv, fieldnames=REJECT_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(self.rejects)
+        return self.accepted, len(self.rejects)
+
+
+"""
+`SettlementProcessor` class:
+   - This class settles a file of account-to-account transfers, for example an interbank settlement file.
+   - The records file has the columns FROM_ACCOUNT, TO_ACCOUNT and AMOUNT, one transfer per line.
+   - Transfers are checked in file order with the same rules as `BankingApi.transfer`, against the balances left by the
+    transfers before them. All accepted transfers are stored with one `update_balances` write under the storage's write
+    lock, so the file is settled completely or not at all. Both sides of every transfer are posted to the `Ledger`.
+"""
+
+
+class SettlementProcessor:
+    def __init__(self, storage, ledger=None):
+        self.storage = storage
+        self.ledger = ledger or Ledger(storage.sidecar_file(".ledger"))
+        self.rejects = []
+        self.accepted = 0
+
+    def reject(self, line, from_account, to_account, amount, reason):
+        self.rejects.append(
+            {"LINE": line, "FROM_ACCOUNT": from_account, "TO_ACCOUNT": to_account, "AMOUNT": amount, "REASON": reason}
+        )
+
+    """
+    `process(self, records_file, rejects_file)`: Settles every valid transfer, writes the reject file and returns the
+    number of accepted and rejected transfers.
+    """
+    def process(self, records_file, rejects_file):
+        self.rejects = []
+        self.accepted = 0
+        balances = {}
+
+        def balance_of(account_number):
+            if account_number not in balances:
+                balances[account_number] = self.storage.get_balance(account_number) if self.storage.exists() else None
+            return balances[account_number]
+
+        with self.storage.write_lock():
+            changed = set()
+            postings = []
+            with open(records_file, "r", newline="") as read_csv:
+                for line, record in enumerate(csv.reader(read_csv), start=1):
+                    if not record or (line == 1 and record[0].strip().upper() == "FROM_ACCOUNT"):
+                        continue
+                    if len(record) != 3:
+                        self.reject(line, ",".join(record), "", "", "Expected FROM_ACCOUNT, TO_ACCOUNT, AMOUNT")
+                        continue
+                    from_account, to_account, amount = (value.strip() for value in record)
+                    if not amount.isdigit():
+                        reason = "Amount must be a whole number"
+                    elif from_account == to_account:
+                        reason = "Cannot transfer money to the same account"
+                    elif balance_of(from_account) is None:
+                        reason = f"Account Number {from_account} doesn't exist"
+                    elif balance_of(to_account) is None:
+                        reason = f"Account Number {to_account} doesn't exist"
+                    else:
+                        reason = transfer_error(balances[from_account], int(amount)) or \
+                            deposit_error(balances[to_account], int(amount))
+                    if reason is not None:
+                        self.reject(line, from_account, to_account, amount, reason.strip())
+                        continue
+                    amount = int(amount)
+                    balances[from_account] -= amount
+                    balances[to_account] += amount
+                    postings.append(Posting(from_account, "TRANSFER_OUT", amount, balances[from_account], to_account))
+                    postings.append(Posting(to_account, "TRANSFER_IN", amount, balances[to_account], from_account))
+                    changed.update((from_account, to_account))
+                    self.accepted += 1
+            if changed:
+                self.storage.update_balances({account_number: balances[account_number] for account_number in changed})
+                self.ledger.append(postings)
+
+        with open(rejects_file, "w", newline="") as write_csv:
+            writer = csv.DictWriter(write_csv, fieldnames=SETTLEMENT_REJECT_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(self.rejects)
+        return self.accepted, len(self.rejects)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Post a file of deposits and withdrawals in one pass.")
+    parser.add_argument("records_file", help="CSV file of ACCOUNTNUMBER, TYPE, AMOUNT records, or with --settlement "
+                                             "of FROM_ACCOUNT, TO_ACCOUNT, AMOUNT transfers")
+    parser.add_argument("rejects_file", help="CSV file the rejected records are written to")
+    parser.add_argument("--user-details", default=default_user_details_file(),
+                        help="User_details.csv, a SQLite .db file created by the SQLite storage engine, or a "
+                             "shard directory")
+    parser.add_argument("--settlement", action="store_true", help="the records file is a file of transfers")
+    args = parser.parse_args(argv)
+
+    storage = open_storage(args.user_details)
+    processor = SettlementProcessor(storage) if args.settlement else BulkTransactionProcessor(storage)
+    try:
+        accepted, rejected = processor.process(args.records_file, args.rejects_file)
+    except FileNotFoundError as e:
+        print(f"File not found in the given path: {e.filename}")
+        return 1
+    finally:
+        processor.ledger.close()
+    print(f"{accepted} transactions posted, {rejected} rejected. Rejected records are in {args.rejects_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import sys
+import time
+
+"""
+`BankingClient` class:
+   - This class is a terminal session of the `BankingServer` line protocol: `request` sends one command line and returns
+    the decoded result, or raises `ServerError` with the error type and message the server sent back.
+   - Run on its own, the module is either an interactive terminal (one command per input line) or, with `--load-test`,
+    opens many concurrent sessions against one server and reports the throughput and latencies.
+   - The load test creates accounts, so it never talks to a running server: it starts its own `BankingServer` on a
+    throwaway store in a temporary directory, and removes the directory when it is done.
+"""
+
+# User details path of the throwaway store of the load test, for every storage engine.
+SCRATCH_STORES = {"csv": "User_details.csv", "sqlite": "User_details.db", "sharded": "Shards"}
+
+
+class ServerError(Exception):
+    def __init__(self, error_type, message):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+
+class BankingClient:
+    def __init__(self, host="127.0.0.1", port=8765, unix_path=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        if self.unix_path:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.unix_path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def request(self, *words):
+        self.writer.write(shlex.join(str(word) for word in words).encode() + b"\n")
+        await self.writer.drain()
+        line = (await self.reader.readline()).decode().strip()
+        if not line:
+            raise ConnectionError("The server closed the connection")
+        status, _, payload = line.partition(" ")
+        if status == "OK":
+            return json.loads(payload)
+        error_type, _, message = payload.partition(" ")
+        raise ServerError(error_type, message)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.write(b"QUIT\n")
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+"""
+`load_test(sessions, operations, storage="csv")`: Starts a server on a new throwaway store of the `storage` engine and
+opens `sessions` concurrent clients, each creates its own account and then alternates deposits and balance reads
+`operations` times. Returns the number of requests, the elapsed seconds and the sorted request latencies in
+milliseconds.
+"""
+
+
+async def load_test(sessions, operations, storage="csv"):
+    # The server and the store are only imported by the load test, the terminal does not need them.
+    import shutil
+    import tempfile
+
+    from Banking_Api import BankingApi
+    from Banking_Server import BankingServer
+    from Banking_Storage import open_storage
+
+    scratch_directory = tempfile.mkdtemp(prefix="banking-load-test-")
+    user_details = os.path.join(scratch_directory, SCRATCH_STORES[storage])
+    if storage == "sharded":
+        os.makedirs(user_details)
+    api = BankingApi(open_storage(user_details))
+    server = BankingServer(api, port=0)
+    await server.start()
+    host, port = server.server.sockets[0].getsockname()[:2]
+    latencies = []
+
+    async def session(number):
+        client = await BankingClient(host, port).connect()
+        try:
+            account = await client.request(
+                "CREATE", "Load", "Test", "1990-01-01", "Male", "Tester", f"7{number:09d}", "load@test.com", 5000
+            )
+            for operation in range(operations):
+                command = ("DEPOSIT", account["ACCOUNTNUMBER"], 100) if operation % 2 == 0 else \
+                    ("BALANCE", account["ACCOUNTNUMBER"])
+                start = time.perf_counter()
+                await client.request(*command)
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            await client.close()
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(session(number) for number in range(sessions)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await server.stop()
+        api.ledger.close()
+        if hasattr(api.storage, "close"):
+            api.storage.close()
+        shutil.rmtree(scratch_directory, ignore_errors=True)
+    return len(latencies), elapsed, sorted(latencies)
+
+
+async def interactive(host, port, unix_path):
+    client = await BankingClient(host, port, unix_path).connect()
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line or line.strip().upper() == "QUIT":
+                break
+            if not line.strip():
+                continue
+            try:
+                words = shlex.split(line)
+            except ValueError as e:
+                print(f"Cannot read the command: {e}")
+                continue
+            try:
+                print(await client.request(*words))
+            except ServerError as e:
+                print(e)
+    finally:
+        await client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terminal and load test client of the E-con Banking server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--load-test", action="store_true",
+                        help="run a load test against a server of its own on a throwaway store, instead of the "
+                             "interactive terminal")
+    parser.add_argument("--storage", choices=sorted(SCRATCH_STORES), default="csv",
+                        help="storage engine of the load test's throwaway store")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--operations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    if not args.load_test:
+        asyncio.run(interactive(args.host, args.port, args.unix))
+        return 0
+    requests, elapsed, latencies = asyncio.run(load_test(args.sessions, args.operations, args.storage))
+    print(f"{requests} requests from {args.sessions} sessions in {elapsed:.2f} s ({requests / elapsed:.0f} requests/s)")
+    if latencies:
+        median = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"Latency median {median:.2f} ms, p99 {p99:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
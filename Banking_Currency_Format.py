@@ -0,0 +1,82 @@
+import decimal
+import functools
+
+"""
+`CurrencyFormatter` class:
+   - This class formats amounts the same way as `babel.numbers.format_currency(value, 'INR', locale="en_IN")`, character
+    for character, without resolving the locale and parsing the pattern again on every call.
+   - The locale's currency pattern, symbols and grouping sizes are read from babel once, when the formatter is created.
+   - Values are rounded like babel does: through `Decimal(str(value))`, half-even, to the currency's digits, and the
+    integer part is grouped with the pattern's primary and secondary group sizes (3 and 2 for en_IN).
+   - `format_cached` is the same formatter behind an LRU memo, for reports that repeat the same values.
+"""
+
+
+class CurrencyFormatter:
+    def __init__(self, currency="INR", locale="en_IN", memo_size=4096):
+        import babel.numbers
+        from babel import Locale
+
+        self.currency = currency
+        self.locale = Locale.parse(locale)
+        self.pattern = self.locale.currency_formats["standard"]
+        symbol = babel.numbers.get_currency_symbol(currency, self.locale)
+        self.prefixes = tuple(prefix.replace("¤", symbol) for prefix in self.pattern.prefix)
+        self.suffixes = tuple(suffix.replace("¤", symbol) for suffix in self.pattern.suffix)
+        self.group_symbol = babel.numbers.get_group_symbol(self.locale)
+        self.decimal_symbol = babel.numbers.get_decimal_symbol(self.locale)
+        self.primary_group, self.secondary_group = self.pattern.grouping
+        self.min_int_digits = self.pattern.int_prec[0]
+        self.frac_digits = babel.numbers.get_currency_precision(currency)
+        self.quantum = decimal.Decimal(1).scaleb(-self.frac_digits)
+        # Scientific, significant-digit and scaled patterns are rare, these are left to babel itself.
+        self.fast_path = not self.pattern.exp_prec and "@" not in self.pattern.pattern and not self.pattern.scale
+        self.format_cached = functools.lru_cache(maxsize=memo_size)(self.format) if memo_size else self.format
+
+    def group_integer(self, digits):
+        if len(digits) < self.min_int_digits:
+            digits = "0" * (self.min_int_digits - len(digits)) + digits
+        size = self.primary_group
+        groups = ""
+        while len(digits) > size:
+            groups = self.group_symbol + digits[-size:] + groups
+            digits = digits[:-size]
+            size = self.secondary_group
+        return digits + groups
+
+    def format(self, value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value))
+        if not self.fast_path or not value.is_finite():
+            import babel.numbers
+
+            return babel.numbers.format_currency(value, self.currency, locale=self.locale)
+        is_negative = int(value.is_signed())
+        integer_part, _, fraction = f"{abs(value).quantize(self.quantum):f}".partition(".")
+        number = self.group_integer(integer_part)
+        if self.frac_digits:
+            number += self.decimal_symbol + fraction
+        return self.prefixes[is_negative] + number + self.suffixes[is_negative]
+
+
+_inr_formatter = None
+
+
+"""
+`get_inr_formatter()`: Returns the shared en_IN rupee formatter, creating it on first use.
+"""
+
+
+def get_inr_formatter():
+    global _inr_formatter
+    if _inr_formatter is None:
+        _inr_formatter = CurrencyFormatter("INR", "en_IN")
+    return _inr_formatter
+
+
+def format_inr(value):
+    return get_inr_formatter().format(value)
+
+
+def format_inr_cached(value):
+    return get_inr_formatter().format_cached(value)
@@ -1,10 +1,12 @@
 import csv
 import os
 import sys
-import babel.numbers
 import re
-from prettytable import PrettyTable
 import datetime
+from Banking_Schedule_Cache import ScheduleCache
+from Banking_Currency_Format import format_inr
+from Banking_Loan_Rules import SENIOR_CITIZEN_AGE, STUDENT_MAXIMUM_AGE, loan_interest_rate
+from Banking_Metrics import instrument, metrics
 
 """
 `EMI_Calculator` class:
@@ -15,6 +17,11 @@ import datetime
 
 
 class EMI_Calculator:
+    # Schedules are shared by every calculator, so a repeated quote is never computed twice.
+    schedule_cache = ScheduleCache(maxsize=64)
+    # Number of months shown on each page of the EMI schedule.
+    emi_page_size = 12
+
     def __init__(self):
         self.loan_detail_folder = None
         self.banking_path_loan = None
@@ -27,6 +34,16 @@ class EMI_Calculator:
         self.loan_details_path_csv = None
         self.display_emi_chart = ""
 
+    """
+    `run(self, *state)` method:
+        - This method runs the EMI screens as a loop. Each screen returns the next one as a `(method, *arguments)`
+        tuple instead of calling it, and returning None ends the loop.
+    """
+    def run(self, *state):
+        while state:
+            handler, *args = state
+            state = handler(*args)
+
     """
     `get_values(self, age, banking_path)` method: 
         - This method will get the required values from the Banking_Home_page class and stores it.
@@ -39,7 +56,7 @@ class EMI_Calculator:
             self.loan_detail_folder = self.create_loan_detail_folder(self.banking_path_loan)
         else:
             print("Parent file not existing.")
-        self.initial(self.current_age)
+        return (self.initial, self.current_age)
 
     """
     `initial(self, age)` method:
@@ -57,12 +74,12 @@ class EMI_Calculator:
                 print(self.loanTerm)
             else:
                 print("Please Enter the loan term in years like (1,3,5,12) etc.")
-                self.initial(age)
+                return (self.initial, age)
             # except
         else:
             print("You must be 18+ to take a loan.")
             # self.initial()
-        self.userInput_emi(age, self.loanTerm)
+        return (self.userInput_emi, age, self.loanTerm)
 
     """
     `validate_loan_amount(loanRequired)` static method:
@@ -95,78 +112,95 @@ class EMI_Calculator:
     """
     def calculate_emi_and_save_as_csv(self, age, interest, loanTerm, loanRequired):
         - This method calculate the Emi for the given loan Term and loan Amount they have taken.
+        - Its recorded latency includes the time the user spends paging through the schedule, `emi_schedule` is the
+        computation alone.
     """
+    @instrument("emi_calculate_and_save")
     def calculate_emi_and_save_as_csv(self, age, interest, loanTerm, loanRequired):
-        roi = interest / 12 / 100
-        totalMonths = loanTerm * 12
         print(f"Rate of Interest for General Citizens, with loan term less than 5 years will be {self.interestRate}")
-        ci = (1 + interest / 12 / 100) ** totalMonths
-        monthly_EMI = loanRequired * roi * ci / (ci - 1)
-        amountPayable = monthly_EMI * totalMonths
-        totalInterest = amountPayable - loanRequired
-        cur_amount_payable = babel.numbers.format_currency(amountPayable, 'INR', locale="en_IN")
-        cur_total_Interest = babel.numbers.format_currency(totalInterest, 'INR', locale="en_IN")
-        cur_monthly_EMI = babel.numbers.format_currency(monthly_EMI, 'INR', locale="en_IN")
+        # The rate is part of the name, as it is of the `ScheduleCache` key, so a quote at another rate gets its own file.
+        file_name = f"{loanTerm}_years_{loanRequired}_lakhs_{interest}_percent.csv"
+        self.loan_details_path_csv = self.loan_details_path + "\\" + file_name
+        file_exists = os.path.isfile(self.loan_details_path_csv)
+        # Repeated quotes come from the schedule cache, see `ScheduleCache`.
+        schedule = self.schedule_cache.get(loanRequired, interest, loanTerm)
+        monthly_EMI = schedule.monthly_emi
+        amountPayable = schedule.amount_payable
+        totalInterest = schedule.total_interest
+        cur_amount_payable = format_inr(amountPayable)
+        cur_total_Interest = format_inr(totalInterest)
+        cur_monthly_EMI = format_inr(monthly_EMI)
         print(f"Total Amount to be paid: {cur_amount_payable}")
         print(f"Interest to be paid: {cur_total_Interest}")
         print(f"EMI to be paid every month will be {cur_monthly_EMI}")
         current_date = datetime.datetime.now()
-        emi_table = PrettyTable()
-        emi_table.field_names = ['Month - Year', 'EMI', 'Principal Amount', 'Interest Amount',
-                                 'Balance Amount to pay']
-        remaining_principal = loanRequired
-        file_name = f"{loanTerm}_years_{loanRequired}_lakhs.csv"
-        self.loan_details_path_csv = self.loan_details_path + "\\" + file_name
-        if not os.path.isfile(self.loan_details_path_csv):
+        schedule_rows = self.iter_schedule_rows(schedule, current_date)
+        if not file_exists:
             with open(self.loan_details_path_csv, "a", newline="", encoding="utf-8") as mycsv:
                 myFile = csv.writer(mycsv)
                 myFile.writerow(
                     ['Month - Year', 'EMI (INR)', 'Principal Amount (INR)', 'Interest Amount (INR)',
                      'Balance Amount to pay (INR)'])
-                for i in range(totalMonths):
-                    interest_component = remaining_principal * roi
-                    cur_interest_component = babel.numbers.format_currency(interest_component, 'INR',
-                                                                           locale="en_IN")
-                    principal_component = monthly_EMI - interest_component
-                    cur_principal_component = babel.numbers.format_currency(principal_component, 'INR',
-                                                                            locale="en_IN")
-                    remaining_principal = remaining_principal - principal_component
-                    cur_remaining_principal = babel.numbers.format_currency(remaining_principal, 'INR',
-                                                                            locale="en_IN")
-                    next_month = current_date + datetime.timedelta(days=30 * i)
-                    cur_month_year = next_month.strftime("%b-%Y")
-
-                    myFile.writerow([str(cur_month_year), str(round(monthly_EMI, 2)),
-                                     str(round(principal_component, 2)),
-                                     str(round(interest_component, 2)), str(round(remaining_principal, 2))])
-                    emi_table.add_row(
-                        [str(cur_month_year), str(cur_monthly_EMI), str(cur_principal_component),
-                         str(cur_interest_component), str(cur_remaining_principal)])
-                self.display_emi_chart = emi_table
-                print(self.display_emi_chart)
+                self.display_schedule_pages(self.write_schedule_rows(schedule_rows, myFile, monthly_EMI),
+                                            cur_monthly_EMI)
+                if metrics.enabled:
+                    metrics.count("csv_bytes_written", mycsv.tell())
         else:
             print("File already exists!")
-            with open(self.loan_details_path_csv, "a", newline="", encoding="utf-8") as mycsv:
-                myFile = csv.writer(mycsv)
-                for i in range(totalMonths):
-                    interest_component = remaining_principal * roi
-                    cur_interest_component = babel.numbers.format_currency(interest_component, 'INR',
-                                                                           locale="en_IN")
-                    principal_component = monthly_EMI - interest_component
-                    cur_principal_component = babel.numbers.format_currency(principal_component, 'INR',
-                                                                            locale="en_IN")
-                    remaining_principal = remaining_principal - principal_component
-                    cur_remaining_principal = babel.numbers.format_currency(remaining_principal, 'INR',
-                                                                            locale="en_IN")
-                    next_month = current_date + datetime.timedelta(days=30 * i)
-                    cur_month_year = next_month.strftime("%b-%Y")
+            self.display_schedule_pages(schedule_rows, cur_monthly_EMI)
+        if file_exists:
+            return (self.userInput_emi, age, loanTerm)
+    """
+    `iter_schedule_rows(schedule, start_date)` static method:
+        - This method yields the (Month - Year, principal, interest, balance) rows of a schedule one at a time.
+    """
+    @staticmethod
+    def iter_schedule_rows(schedule, start_date):
+        return zip(schedule.month_labels(start_date), map(float, schedule.principal_components),
+                   map(float, schedule.interest_components), map(float, schedule.remaining_principal))
 
-                    emi_table.add_row(
-                        [str(cur_month_year), str(cur_monthly_EMI), str(cur_principal_component),
-                         str(cur_interest_component), str(cur_remaining_principal)])
+    """
+    `write_schedule_rows(rows, csv_writer, monthly_EMI)` static method:
+        - This method writes every schedule row to the loan CSV file as it passes through, and yields it on.
+    """
+    @staticmethod
+    def write_schedule_rows(rows, csv_writer, monthly_EMI):
+        for cur_month_year, principal_component, interest_component, remaining_principal in rows:
+            csv_writer.writerow([cur_month_year, str(round(monthly_EMI, 2)), str(round(principal_component, 2)),
+                                 str(round(interest_component, 2)), str(round(remaining_principal, 2))])
+            yield cur_month_year, principal_component, interest_component, remaining_principal
+
+    """
+    `display_schedule_pages(self, rows, cur_monthly_EMI)` method:
+        - This method prints the schedule `emi_page_size` months at a time, formatting only the rows on the page.
+        - After each page the user can continue or stop. The remaining rows are still consumed, so the CSV file is
+        always written in full.
+    """
+    def display_schedule_pages(self, rows, cur_monthly_EMI):
+        from prettytable import PrettyTable
+
+        show_pages = True
+        emi_table = None
+        for cur_month_year, principal_component, interest_component, remaining_principal in rows:
+            if not show_pages:
+                continue
+            if emi_table is None:
+                emi_table = PrettyTable()
+                emi_table.field_names = ['Month - Year', 'EMI', 'Principal Amount', 'Interest Amount',
+                                         'Balance Amount to pay']
+            emi_table.add_row(
+                [str(cur_month_year), str(cur_monthly_EMI), format_inr(principal_component),
+                 format_inr(interest_component), format_inr(remaining_principal)])
+            if len(emi_table.rows) == self.emi_page_size:
+                print(emi_table)
                 self.display_emi_chart = emi_table
-                print(self.display_emi_chart)
-            self.userInput_emi(age, loanTerm)
+                emi_table = None
+                if input("Press Enter for the next page, or Q to stop: ").strip().lower() == "q":
+                    show_pages = False
+        if emi_table is not None:
+            print(emi_table)
+            self.display_emi_chart = emi_table
+
     """
     `create_loan_detail_folder(self,banking_path)`: Creates a "LoanDetails" folder inside the "Banking" folder and returns the path.
     """
@@ -206,76 +240,70 @@ class EMI_Calculator:
                 option = "4"
 
             if option == "1":
-                self.Student(age, loanTerm)
+                return (self.Student, age, loanTerm)
             elif option == "2":
-                self.SeniorCitizen(age, loanTerm)
+                return (self.SeniorCitizen, age, loanTerm)
             elif option == "3":
-                self.GeneralCitizen(age, loanTerm)
+                return (self.GeneralCitizen, age, loanTerm)
             elif option == "4":
                 print("Thank you, Visit again!")
-                sys.exit()
+                return None
             else:
                 print("Please select the correct option")
-                self.userInput_emi(age, loanTerm)
+                return (self.userInput_emi, age, loanTerm)
         except KeyboardInterrupt:
             print("Keyboard Interrupted")
-            self.userInput_emi(age, loanTerm)
+            return (self.userInput_emi, age, loanTerm)
         except ValueError:
             print("Invalid Key")
-            self.initial(age)
+            return (self.initial, age)
 
     def Student(self, age, loanTerm):
         try:
             self.loanAmount = 1000000
-            self.loanAmount = babel.numbers.format_currency(self.loanAmount, 'INR', locale="en_IN")
+            self.loanAmount = format_inr(self.loanAmount)
             print(f"Loan Sanction for students in {self.loanAmount}")
             loanRequired = input("How much loan do you want to take? Minimum Loan must be 1 lakh.")
             if self.validate_loan_amount(loanRequired):
                 loanRequired = int(loanRequired)
                 print("Loan amount is valid.")
-                if age < 22 and loanTerm < 5:
-                    self.interestRate = 6
-                    self.calculate_emi_and_save_as_csv(age, self.interestRate, loanTerm, loanRequired)
-                elif age < 22 and loanTerm >= 5:
-                    self.interestRate = 8
-                    self.calculate_emi_and_save_as_csv(age, self.interestRate, loanTerm, loanRequired)
+                if age < STUDENT_MAXIMUM_AGE:
+                    self.interestRate = loan_interest_rate(age, loanTerm)
+                    return (self.calculate_emi_and_save_as_csv, age, self.interestRate, loanTerm, loanRequired)
                 else:
                     print("Your age should be less than 22 to get the student loan")
                     # self.initial()
             else:
                 print("Invalid loan amount. Minimum loan amount should be 1 lakh.")
-                self.Student(age, loanTerm)
+                return (self.Student, age, loanTerm)
         except KeyboardInterrupt:
             print("Keyboard Interrupted")
-            self.initial(age)
+            return (self.initial, age)
         except ValueError:
             print("Invalid Key")
-            self.initial(age)
+            return (self.initial, age)
 
     def SeniorCitizen(self, age, loanTerm):
         try:
             self.loanAmount = 1500000
-            self.loanAmount = babel.numbers.format_currency(self.loanAmount, 'INR', locale="en_IN")
+            self.loanAmount = format_inr(self.loanAmount)
             print(f"Loan Sanction for senior citizens in {self.loanAmount}")
             loanRequired = input("How much loan do you want to take? Minimum Loan must be 1 lakh.")
             if self.validate_loan_amount(loanRequired):
                 loanRequired = int(loanRequired)
                 print("Loan amount is valid.")
-                if age >= 58 and loanTerm < 5:
-                    self.interestRate = 8
-                    self.calculate_emi_and_save_as_csv(age, self.interestRate, loanTerm, loanRequired)
-                elif age >= 58 and loanTerm >= 5:
-                    self.interestRate = 10
-                    self.calculate_emi_and_save_as_csv(age, self.interestRate, loanTerm, loanRequired)
+                if age >= SENIOR_CITIZEN_AGE:
+                    self.interestRate = loan_interest_rate(age, loanTerm)
+                    return (self.calculate_emi_and_save_as_csv, age, self.interestRate, loanTerm, loanRequired)
             else:
                 print("Invalid loan amount. Minimum loan amount should be 1 lakh.")
-                self.SeniorCitizen(age, loanTerm)
+                return (self.SeniorCitizen, age, loanTerm)
         except KeyboardInterrupt:
             print("Keyboard Interrupted")
-            self.initial(age)
+            return (self.initial, age)
         except ValueError:
             print("Invalid Key")
-            self.initial(age)
+            return (self.initial, age)
 
     def GeneralCitizen(self, age, loanTerm):
         try:
@@ -283,30 +311,27 @@ class EMI_Calculator:
             max_loanAmount = 2500000
             Salary_loanAmount = self.salary * 10
             self.loanAmount = Salary_loanAmount if max_loanAmount < Salary_loanAmount else max_loanAmount
-            self.loanAmount = babel.numbers.format_currency(self.loanAmount, 'INR', locale="en_IN")
+            self.loanAmount = format_inr(self.loanAmount)
             print(f"Loan Sanction for general citizens in {self.loanAmount}")
             loanRequired = input("How much loan do you want to take? Minimum Loan must be 1 lakh.")
             if self.validate_loan_amount(str(loanRequired)):
                 loanRequired = int(loanRequired)
                 print("Loan amount is valid.")
-                if 22 <= age < 58 and loanTerm < 5:
-                    self.interestRate = 12
-                    self.calculate_emi_and_save_as_csv(age, self.interestRate, loanTerm, loanRequired)
-                elif 22 <= age < 58 and loanTerm >= 5:
-                    self.interestRate = 14
-                    self.calculate_emi_and_save_as_csv(age, self.interestRate, loanTerm, loanRequired)
+                if STUDENT_MAXIMUM_AGE <= age < SENIOR_CITIZEN_AGE:
+                    self.interestRate = loan_interest_rate(age, loanTerm)
+                    return (self.calculate_emi_and_save_as_csv, age, self.interestRate, loanTerm, loanRequired)
                 else:
                     print("Your age should be between 22 and 58 to get the general citizen loan")
                     # self.initial()
             else:
                 print("Invalid loan amount. Minimum loan amount should be 1 lakh.")
-                self.GeneralCitizen(age, loanTerm)
+                return (self.GeneralCitizen, age, loanTerm)
         except KeyboardInterrupt:
             print("Keyboard Interrupted")
-            self.initial(age)
+            return (self.initial, age)
         except ValueError:
             print("Invalid Key")
-            self.initial(age)
+            return (self.initial, age)
 
 
 # emi_calculator = EMI_Calculator()
@@ -0,0 +1,130 @@
+import contextlib
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl, msvcrt only offers exclusive byte-range locks.
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+"""
+`FileLock` class:
+   - This class is an advisory lock shared by every process that works on the same user details file. It locks a
+    `<file>.lock` file next to it with `fcntl.flock`, so the data file itself can still be replaced with `os.replace`.
+   - Writers hold the lock exclusively, readers hold it shared, so several tellers can read at once while writes are
+    serialized.
+   - The lock is reentrant within a process: a shared request inside an exclusive section keeps the exclusive lock, and
+    an exclusive request inside a shared section upgrades it until the inner section ends.
+   - Without `fcntl` the lock falls back to an exclusive `msvcrt` lock, and to a process-local lock when neither exists.
+"""
+
+
+class FileLock:
+    def __init__(self, path):
+        self.lock_file = path + ".lock"
+        self.handle = None
+        self.modes = []
+        self.thread_lock = threading.RLock()
+
+    def lock_handle(self, exclusive):
+        if fcntl is not None:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        elif msvcrt is not None and not self.modes:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    def unlock_handle(self):
+        if fcntl is not None:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def acquire(self, exclusive=True):
+        self.thread_lock.acquire()
+        try:
+            exclusive = exclusive or bool(self.modes and self.modes[-1])
+            if self.handle is None:
+                self.handle = open(self.lock_file, "a+")
+            if not self.modes or self.modes[-1] != exclusive:
+                self.lock_handle(exclusive)
+        except BaseException:
+            if not self.modes and self.handle is not None:
+                self.handle.close()
+                self.handle = None
+            self.thread_lock.release()
+            raise
+        self.modes.append(exclusive)
+
+    def release(self):
+        exclusive = self.modes.pop()
+        try:
+            if not self.modes:
+                self.unlock_handle()
+                self.handle.close()
+                self.handle = None
+            elif self.modes[-1] != exclusive:
+                self.lock_handle(self.modes[-1])
+        finally:
+            self.thread_lock.release()
+
+    @contextlib.contextmanager
+    def exclusive(self):
+        self.acquire(exclusive=True)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    @contextlib.contextmanager
+    def shared(self):
+        self.acquire(exclusive=False)
+        try:
+            yield self
+        finally:
+            self.release()
+
+
+"""
+`atomic_write(path, fsync=False)`: Opens a temporary file in the same directory as `path` for writing, and moves it over
+`path` with `os.replace` once the block finishes without an error.
+    - Because the temporary file is on the same filesystem the replace is a rename, readers see either the old or the
+    new file, never a half-written one. On an error the temporary file is removed and `path` is left untouched.
+    - With `fsync=True` the data is flushed to disk before the rename, and the directory entry after it.
+"""
+
+
+@contextlib.contextmanager
+def atomic_write(path, fsync=False):
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_file = tempfile.NamedTemporaryFile(
+        mode="w", newline="", dir=directory, prefix=".tmp-", suffix=".csv", delete=False
+    )
+    try:
+        with temp_file:
+            yield temp_file
+            if fsync:
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+        os.replace(temp_file.name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_file.name)
+        raise
+    if fsync:
+        sync_directory(directory)
+
+
+def sync_directory(directory):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
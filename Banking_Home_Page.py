@@ -1,13 +1,22 @@
 import os
-import sys
-import random
-import re
-import csv
-from datetime import date, datetime
-import shutil
-import tempfile
+from Banking_Account_Records import MalformedBalanceError
+from Banking_Account_Rules import calculate_age, field_error
+from Banking_Api import AccountNotFoundError, BankingApi, BankingError, TransactionRuleError, ValidationError
 from Banking_Emi_Calculation import EMI_Calculator
-from prettytable import PrettyTable
+from Banking_Metrics import metrics
+from Banking_Sharded_Storage import ShardedStorage, split_csv_into_shards
+from Banking_Storage import ACCOUNT_FIELDNAMES, CSVStorage, SQLiteStorage, migrate_csv_to_sqlite
+from Banking_Transaction_Rules import MINIMUM_BALANCE
+
+
+"""
+`ReturnToMenu` exception:
+   - Raised by a helper method to abandon the current screen, the menu loop in `run` then shows the main menu again.
+"""
+
+
+class ReturnToMenu(Exception):
+    pass
 
 
 """
@@ -19,7 +28,7 @@ from prettytable import PrettyTable
 
 
 class BankingSystem(EMI_Calculator):
-    def __init__(self):  # Constructor for the Class BankingSystem
+    def __init__(self, journal_mode=False, storage_engine="csv", offset_index=False, balance_file=False):  # Constructor for the Class BankingSystem
         super(BankingSystem, self).__init__()
         self.accountInfo = {}
         self.userInfo = {}
@@ -33,32 +42,29 @@ class BankingSystem(EMI_Calculator):
         self.user_details_path = os.path.join(self.banking_path, "UserDetails")
         self.user_detail_path_csv = self.create_user_detail_folder()
         self.user_details_csv_file = self.user_detail_path_csv + "\\" + "User_details.csv"
+        self.user_details_db_file = self.user_detail_path_csv + "\\" + "User_details.db"
+        self.user_details_shards = self.user_detail_path_csv + "\\" + "Shards"
+        # Every read and write of account data goes through the storage backend selected here.
+        if storage_engine == "sqlite":
+            # Switching an existing branch to SQLite copies its customers over once, when the database is created.
+            if not os.path.isfile(self.user_details_db_file) and os.path.isfile(self.user_details_csv_file):
+                count = migrate_csv_to_sqlite(self.user_details_csv_file, self.user_details_db_file)
+                print(f"{count} accounts copied from User_details.csv into User_details.db")
+            self.storage = SQLiteStorage(self.user_details_db_file)
+        elif storage_engine == "sharded":
+            # As for SQLite, an existing branch's customers are split into shards once, when the shards are created.
+            if not os.path.isdir(self.user_details_shards) and os.path.isfile(self.user_details_csv_file):
+                count = split_csv_into_shards(self.user_details_csv_file, self.user_details_shards)
+                print(f"{count} accounts copied from User_details.csv into Shards")
+            self.storage = ShardedStorage(self.user_details_shards, journal_mode=journal_mode,
+                                          offset_index=offset_index, balance_file=balance_file)
+        else:
+            self.storage = CSVStorage(self.user_details_csv_file, journal_mode, offset_index=offset_index,
+                                      balance_file=balance_file)
+        # The menu only collects input and prints results, every operation is carried out by the API.
+        self.api = BankingApi(self.storage)
         self.emi_obj = EMI_Calculator()
 
-    """
-    `account_exist(self, accountNumber)`: Checks if an account number already exists in the user details CSV file.
-    """
-    def account_exist(self, accountNumber):
-        """
-        This function checks for the Account Number present in the csv file.
-        If Account Number already exists, it will regenerate the Account Number one more time.
-        """
-        try:
-            file_exists = os.path.exists(self.user_details_csv_file)
-            if file_exists:
-                with open(self.user_details_csv_file, "r") as read_csv:
-                    reader = csv.DictReader(read_csv)
-                    for row in reader:
-                        if row["ACCOUNTNUMBER"] != accountNumber:
-                            return True
-                        return False
-            else:
-                print("No such file or directory. Please create a new account. ")
-                return True
-        except OSError as e:
-            print(f"Error occurred while creating the CSV file: {e}")
-            self.index()
-
     """
     `validate_phone_number(phone_number)`: Validates a phone number to ensure it consists of only digits.
     """
@@ -70,112 +76,14 @@ class BankingSystem(EMI_Calculator):
             return False
 
     """
-    `get_phone_number_from_csv(self)`: Retrieves all phone numbers from the user details CSV file and returns them as a list.
-    """
-    def get_phone_number_from_csv(self):
-        try:
-            with open(self.user_details_csv_file, "r") as readFile:
-                reader = csv.DictReader(readFile)
-                phone_numbers = [row["PHONENUMBER"] for row in reader]
-            return phone_numbers
-        except FileNotFoundError:
-            print("File not found in the given path, Please try to create a new file.")
-
-    """
-        `get_account_number(self, phone_number)`: Retrieves the account number associated with a given phone number from the user details CSV file.
+        `find_account(self, phone_number)`: Returns the account number registered with a phone number, or None.
     """
-    def get_account_number(self, phone_number):
+    def find_account(self, phone_number):
         try:
-            with open(self.user_details_csv_file, "r") as readFile:
-                reader = csv.DictReader(readFile)
-                for row in reader:
-                    if row["PHONENUMBER"] == phone_number:
-                        return row["ACCOUNTNUMBER"]
+            return self.api.get_account_by_phone(phone_number).ACCOUNTNUMBER
+        except AccountNotFoundError:
             return None
-        except OSError as e:
-            print(f"Error occurred while creating the CSV file: {e}")
-            self.index()
-
-    """
-        `calculate_age(dob)`: Calculates the age based on the provided date of birth.
-    """
-    @staticmethod
-    def calculate_age(dob):
-        """This method will calculate the age, using the given DOB."""
-        # Convert the DOB string to a datetime object
-        born = datetime.strptime(dob, "%Y-%m-%d")
-        today = date.today()
-        age = (
-            today.year - born.year - ((today.month, today.day) < (born.month, born.day))
-        )
-        return age
 
-    """
-        `get_current_balance(self, accNumber)`: Retrieves the current balance for a given account number from the user details CSV file.
-    """
-    def get_current_balance(self, accNumber):
-        try:
-            """This method will return the Current Balance for the given Account Number."""
-            with open(self.user_details_csv_file, "r") as Edit_csv:
-                reader = csv.DictReader(Edit_csv)
-                for val in reader:
-                    if val["ACCOUNTNUMBER"] == accNumber:
-                        current_Balance = val["AMOUNT"]
-                        return current_Balance
-        except FileNotFoundError:
-            print("File not found in the given path. Try creating new.")
-
-    """
-        `update_user_details(self, account_number, updating_column, value)`: Updates a specific column value in the user details CSV file for a given account number.
-    """
-    def update_user_details(self, account_number, updating_column, value):
-        """This method will update the user details. Here we used temporary file and shutil package to update."""
-        try:
-            temp_file = tempfile.NamedTemporaryFile(mode="w", newline="", delete=False)
-            with open(self.user_details_csv_file, "r") as csvfile, temp_file:
-                reader = csv.DictReader(csvfile)
-                fieldnames = reader.fieldnames
-                writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                writer.writeheader()
-                for row in reader:
-                    if row["ACCOUNTNUMBER"] == account_number:
-                        row[updating_column] = value
-                    writer.writerow(row)
-            shutil.move(temp_file.name, self.user_details_csv_file)
-        except PermissionError:
-            print(
-                "File has already been opened. Please try to update after closing the file. Thanks!"
-            )
-        except FileNotFoundError:
-            print("File not found in the given path.")
-    """
-        `update_amount(self, accountNumber, Initial_Account_Balance)`: Updates the amount column in the user details CSV file for a given account number.
-    """
-    def update_amount(self, accountNumber, Initial_Account_Balance):
-        """
-        This method will update the amount column after Transactions.
-        Here we used temporary file and shutil package to update.
-        """
-
-        try:
-            temp_file = tempfile.NamedTemporaryFile(mode="w", newline="", delete=False)
-            with open(self.user_details_csv_file, "r") as csvfile, temp_file:
-                reader = csv.DictReader(csvfile)
-                fieldnames = reader.fieldnames
-                writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                writer.writeheader()
-                for row in reader:
-                    if row["ACCOUNTNUMBER"] == accountNumber:
-                        row["AMOUNT"] = Initial_Account_Balance
-                    writer.writerow(row)
-            shutil.move(temp_file.name, self.user_details_csv_file)
-            print("Amount updated successfully!")
-        except PermissionError:
-            print(
-                "File has already been opened. Please try to update after closing the file. Thanks!"
-            )
-        except FileNotFoundError:
-            print("File not found in the given path.")
     """
         `folder_creation(self)`: Creates a "Banking" folder on the desktop and returns the path.
     """
@@ -221,6 +129,36 @@ class BankingSystem(EMI_Calculator):
             print("File not found in the given path.")
         except PermissionError:
             print("You dont have permission to create a file or directory to this path.")
+    """
+        `run(self, *state)`: Runs the menu as a loop-driven state machine.
+           - Every screen (`index`, `Transaction`, `Edit_Account`, ...) returns the next screen as a
+           `(method, *arguments)` tuple instead of calling it, so the stack does not grow over a long session.
+           - Returning None from a screen leaves the loop.
+           - Invalid keys and other input errors raised inside a screen bring back the main menu, the same way the
+           handlers in `index` treat them.
+    """
+    def run(self, *state):
+        state = state or (self.index,)
+        while state:
+            handler, *args = state
+            try:
+                with metrics.action(handler.__name__):
+                    state = handler(*args)
+            except ReturnToMenu:
+                state = (self.index,)
+            except MalformedBalanceError as e:
+                print(e)
+                state = (self.index,)
+            except ValueError:
+                print("Invalid Key")
+                state = (self.index,)
+            except TypeError as e:
+                print(f"{e}")
+                state = (self.index,)
+            except KeyboardInterrupt:
+                print("Keyboard Interrupted")
+                state = None
+
     """
         `index(self)`: Displays the main menu and handles user input for various banking operations.
     """
@@ -228,7 +166,8 @@ class BankingSystem(EMI_Calculator):
     """
         `continue_or_exit(self)` method:
            - This method prompts the user to choose whether to continue using the banking system or exit the program.
-           - It takes user input and returns `True` if the user wants to continue or `False` if the user chooses to exit.
+           - It takes user input and returns the `Transaction` screen if the user wants to continue, or the main menu if
+           the user chooses to exit.
         """
 
     def continue_or_exit(self, account):
@@ -240,15 +179,15 @@ class BankingSystem(EMI_Calculator):
                 """
             )
             if user_choice == "1":
-                self.Transaction(account)
+                return (self.Transaction, account)
             elif user_choice == "2":
-                self.index()
+                return (self.index,)
             else:
                 print("Invalid option selected")
-                self.continue_or_exit(account)
+                return (self.continue_or_exit, account)
         except OSError as e:
             print(f"Error occurred while creating the CSV file: {e}")
-            self.index()
+            return (self.index,)
 
     def index(self):
         # The program starts with a menu-driven 'index()' function that allows users to select various
@@ -270,103 +209,87 @@ class BankingSystem(EMI_Calculator):
             )
 
             if option == 1:
-                self.Account_Creation()
+                return (self.Account_Creation,)
             elif option == 2:
                 phone_verification = input("Please Enter your Phone Number to verify: ")
                 if self.validate_phone_number(phone_verification):
-                    phone_numbers = self.get_phone_number_from_csv()
-                    if phone_verification in phone_numbers:
-                        account_verification = self.get_account_number(
-                            phone_verification
-                        )
-                        self.Transaction(account_verification)
+                    account_verification = self.find_account(phone_verification)
+                    if account_verification is not None:
+                        return (self.Transaction, account_verification)
                     else:
                         print(
                             "Phone Number doesn't exist! Please enter the correct Phone Number to verify your account."
                         )
-                        self.index()
+                        return (self.index,)
                 else:
                     print("Invalid Phone Number")
-                    self.index()
+                    return (self.index,)
             elif option == 3:
                 phone_verification = input("Please Enter your Phone Number to verify: ")
                 if self.validate_phone_number(phone_verification):
-                    phone_numbers = self.get_phone_number_from_csv()
-                    if phone_verification in phone_numbers:
-                        account_verification = self.get_account_number(
-                            phone_verification
-                        )
-                        self.Edit_Account(account_verification)
+                    account_verification = self.find_account(phone_verification)
+                    if account_verification is not None:
+                        return (self.Edit_Account, account_verification)
                     else:
                         print(
                             "Phone Number doesn't exist! Please enter the correct Phone Number to verify your account."
                         )
-                        self.index()
+                        return (self.index,)
                 else:
                     print("Invalid Phone Number")
-                    self.index()
+                    return (self.index,)
 
             elif option == 4:
                 phone_verification = input("Please Enter your Phone Number to verify: ")
                 if self.validate_phone_number(phone_verification):
-                    phone_numbers = self.get_phone_number_from_csv()
-                    if phone_verification in phone_numbers:
-                        account_verification = self.get_account_number(
-                            phone_verification
-                        )
-                        self.display_account(account_verification)
+                    account_verification = self.find_account(phone_verification)
+                    if account_verification is not None:
+                        return (self.display_account, account_verification)
                     else:
                         print(
                             "Phone Number doesn't exist! Please enter the correct Phone Number to View your account "
                             "details."
                         )
-                        self.index()
+                        return (self.index,)
                 else:
                     print("Invalid Phone Number")
-                    self.index()
+                    return (self.index,)
             elif option == 5:
                 print("Thanks for choosing the E-con Loans, please verify yourself.")
                 phone_verification = input("Enter your Phone Number: ")
                 if self.validate_phone_number(phone_verification):
-                    phone_numbers = self.get_phone_number_from_csv()
-                    if phone_verification in phone_numbers:
-                        account_verification = self.get_account_number(
-                            phone_verification
-                        )
-                        with open(self.user_details_csv_file, "r") as read_csv:
-                            reader = csv.DictReader(read_csv)
-                            for row in reader:
-                                row = dict(row)
-                                if row["ACCOUNTNUMBER"] == account_verification:
-                                    current_age = row["AGE"]
-                                    self.emi_obj.get_values(current_age, str(self.banking_path))
-
+                    account_verification = self.find_account(phone_verification)
+                    if account_verification is not None:
+                        current_age = self.api.get_account(account_verification).AGE
+                        self.emi_obj.run(self.emi_obj.get_values, current_age, str(self.banking_path))
+                        return (self.index,)
                     else:
                         print(
                             "Phone Number doesn't exist! Please enter the correct Phone Number to View your account "
                             "details."
                         )
 
-                        self.index()
+                        return (self.index,)
                 else:
                     print("Invalid Phone Number")
-                    self.index()
+                    return (self.index,)
             elif option == 6:
                 print("Thank you, Visit again!")
-                sys.exit()  # sys.exit() to stop execution
+                return None  # leaving the menu loop stops the program
             else:
                 print("Please select the correct option")
-                self.index()
+                return (self.index,)
         except OSError as e:
             print(f"Error occurred while creating the CSV file: {e}")
-            self.index()
+            return (self.index,)
         except KeyboardInterrupt:
             print("Keyboard Interrupted")
         except ValueError:
             print("Invalid Key")
-            self.index()
+            return (self.index,)
         except TypeError as e:
             print(f"{e}")
+            return (self.index,)
 
     """
     Validate() is used to validate the FirstName, LastName, Email, Amount, Gender, PhoneNumber, Profession, Age
@@ -375,61 +298,19 @@ class BankingSystem(EMI_Calculator):
 
     def validate(self, key, val, index):
         try:
-
+            error = field_error(key, val)
+            if error is None:
+                return val
+            print(error)
             if key == "AGE":
-                if val.isdigit() and int(val) <= 130:
-                    if int(val) >= 18:
-                        return val
-                    elif int(val) < 18 and val != 0:
-                        print(
-                            "Sorry! your age must be greater than 18 to create an account "
-                        )
-                        return self.inputs("DATE_OF_BIRTH", 2)
-                    else:
-                        print("Age must not be zero")
-                        return self.inputs(key, index)
-                else:
-                    print("Please input the valid Age")
-                    return self.inputs(key, index)
-            elif key == "AMOUNT":
-                if val.isdigit() and int(val) >= 500:
-                    return val
-                else:
-                    print("Minimum deposit amount will be 500 or more")
-                    return self.inputs(key, index)
-            elif key == "PHONENUMBER":
-                pattern = r"^\d{10}$"  # Assuming a 10-digit phone number format
-                if re.match(pattern, val):
-                    return val
-                else:
-                    print("Please enter only a 10-digit phone number")
-                    return self.inputs(key, index)
-            elif key == "EMAIL":
-                pattern = r"^[a-zA-Z]+[a-zA-Z0-9]*@[a-zA-Z]+\.[a-zA-Z]{2,3}$"
-                if re.match(pattern, val):
-                    return val
-                else:
-                    print("Email address must contain A-Z, a-z, @, . are Mandatory")
-                    return self.inputs(key, index)
-            elif key == "DATE_OF_BIRTH":
-                date_pattern = r"^\d{4}-\d{1,2}-\d{1,2}$"
-                if re.match(date_pattern, val):
-                    return val
-                else:
-                    print("Enter the Date of Birth in mention format.")
-                    return self.inputs(key, index)
-                pass
-            elif key in ["FIRSTNAME", "LASTNAME", "GENDER", "PROFESSION"]:
-                pattern = r"^[a-zA-Z\s]+$"
-                if re.match(pattern, val):
-                    return val
-                else:
-                    return self.inputs(key, index)
-            else:
-                print("Keyword not matched..")
+                # The age comes from the date of birth, so that is what has to be entered again.
+                self.userInfo["DATE_OF_BIRTH"] = self.inputs("DATE_OF_BIRTH", 2)
+                return self.inputs(key, index)
+            elif key in ACCOUNT_FIELDNAMES:
+                return self.inputs(key, index)
         except OSError as e:
             print(f"Error occurred while creating the CSV file: {e}")
-            self.index()
+            raise ReturnToMenu
 
     # `userinput(self)`: Collects user input for creating a new account and validates the inputs.
     def userinput(self):
@@ -440,7 +321,7 @@ class BankingSystem(EMI_Calculator):
             return self.userInfo
         except OSError as e:
             print(f"Error occurred while creating the CSV file: {e}")
-            self.index()
+            raise ReturnToMenu
 
     # `inputs(self, key, index)`: Handles user input for a specific data field and calls the appropriate validation method.
     def inputs(self, key, index):
@@ -464,19 +345,13 @@ class BankingSystem(EMI_Calculator):
                 elif opt == "4":
                     return "Not mention"
                 elif opt == "5":
-                    self.inputs("GENDER", 3)
+                    return self.inputs("GENDER", 3)
                 else:
                     print("Invalid option selected")
-                    self.inputs("GENDER", 3)
+                    return self.inputs("GENDER", 3)
             elif key == "ACCOUNTNUMBER":
-                while True:
-                    current_year = datetime.now().year % 100
-                    current_month = datetime.now().strftime("%m")
-                    self.accountNumber = random.randint(100000, 10 ** 6)
-                    if self.account_exist(self.accountNumber):
-                        self.accountNumber = f"{current_year}{current_month}{self.accountNumber}"
-                        return self.accountNumber
-                    break
+                self.accountNumber = self.api.new_account_number()
+                return self.accountNumber
 
             elif key == "DATE_OF_BIRTH":
                 print("Please Enter the DOB in 'yyyy-mm-dd' format.")
@@ -484,7 +359,7 @@ class BankingSystem(EMI_Calculator):
                 self.validated_dob = self.validate(key, DoB, index)
                 return self.validated_dob
             elif key == "AGE":
-                age = str(self.calculate_age(self.validated_dob))
+                age = str(calculate_age(self.validated_dob))
                 validated_age = self.validate(key, age, index)
                 return validated_age
 
@@ -498,26 +373,35 @@ class BankingSystem(EMI_Calculator):
                 return validated_value
         except OSError as e:
             print(f"Error occurred while creating the CSV file: {e}")
-            self.index()
+            raise ReturnToMenu
 
     """
-        `addingDataToCsv(self, file_exists, user_account, fieldnames)`: Adds the user account details to the user details CSV file.
+        `addingDataToCsv(self, user_account)`: Creates the account from the collected details through `BankingApi`.
     """
-    def addingDataToCsv(self, file_exists, user_account, fieldnames):
+    def addingDataToCsv(self, user_account):
         try:
-            with open(self.user_details_csv_file, "a", newline="") as csvFile:
-                writer = csv.DictWriter(csvFile, fieldnames=fieldnames)
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(user_account)
+            self.api.create_account(
+                user_account["FIRSTNAME"],
+                user_account["LASTNAME"],
+                user_account["DATE_OF_BIRTH"],
+                user_account["GENDER"],
+                user_account["PROFESSION"],
+                user_account["PHONENUMBER"],
+                user_account["EMAIL"],
+                user_account["AMOUNT"],
+                account_number=user_account["ACCOUNTNUMBER"],
+            )
             print(
                 """Account Created Successfully! Use your Phone Number to login and make transaction, Edit your
                 information or to view you View account details"""
             )
-            self.index()
+            return (self.index,)
+        except BankingError as e:
+            print(e)
+            return (self.index,)
         except OSError as e:
             print("Data not found. Please create a new account to make this operation")
-            self.index()
+            return (self.index,)
 
     """
     1. Account creation:
@@ -542,13 +426,11 @@ class BankingSystem(EMI_Calculator):
             "AMOUNT": "",
         }
         userAccounts = self.userinput()
-        fieldnames = list(self.userInfo.keys())
-        file_exists = os.path.isfile(self.user_details_csv_file)
         try:
-            self.addingDataToCsv(file_exists, userAccounts, fieldnames)
+            return self.addingDataToCsv(userAccounts)
         except PermissionError:
             print("Your file is open. Please close the file before adding new data.")
-            self.index()
+            return (self.index,)
 
     """
     2. Transaction:
@@ -569,6 +451,8 @@ class BankingSystem(EMI_Calculator):
                 Press 2 to "Withdraw Money"
                 Press 3 to "View Balance"
                 Press 4 to "For Exit"
+                Press 5 to "Transfer Money"
+                Press 6 to "Account Statement"
                 """
                 )
             )
@@ -576,63 +460,95 @@ class BankingSystem(EMI_Calculator):
             if (
                 Transit_Selection == 1
             ):  # this condition will execute to add money to the existing balance
-                Initial_Account_Balance = int(self.get_current_balance(account))
                 Deposit_Amount = int(input("Enter the amount to be Deposited: "))
-                if Deposit_Amount >= 100:
-                    Initial_Account_Balance += Deposit_Amount
-                    print("Amount has been deposited successfully")
-                    print(f"Your current balance is: {Initial_Account_Balance}")
-                    self.update_amount(account, Initial_Account_Balance)
-                    # self.accountInfo[account]["AMOUNT"] = Initial_Account_Balance
-                    self.continue_or_exit(account)
-                else:
-                    print("Minimum Amount to be deposited will be more than 100")
-                    self.Transaction(account)
+                try:
+                    result = self.api.deposit(account, Deposit_Amount)
+                except TransactionRuleError as e:
+                    print(e)
+                    return (self.Transaction, account)
+                print("Amount has been deposited successfully")
+                print(f"Your current balance is: {result.balance}")
+                print("Amount updated successfully!")
+                return (self.continue_or_exit, account)
 
             elif (
                 Transit_Selection == 2
             ):  # this condition will execute to withdraw money from the existing balance
-                minimum_balance = 1000
-                Initial_Account_Balance = int(self.get_current_balance(account))
+                Initial_Account_Balance = self.api.get_balance(account)
                 print(f"Your current balance is: {Initial_Account_Balance}")
-                if Initial_Account_Balance >= 1000:
+                if Initial_Account_Balance >= MINIMUM_BALANCE:
                     Withdraw_Money = int(input("Please Enter the Amount to be withdrawn: "))
-                    if Withdraw_Money >= 100:
-                        if Withdraw_Money < Initial_Account_Balance:
-                            Initial_Account_Balance -= Withdraw_Money
-                            if Initial_Account_Balance >= minimum_balance:
-                                print(f"{Withdraw_Money} is be debited from your account")
-                                self.update_amount(account, Initial_Account_Balance)
-                                currentBalance = int(self.get_current_balance(account))
-                                print(f"Your current balance is: {currentBalance}")
-                                self.Transaction(account)
-                            else:
-                                print(f"Minimum Balance should be {minimum_balance}. ")
-                                self.Transaction(account)
-                        else:
-                            print(f"Minimum Balance should be {minimum_balance}. ")
-                            self.Transaction(account)
-                    else:
-                        print("Minimum amount to be withdrawn must be 100 or more.")
-                        self.Transaction(account)
+                    try:
+                        result = self.api.withdraw(account, Withdraw_Money)
+                    except TransactionRuleError as e:
+                        print(e)
+                        return (self.Transaction, account)
+                    print(f"{Withdraw_Money} is be debited from your account")
+                    print("Amount updated successfully!")
+                    print(f"Your current balance is: {result.balance}")
+                    return (self.Transaction, account)
                 else:
                     print("Insufficient Balance")
-                    self.Transaction(account)
+                    return (self.Transaction, account)
 
             elif Transit_Selection == 3:
-                Initial_Account_Balance = int(self.get_current_balance(account))
+                Initial_Account_Balance = self.api.get_balance(account)
                 print(f"Your current balance is: {Initial_Account_Balance}")
-                self.continue_or_exit(account)
+                return (self.continue_or_exit, account)
 
             elif Transit_Selection == 4:
-                self.index()
+                return (self.index,)
+
+            elif Transit_Selection == 5:  # this condition will move money from this account to another account
+                to_account = input("Enter the Account Number to transfer to: ").strip()
+                Transfer_Amount = int(input("Enter the amount to be Transferred: "))
+                try:
+                    result = self.api.transfer(account, to_account, Transfer_Amount)
+                except (TransactionRuleError, ValidationError) as e:
+                    print(e)
+                    return (self.Transaction, account)
+                except AccountNotFoundError:
+                    print(f"Account Number {to_account} doesn't exist")
+                    return (self.Transaction, account)
+                print(f"{Transfer_Amount} has been transferred to {to_account}")
+                print(f"Your current balance is: {result.from_balance}")
+                return (self.continue_or_exit, account)
+
+            elif Transit_Selection == 6:  # this condition will list the transactions of a date range
+                print("Please Enter the dates in 'yyyy-mm-dd' format, or leave them empty for the whole history.")
+                start_date = input("Statement from: ").strip()
+                end_date = input("Statement to: ").strip()
+                try:
+                    entries = self.api.statement(account, start_date, end_date)
+                except ValidationError as e:
+                    print(e)
+                    return (self.Transaction, account)
+                if not entries:
+                    print("No transactions in the selected period")
+                    return (self.continue_or_exit, account)
+                from prettytable import PrettyTable
+
+                table = PrettyTable()
+                table.field_names = ["DATE", "TYPE", "AMOUNT", "BALANCE", "COUNTERPARTY"]
+                for entry in entries:
+                    table.add_row([f"{entry.timestamp:%Y-%m-%d %H:%M:%S}"] + list(entry[1:]))
+                print(table)
+                return (self.continue_or_exit, account)
 
             else:
                 print("Please select the correct option")
-                self.Transaction(account)
+                return (self.Transaction, account)
+        except AccountNotFoundError as e:
+            print(e)
+            return (self.index,)
+        except PermissionError:
+            print(
+                "File has already been opened. Please try to update after closing the file. Thanks!"
+            )
+            return (self.Transaction, account)
         except OSError as e:
             print("Data not found. Please create a new account to make this operation")
-            self.index()
+            return (self.index,)
 
     """
     3. EditAccount:
@@ -651,62 +567,68 @@ class BankingSystem(EMI_Calculator):
                 """
                 )
             )
-            with open(self.user_details_csv_file, "r") as read_csv:
-                reader = csv.DictReader(read_csv)
-                fieldNames = reader.fieldnames
-                print(f"Fields Present in the Database {fieldNames}")
-                if update_selection == 1:
-                    edit_option = int(
-                        input(
-                            """
-                    Please select the option to edit:
-                        Press 1 to Edit FirstName
-                        Press 2 to Edit LastName
-                        Press 3 to Edit DATE_OF_BIRTH
-                        Press 4 to Edit Gender
-                        Press 5 to Edit Profession
-                        Press 6 to Edit Phone Number
-                        Press 7 to Edit Email
-                    """
-                        )
+            fieldNames = self.storage.fieldnames()
+            print(f"Fields Present in the Database {fieldNames}")
+            if update_selection == 1:
+                edit_option = int(
+                    input(
+                        """
+                Please select the option to edit:
+                    Press 1 to Edit FirstName
+                    Press 2 to Edit LastName
+                    Press 3 to Edit DATE_OF_BIRTH
+                    Press 4 to Edit Gender
+                    Press 5 to Edit Profession
+                    Press 6 to Edit Phone Number
+                    Press 7 to Edit Email
+                """
                     )
-                    if edit_option == 1:
-                        update_field = "FIRSTNAME"
-                    elif edit_option == 2:
-                        update_field = "LASTNAME"
-                    elif edit_option == 3:
-                        update_field = "DATE_OF_BIRTH"
-                    elif edit_option == 4:
-                        update_field = "GENDER"
-                    elif edit_option == 5:
-                        update_field = "PROFESSION"
-                    elif edit_option == 6:
-                        update_field = "PHONENUMBER"
-                    elif edit_option == 7:
-                        update_field = "EMAIL"
-                    else:
-                        print("Invalid Option, Please select the correct option")
-                        self.Edit_Account(account)
-                    if update_field in fieldNames:
-                        for i, _ in enumerate(fieldNames):
-                            new_value = self.inputs(update_field, i)
-                            print(new_value)
-                            self.update_user_details(account, update_field, new_value)
-                            print("Account details updated successfully!")
-                            self.Edit_Account(account)
-                    else:
-                        print("Invalid field selected")
-                        self.Edit_Account(account)
+                )
+                if edit_option == 1:
+                    update_field = "FIRSTNAME"
+                elif edit_option == 2:
+                    update_field = "LASTNAME"
+                elif edit_option == 3:
+                    update_field = "DATE_OF_BIRTH"
+                elif edit_option == 4:
+                    update_field = "GENDER"
+                elif edit_option == 5:
+                    update_field = "PROFESSION"
+                elif edit_option == 6:
+                    update_field = "PHONENUMBER"
+                elif edit_option == 7:
+                    update_field = "EMAIL"
+                else:
+                    print("Invalid Option, Please select the correct option")
+                    return (self.Edit_Account, account)
+                if update_field in fieldNames:
+                    new_value = self.inputs(update_field, fieldNames.index(update_field))
+                    print(new_value)
+                    try:
+                        self.api.edit_field(account, update_field, new_value)
+                    except BankingError as e:
+                        print(e)
+                        return (self.Edit_Account, account)
+                    print("Account details updated successfully!")
+                    return (self.Edit_Account, account)
+                else:
+                    print("Invalid field selected")
+                    return (self.Edit_Account, account)
 
-                elif update_selection == 2:
-                    self.index()
+            elif update_selection == 2:
+                return (self.index,)
 
-                else:
-                    print("Invalid option selected")
-                    self.Edit_Account(account)
+            else:
+                print("Invalid option selected")
+                return (self.Edit_Account, account)
+        except PermissionError:
+            print(
+                "File has already been opened. Please try to update after closing the file. Thanks!"
+            )
+            return (self.Edit_Account, account)
         except OSError as e:
             print("Data not found. Please create a new account to make this operation")
-            self.index()
+            return (self.index,)
     """
     4. `display_account(self, account_number)` method:
        - This method displays the account details for a given account number.
@@ -714,26 +636,59 @@ class BankingSystem(EMI_Calculator):
     """
     def display_account(self, account):
         try:
-            with open(self.user_details_csv_file, "r") as readFile:
-                reader = csv.DictReader(readFile)
-                for row in reader:
-                    if row["ACCOUNTNUMBER"] == account:
-                        user = row["FIRSTNAME"] + " " + row["LASTNAME"]
-                        print(f"Welcome {user} the E-con Banking Systems!")
-                        account_details = dict(row)
-                        break
-                else:
-                    return None
-
-                table = PrettyTable()
-                table.field_names = account_details.keys()
-                table.add_row(account_details.values())
-                print(table)
-                self.index()
+            try:
+                details = self.api.get_account(account)
+            except AccountNotFoundError:
+                return (self.index,)
+            user = details.FIRSTNAME + " " + details.LASTNAME
+            print(f"Welcome {user} the E-con Banking Systems!")
+            account_details = details._asdict()
+
+            from prettytable import PrettyTable
+
+            table = PrettyTable()
+            table.field_names = account_details.keys()
+            table.add_row(account_details.values())
+            print(table)
+            return (self.index,)
         except OSError as e:
             print("Data not found. Please create a new account to make this operation")
-            self.index()
+            return (self.index,)
+
+
+"""
+`main(argv=None)`: Entry point of the E-con Banking System. Importing this module does no work, the Banking folders are
+only created and the menu only started from here.
+"""
 
 
-banking_system = BankingSystem()
-banking_system.index()
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="E-con Banking System")
+    parser.add_argument("--storage", choices=["csv", "sqlite", "sharded"], default="csv",
+                        help="storage engine for the user details")
+    parser.add_argument("--journal", action="store_true",
+                        help="append balance and field changes to a journal instead of rewriting the CSV file")
+    parser.add_argument("--offset-index", action="store_true",
+                        help="read single accounts through a memory-mapped byte-offset index of the CSV file")
+    parser.add_argument("--balance-file", action="store_true",
+                        help="store balances in a fixed-width balance file, updated in place")
+    parser.add_argument("--metrics",
+                        help="record operation metrics and write them to this file on exit, Prometheus text for "
+                             ".prom, JSON otherwise")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+    banking_system = BankingSystem(journal_mode=args.journal, storage_engine=args.storage,
+                                   offset_index=args.offset_index, balance_file=args.balance_file)
+    try:
+        banking_system.run()
+    finally:
+        banking_system.api.ledger.close()
+        if args.metrics:
+            metrics.export(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
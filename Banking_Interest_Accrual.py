@@ -0,0 +1,166 @@
+import argparse
+import csv
+import os
+import sys
+from array import array
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+from Banking_File_Lock import atomic_write
+from Banking_Ledger import Ledger, Posting
+from Banking_Metrics import instrument
+from Banking_Storage import default_user_details_file, open_storage
+from Banking_Transaction_Rules import SAVINGS_INTEREST_RATE
+
+"""
+`InterestAccrual` class:
+   - This class is the month-end batch job that credits savings interest to every account.
+   - All balances are read in one pass with `balance_column`, and the interest of the month, one twelfth of the yearly
+    rate rounded down to whole rupees, is calculated for all of them at once with NumPy. Accounts with a zero or
+    negative balance earn nothing.
+   - The new balances are stored with one `update_balances` write (one rewrite of the CSV file, one SQLite transaction,
+    one balance file update) and posted to the `Ledger` as `INTEREST` entries in one write, all under the storage's
+    write lock.
+   - Every accrued month is recorded in a `.interest` file next to the account data, so running the job twice for the
+    same month is refused. The month is written with `atomic_write` and fsync twice: as `started` before any balance
+    is changed, and as `credited` only once the balances are stored and the `INTEREST` entries are in the ledger. A
+    crash in between leaves the month `started`, and a rerun is refused with a message to check the ledger, so
+    interest is never credited twice.
+   - The storage is opened in the mode its files show (journal, balance file), so the interest is calculated from and
+    written to the balances every other program reads.
+   - A dry run calculates the same figures and writes the report without changing anything.
+"""
+
+REPORT_FIELDNAMES = ["ACCOUNTNUMBER", "BALANCE", "INTEREST", "NEW_BALANCE"]
+
+AccrualSummary = namedtuple("AccrualSummary", ["month", "accounts", "credited", "total_interest", "dry_run"])
+
+
+class AccrualError(Exception):
+    pass
+
+
+class InterestAccrual:
+    def __init__(self, storage, annual_rate=SAVINGS_INTEREST_RATE, ledger=None):
+        self.storage = storage
+        self.annual_rate = annual_rate
+        self.ledger = ledger or Ledger(storage.sidecar_file(".ledger"))
+        self.months_file = storage.sidecar_file(".interest")
+
+    """
+    `calculate(self)`: Returns the account numbers, their balances and the interest of the month of every account, the
+    last two as NumPy arrays.
+    """
+    def calculate(self):
+        account_numbers, balances = self.storage.balance_column() if self.storage.exists() else ([], array("q"))
+        balances = np.frombuffer(balances, dtype=np.int64)
+        interest = np.floor(np.maximum(balances, 0) * (self.annual_rate / 100 / 12)).astype(np.int64)
+        return account_numbers, balances, interest
+
+    """
+    `accrued_months(self)`: Returns every month of the `.interest` file with its state, `started` or `credited`. A line
+    without a state, written by an earlier version, is a credited month.
+    """
+    def accrued_months(self):
+        months = {}
+        if not os.path.isfile(self.months_file):
+            return months
+        with open(self.months_file, "r") as read_months:
+            for line in read_months:
+                month, _, state = line.strip().partition(",")
+                if month:
+                    months[month] = state or "credited"
+        return months
+
+    def record_month(self, month, state):
+        months = self.accrued_months()
+        months[month] = state
+        with atomic_write(self.months_file, fsync=True) as write_months:
+            write_months.writelines(f"{accrued},{accrued_state}\n" for accrued, accrued_state in months.items())
+
+    """
+    `write_report(self, report_file, account_numbers, balances, interest)`: Writes one line for every account that earns
+    interest, with its balance before and after.
+    """
+    @staticmethod
+    def write_report(report_file, account_numbers, balances, interest):
+        credited = np.flatnonzero(interest)
+        with open(report_file, "w", newline="") as write_csv:
+            writer = csv.writer(write_csv)
+            writer.writerow(REPORT_FIELDNAMES)
+            writer.writerows(
+                zip(
+                    [account_numbers[position] for position in credited.tolist()],
+                    balances[credited].tolist(),
+                    interest[credited].tolist(),
+                    (balances[credited] + interest[credited]).tolist(),
+                )
+            )
+
+    """
+    `run(self, month, dry_run=False, report_file=None)`: Accrues the interest of `month` (`YYYY-MM`) and returns an
+    `AccrualSummary`. Raises `AccrualError` when the month has already been accrued.
+    """
+    @instrument("interest_accrual")
+    def run(self, month, dry_run=False, report_file=None):
+        with self.storage.write_lock():
+            state = self.accrued_months().get(month)
+            if state == "started":
+                raise AccrualError(f"Interest for {month} was interrupted while it was credited, check the INTEREST "
+                                   f"entries of the ledger before crediting it again")
+            if state is not None:
+                raise AccrualError(f"Interest for {month} has already been credited")
+            account_numbers, balances, interest = self.calculate()
+            credited = np.flatnonzero(interest).tolist()
+            if report_file:
+                self.write_report(report_file, account_numbers, balances, interest)
+            if not dry_run:
+                self.record_month(month, "started")
+                new_balances = (balances + interest).tolist()
+                amounts = interest.tolist()
+                if credited:
+                    self.storage.update_balances(
+                        {account_numbers[position]: new_balances[position] for position in credited}
+                    )
+                    self.ledger.append(
+                        [Posting(account_numbers[position], "INTEREST", amounts[position], new_balances[position])
+                         for position in credited]
+                    )
+                self.record_month(month, "credited")
+        return AccrualSummary(month, len(account_numbers), len(credited), int(interest.sum()), dry_run)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Credit the month's savings interest to every account.")
+    parser.add_argument("--user-details", default=default_user_details_file(),
+                        help="User_details.csv, a SQLite .db file created by the SQLite storage engine, or a "
+                             "shard directory")
+    parser.add_argument("--month", default=datetime.now().strftime("%Y-%m"), help="month to accrue, YYYY-MM")
+    parser.add_argument("--rate", type=float, default=SAVINGS_INTEREST_RATE, help="yearly interest rate in percent")
+    parser.add_argument("--dry-run", action="store_true", help="only calculate the interest and write the report")
+    parser.add_argument("--report", help="CSV file listing the interest of every credited account")
+    args = parser.parse_args(argv)
+
+    try:
+        datetime.strptime(args.month, "%Y-%m")
+    except ValueError:
+        print("Please enter the month as YYYY-MM")
+        return 1
+    accrual = InterestAccrual(open_storage(args.user_details), args.rate)
+    try:
+        summary = accrual.run(args.month, args.dry_run, args.report)
+    except AccrualError as e:
+        print(e)
+        return 1
+    finally:
+        accrual.ledger.close()
+    verb = "would be credited" if summary.dry_run else "credited"
+    print(f"{summary.month}: interest of {summary.total_interest} {verb} to {summary.credited} of "
+          f"{summary.accounts} accounts at {args.rate}% a year")
+    if args.report:
+        print(f"Report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import contextlib
+import csv
+import os
+import struct
+import sys
+from collections import namedtuple
+from datetime import datetime, timedelta
+from Banking_Balance_File import read_at, write_at
+from Banking_File_Lock import FileLock, atomic_write
+
+"""
+`Ledger` class:
+   - This class keeps the transaction history: every posting (opening deposit, deposit, withdrawal, transfer, interest)
+    is appended to a binary ledger file next to the account data, with its timestamp, type, amount, the resulting
+    balance and, for transfers, the other account.
+   - Records are fixed-width, and each one holds the offset of the previous record of the same account. The offset of
+    every account's latest record (its head) is kept in memory, so a statement follows that account's chain backwards
+    and reads only its own entries, however many postings the ledger holds.
+   - The heads are checkpointed to a `.heads` file. On open only the records after the checkpoint are read to bring the
+    heads up to date, and records appended by other processes are picked up the same way before every append and
+    statement.
+   - A process writes a new checkpoint once it has read or appended `max(checkpoint_interval, accounts)` records past
+    the last one, and when the ledger is closed. Rewriting the checkpoint costs one line per account, so spread over
+    the records since the last one it adds a constant cost per posting. Because any process that finds a longer tail
+    checkpoints it, opening the ledger reads the checkpoint (one line per account) plus a tail that stays within a
+    few times `max(checkpoint_interval, accounts)` records, however large the ledger grows. A statement then reads
+    only the account's own entries back to the start date.
+   - Appends hold the ledger's own `FileLock`. A record cut short by a crash is left out and overwritten by the next
+    append.
+"""
+
+MAGIC = b"BANKING-LEDGER1\n"
+RECORD = struct.Struct("<16s16sqqqqB7x")
+POSTING_TYPES = ["OPENING", "DEPOSIT", "WITHDRAW", "TRANSFER_OUT", "TRANSFER_IN", "INTEREST"]
+TYPE_CODES = {name: code for code, name in enumerate(POSTING_TYPES)}
+SCAN_CHUNK = 8192 * RECORD.size
+
+LedgerEntry = namedtuple("LedgerEntry", ["timestamp", "type", "amount", "balance", "counterparty"])
+Posting = namedtuple("Posting", ["account_number", "type", "amount", "balance", "counterparty"])
+Posting.__new__.__defaults__ = ("",)
+
+
+def to_microseconds(moment):
+    return int(moment.timestamp() * 1_000_000)
+
+
+def from_microseconds(microseconds):
+    return datetime.fromtimestamp(microseconds / 1_000_000)
+
+
+class Ledger:
+    def __init__(self, ledger_file, fsync=False, checkpoint_interval=10000):
+        self.ledger_file = ledger_file
+        self.heads_file = ledger_file + ".heads"
+        self.fsync = fsync
+        self.checkpoint_interval = checkpoint_interval
+        self.file_lock = FileLock(ledger_file)
+        self.file = None
+        self.heads = {}
+        self.scanned_size = len(MAGIC)
+        # Ledger size covered by the last checkpoint this process read or wrote.
+        self.checkpoint_size = len(MAGIC)
+
+    def open(self):
+        if self.file is None:
+            with self.file_lock.exclusive():
+                if not os.path.isfile(self.ledger_file):
+                    with open(self.ledger_file, "wb") as ledger:
+                        ledger.write(MAGIC)
+                self.file = open(self.ledger_file, "r+b", buffering=0)
+                self.load_heads()
+                self.catch_up()
+        return self.file
+
+    def close(self):
+        if self.file is not None:
+            if self.scanned_size > self.checkpoint_size:
+                self.checkpoint()
+            self.file.close()
+            self.file = None
+
+    """
+    `load_heads(self)`: Reads the heads checkpoint, if there is one, and the ledger size it covers.
+    """
+    def load_heads(self):
+        self.heads = {}
+        self.scanned_size = self.checkpoint_size = len(MAGIC)
+        try:
+            with open(self.heads_file, "r", newline="") as read_heads:
+                reader = csv.reader(read_heads)
+                covered_size = int(next(reader)[1])
+                heads = {account_number: int(offset) for account_number, offset in reader}
+        except (OSError, ValueError, IndexError, StopIteration):
+            return
+        if covered_size <= os.fstat(self.file.fileno()).st_size:
+            self.heads = heads
+            self.scanned_size = self.checkpoint_size = covered_size
+
+    def checkpoint(self):
+        with self.file_lock.exclusive():
+            self.scan()
+            with atomic_write(self.heads_file) as write_heads:
+                writer = csv.writer(write_heads)
+                writer.writerow(["HEADS", self.scanned_size])
+                writer.writerows(self.heads.items())
+            self.checkpoint_size = self.scanned_size
+
+    """
+    `checkpoint_due(self)`: True once the records past the last checkpoint outnumber both `checkpoint_interval` and the
+    accounts, the size of a checkpoint.
+    """
+    def checkpoint_due(self):
+        unchecked = (self.scanned_size - self.checkpoint_size) // RECORD.size
+        return unchecked >= max(self.checkpoint_interval, len(self.heads))
+
+    """
+    `scan(self)`: Reads the complete records after `scanned_size`, written by another process or after the last
+    checkpoint, and moves the heads forward. Called with the ledger lock held.
+    """
+    def scan(self):
+        size = os.fstat(self.file.fileno()).st_size
+        end = len(MAGIC) + (size - len(MAGIC)) // RECORD.size * RECORD.size
+        while self.scanned_size < end:
+            data = read_at(self.file, min(SCAN_CHUNK, end - self.scanned_size), self.scanned_size)
+            for index, record in enumerate(RECORD.iter_unpack(data)):
+                self.heads[record[0].rstrip(b"\0").decode()] = self.scanned_size + index * RECORD.size
+            self.scanned_size += len(data)
+
+    """
+    `catch_up(self)`: Scans the new records, and checkpoints the heads when that was a long tail, so the next process
+    to open the ledger does not read it again.
+    """
+    def catch_up(self):
+        self.scan()
+        if self.checkpoint_due():
+            self.checkpoint()
+
+    """
+    `append(self, postings, moment=None)`: Appends `Posting`s, all with the same timestamp, in one write.
+    """
+    def append(self, postings, moment=None):
+        if not postings:
+            return
+        timestamp = to_microseconds(moment or datetime.now())
+        self.open()
+        with self.file_lock.exclusive():
+            self.catch_up()
+            start = offset = self.scanned_size
+            heads = self.heads
+            data = bytearray(len(postings) * RECORD.size)
+            for account_number, posting_type, amount, balance, counterparty in postings:
+                account_number = str(account_number)
+                RECORD.pack_into(
+                    data, offset - start, account_number.encode(), str(counterparty).encode(), timestamp, int(amount),
+                    int(balance), heads.get(account_number, 0), TYPE_CODES[posting_type],
+                )
+                heads[account_number] = offset
+                offset += RECORD.size
+            write_at(self.file, data, start)
+            if self.fsync:
+                os.fsync(self.file.fileno())
+            self.scanned_size = offset
+            if self.checkpoint_due():
+                self.checkpoint()
+
+    """
+    `entries(self, account_number)`: Yields the `LedgerEntry`s of one account from the newest to the oldest.
+    """
+    def entries(self, account_number):
+        self.open()
+        with self.file_lock.shared():
+            self.catch_up()
+        offset = self.heads.get(str(account_number), 0)
+        while offset:
+            _, counterparty, timestamp, amount, balance, previous, code = RECORD.unpack(
+                read_at(self.file, RECORD.size, offset)
+            )
+            yield LedgerEntry(from_microseconds(timestamp), POSTING_TYPES[code], amount, balance,
+                              counterparty.rstrip(b"\0").decode())
+            offset = previous
+
+    """
+    `statement(self, account_number, start=None, end=None)`: Returns the entries of one account between two dates
+    (both included), oldest first. The chain is only followed back to `start`.
+    """
+    def statement(self, account_number, start=None, end=None):
+        start = datetime.combine(start, datetime.min.time()) if start else None
+        end = datetime.combine(end, datetime.min.time()) + timedelta(days=1) if end else None
+        entries = []
+        for entry in self.entries(account_number):
+            if start is not None and entry.timestamp < start:
+                break
+            if end is None or entry.timestamp < end:
+                entries.append(entry)
+        entries.reverse()
+        return entries
+
+
+def main(argv=None):
+    import argparse
+
+    from Banking_Storage import default_user_details_file, open_storage
+
+    parser = argparse.ArgumentParser(description="Print or export the statement of one account.")
+    parser.add_argument("account_number")
+    parser.add_argument("--from", dest="start", help="first date of the statement, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="last date of the statement, YYYY-MM-DD")
+    parser.add_argument("--user-details", default=default_user_details_file(),
+                        help="User_details.csv, a SQLite .db file created by the SQLite storage engine, or a "
+                             "shard directory; the ledger is kept next to it")
+    parser.add_argument("--output", help="write the statement to this CSV file instead of printing it")
+    args = parser.parse_args(argv)
+
+    try:
+        start = datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None
+        end = datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else None
+    except ValueError:
+        print("Please enter the dates as YYYY-MM-DD")
+        return 1
+    ledger_file = open_storage(args.user_details).sidecar_file(".ledger")
+    if not os.path.isfile(ledger_file):
+        print(f"File not found in the given path: {ledger_file}")
+        return 1
+    ledger = Ledger(ledger_file)
+    try:
+        entries = ledger.statement(args.account_number, start, end)
+    finally:
+        ledger.close()
+    if args.output:
+        with open(args.output, "w", newline="") as write_csv:
+            writer = csv.writer(write_csv)
+            writer.writerow(["DATE", "TYPE", "AMOUNT", "BALANCE", "COUNTERPARTY"])
+            writer.writerows((entry.timestamp.isoformat(sep=" ", timespec="seconds"),) + entry[1:] for entry in entries)
+        print(f"{len(entries)} entries written to {args.output}")
+        return 0
+    with contextlib.suppress(BrokenPipeError):
+        for entry in entries:
+            print(f"{entry.timestamp:%Y-%m-%d %H:%M:%S}  {entry.type:<12} {entry.amount:>12} {entry.balance:>14} "
+                  f"{entry.counterparty}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Loan rules:
+   - These are the age bands and interest rate slabs used by the `Student`, `SeniorCitizen` and `GeneralCitizen` EMI
+    screens, kept in one place so `BankingApi.quote_emi` quotes exactly the same rates.
+   - Loans of less than `SHORT_TERM_YEARS` years get the lower rate of each band.
+"""
+
+MINIMUM_LOAN_AMOUNT = 100000
+MINIMUM_LOAN_TERM = 1
+MAXIMUM_LOAN_TERM = 30
+MINIMUM_LOAN_AGE = 18
+STUDENT_MAXIMUM_AGE = 22
+SENIOR_CITIZEN_AGE = 58
+SHORT_TERM_YEARS = 5
+
+# (short term rate, long term rate) of each band.
+INTEREST_RATES = {
+    "Student": (6, 8),
+    "SeniorCitizen": (8, 10),
+    "GeneralCitizen": (12, 14),
+}
+
+
+def loan_category(age):
+    age = int(age)
+    if age < MINIMUM_LOAN_AGE:
+        return None
+    if age < STUDENT_MAXIMUM_AGE:
+        return "Student"
+    if age >= SENIOR_CITIZEN_AGE:
+        return "SeniorCitizen"
+    return "GeneralCitizen"
+
+
+def loan_interest_rate(age, loanTerm):
+    category = loan_category(age)
+    if category is None:
+        return None
+    short_term_rate, long_term_rate = INTEREST_RATES[category]
+    return short_term_rate if loanTerm < SHORT_TERM_YEARS else long_term_rate
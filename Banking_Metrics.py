@@ -0,0 +1,230 @@
+import bisect
+import contextlib
+import functools
+import json
+import os
+import time
+from Banking_File_Lock import atomic_write
+
+"""
+`MetricsRegistry` class:
+   - This class records where the time goes in the banking and EMI operations: call counts, errors and latency
+    histograms per operation, the bytes read from and written to the CSV files, and the number of full-file scans and
+    rewrites, in total and per user action.
+   - Operations are wrapped with the `instrument(name)` decorator, a menu screen or server request is wrapped with
+    `metrics.action(name)`. The CSV storage reports its reads and writes with `count`.
+   - Recording is off until `enable()` is called, or the `BANKING_METRICS` environment variable is set. While it is off
+    a wrapped call costs one attribute check, and the storage does not even stat its files for the byte counts.
+   - `to_prometheus()` renders the Prometheus text exposition format (for the node exporter's textfile collector),
+    `snapshot()` a JSON-ready dictionary.
+"""
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SCAN_BUCKETS = (0, 1, 2, 5, 10, 100)
+COUNTER_HELP = {
+    "csv_bytes_read": "Bytes read from the user details CSV and journal files.",
+    "csv_bytes_written": "Bytes written to the user details CSV, journal and loan schedule files.",
+    "csv_full_scans": "Full reads of the user details CSV file.",
+    "csv_full_rewrites": "Full rewrites of the user details CSV file.",
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            yield bound, running
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): count for bound, count in self.cumulative()},
+        }
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.calls = {}
+        self.errors = {}
+        self.latencies = {}
+        self.counters = {name: 0 for name in COUNTER_HELP}
+        self.action_scans = {}
+        self.action_depth = 0
+        self.scans_in_action = 0
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if name == "csv_full_scans":
+            self.scans_in_action += amount
+
+    """
+    `file_scanned(self, path)` and `file_rewritten(self, path)`: Count one full read or full rewrite of a file with its
+    size in bytes. The file is only stat'ed while metrics are enabled.
+    """
+    def file_scanned(self, path):
+        if self.enabled:
+            self.count("csv_full_scans")
+            self.count("csv_bytes_read", file_size(path))
+
+    def file_rewritten(self, path):
+        if self.enabled:
+            self.count("csv_full_rewrites")
+            self.count("csv_bytes_written", file_size(path))
+
+    """
+    `action(self, name)`: Context manager around one user action (a menu screen, a server request). Counts the action
+    and records how many full-file scans it caused. Nested actions are counted as part of the outermost one.
+    """
+    @contextlib.contextmanager
+    def action(self, name):
+        if not self.enabled:
+            yield
+            return
+        self.action_depth += 1
+        if self.action_depth == 1:
+            self.scans_in_action = 0
+        try:
+            yield
+        finally:
+            self.action_depth -= 1
+            if self.action_depth == 0:
+                histogram = self.action_scans.get(name)
+                if histogram is None:
+                    histogram = self.action_scans[name] = Histogram(SCAN_BUCKETS)
+                histogram.observe(self.scans_in_action)
+
+    def call(self, name, function, args, kwargs):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        start = time.perf_counter()
+        try:
+            with self.action(name):
+                return function(*args, **kwargs)
+        except BaseException:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        finally:
+            histogram = self.latencies.get(name)
+            if histogram is None:
+                histogram = self.latencies[name] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        return {
+            "operations": {
+                name: {
+                    "calls": self.calls.get(name, 0),
+                    "errors": self.errors.get(name, 0),
+                    "latency_seconds": histogram.snapshot(),
+                }
+                for name, histogram in sorted(self.latencies.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "full_scans_per_action": {name: histogram.snapshot() for name, histogram in sorted(self.action_scans.items())},
+        }
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP banking_operation_calls_total Calls of each banking operation.",
+            "# TYPE banking_operation_calls_total counter",
+        ]
+        lines += [f'banking_operation_calls_total{{operation="{label(name)}"}} {count}'
+                  for name, count in sorted(self.calls.items())]
+        lines += [
+            "# HELP banking_operation_errors_total Calls of each banking operation that raised an error.",
+            "# TYPE banking_operation_errors_total counter",
+        ]
+        lines += [f'banking_operation_errors_total{{operation="{label(name)}"}} {count}'
+                  for name, count in sorted(self.errors.items())]
+        lines += histogram_lines("banking_operation_seconds", "Latency of each banking operation.", "operation",
+                                 self.latencies)
+        for name, help_text in COUNTER_HELP.items():
+            lines += [f"# HELP banking_{name}_total {help_text}", f"# TYPE banking_{name}_total counter",
+                      f"banking_{name}_total {self.counters.get(name, 0)}"]
+        lines += histogram_lines("banking_full_scans_per_action", "Full CSV scans caused by each user action.",
+                                 "action", self.action_scans)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with atomic_write(path) as export:
+            export.write(self.to_prometheus())
+
+    def write_json(self, path):
+        with atomic_write(path) as export:
+            json.dump(self.snapshot(), export, indent=2)
+
+    """
+    `export(self, path)`: Writes the Prometheus text format to a `.prom` file, a JSON snapshot to any other file.
+    """
+    def export(self, path):
+        if path.endswith(".prom"):
+            self.write_prometheus(path)
+        else:
+            self.write_json(path)
+
+
+def histogram_lines(metric, help_text, label_name, histograms):
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for name, histogram in sorted(histograms.items()):
+        labels = f'{label_name}="{label(name)}"'
+        for bound, count in histogram.cumulative():
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {count}')
+        lines.append(f"{metric}_sum{{{labels}}} {histogram.total}")
+        lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+metrics = MetricsRegistry(enabled=bool(os.environ.get("BANKING_METRICS")))
+
+
+"""
+`instrument(name)`: Decorator that records the calls, errors and latency of an operation under `name` while metrics
+are enabled, and calls the operation straight through otherwise.
+"""
+
+
+def instrument(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            return metrics.call(name, function, args, kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,211 @@
+import contextlib
+import csv
+import mmap
+import os
+from Banking_File_Lock import atomic_write
+from Banking_Metrics import metrics
+
+"""
+`OffsetIndex` class:
+   - This class answers single-account reads without decoding the whole `User_details.csv` file: the file is
+    memory-mapped, and a sidecar `.offsets` file maps every `ACCOUNTNUMBER` and `PHONENUMBER` to the byte offset of its
+    line. A lookup seeks to the offset and parses that one line.
+   - The sidecar starts with a fixed-width header holding the inode of the CSV file and how many bytes of it are
+    indexed, followed by one `ACCOUNTNUMBER,PHONENUMBER,offset` line per account.
+   - Rows appended to the CSV file keep the inode, so only the bytes after the indexed size are scanned and their
+    entries appended to the sidecar. A rewritten file (`os.replace` gives it a new inode) or a shorter one is indexed
+    again from the start. Entries past the indexed size in the header are ignored, so a crash between appending entries
+    and updating the header is harmless.
+   - The values come from the CSV file itself, so the index is not used in journal mode.
+"""
+
+HEADER_WIDTH = 64
+
+
+def split_line(line):
+    line = line.decode("utf-8").rstrip("\r\n")
+    if '"' not in line:
+        return line.split(",")
+    return next(csv.reader([line]))
+
+
+def read_fieldnames(file_map):
+    header_end = file_map.find(b"\n") + 1
+    return split_line(file_map[:header_end]) if header_end else []
+
+
+class OffsetIndex:
+    def __init__(self, csv_file, file_lock=None):
+        self.csv_file = csv_file
+        self.offsets_file = os.path.splitext(csv_file)[0] + ".offsets"
+        self.file_lock = file_lock
+        self.fieldnames = []
+        self.offset_by_account = {}
+        self.account_by_phone = {}
+        self.inode = None
+        self.indexed_size = 0
+        self.map = None
+        self.map_stamp = None
+
+    def shared(self):
+        return self.file_lock.shared() if self.file_lock is not None else contextlib.nullcontext()
+
+    """
+    `read_offsets(self)`: Loads the sidecar file, returns False when it is missing or damaged.
+    """
+    def read_offsets(self):
+        try:
+            with open(self.offsets_file, "r", newline="") as offsets:
+                header = offsets.read(HEADER_WIDTH).split()
+                inode, indexed_size = int(header[1]), int(header[2])
+                offset_by_account = {}
+                account_by_phone = {}
+                for line in offsets:
+                    account_number, phone_number, offset = line.rstrip("\n").split(",")
+                    offset = int(offset)
+                    if offset < indexed_size:
+                        offset_by_account[account_number] = offset
+                        account_by_phone[phone_number] = account_number
+        except (OSError, ValueError, IndexError):
+            return False
+        self.inode, self.indexed_size = inode, indexed_size
+        self.offset_by_account = offset_by_account
+        self.account_by_phone = account_by_phone
+        return True
+
+    def write_header(self, offsets):
+        offsets.seek(0)
+        offsets.write(f"OFFSETS {self.inode} {self.indexed_size}".ljust(HEADER_WIDTH - 1).encode() + b"\n")
+
+    """
+    `scan(self, file_map, start)`: Indexes the complete lines from byte `start` to the end of the mapped file and
+    returns their (ACCOUNTNUMBER, PHONENUMBER, offset) entries. A last line without its newline is left for later.
+    """
+    def scan(self, file_map, start):
+        entries = []
+        position = start
+        account_column = self.fieldnames.index("ACCOUNTNUMBER")
+        phone_column = self.fieldnames.index("PHONENUMBER")
+        while True:
+            end = file_map.find(b"\n", position)
+            if end == -1:
+                break
+            fields = split_line(file_map[position:end])
+            if len(fields) > phone_column:
+                entries.append((fields[account_column], fields[phone_column], position))
+            position = end + 1
+        self.indexed_size = position
+        for account_number, phone_number, offset in entries:
+            self.offset_by_account[account_number] = offset
+            self.account_by_phone[phone_number] = account_number
+        return entries
+
+    def rebuild(self, file_map, inode):
+        header_end = file_map.find(b"\n") + 1
+        self.fieldnames = read_fieldnames(file_map)
+        self.offset_by_account = {}
+        self.account_by_phone = {}
+        self.inode = inode
+        if not header_end:
+            self.indexed_size = 0
+            return
+        entries = self.scan(file_map, header_end)
+        with atomic_write(self.offsets_file) as offsets:
+            offsets.write(f"OFFSETS {self.inode} {self.indexed_size}".ljust(HEADER_WIDTH - 1) + "\n")
+            offsets.writelines(f"{account},{phone},{offset}\n" for account, phone, offset in entries)
+        metrics.file_scanned(self.csv_file)
+
+    def extend(self, file_map):
+        start = self.indexed_size
+        entries = self.scan(file_map, start)
+        with open(self.offsets_file, "r+b") as offsets:
+            offsets.seek(0, os.SEEK_END)
+            offsets.write("".join(f"{account},{phone},{offset}\n" for account, phone, offset in entries).encode())
+            offsets.flush()
+            self.write_header(offsets)
+        metrics.count("csv_bytes_read", self.indexed_size - start)
+
+    """
+    `refresh(self)`: Maps the CSV file again when it has changed, and brings the offsets up to date: from the sidecar
+    file when it matches, by scanning only the appended bytes when rows were added, or from scratch.
+    """
+    def refresh(self):
+        stat = os.stat(self.csv_file)
+        stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if stamp == self.map_stamp:
+            return
+        with self.shared():
+            self.release()
+            with open(self.csv_file, "rb") as csv_file:
+                stat = os.fstat(csv_file.fileno())
+                file_map = mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+            if self.inode is None:
+                self.read_offsets()
+            if not self.fieldnames:
+                self.fieldnames = read_fieldnames(file_map)
+            if not self.appended_to(file_map, stat):
+                self.rebuild(file_map, stat.st_ino)
+            elif self.indexed_size < stat.st_size:
+                self.extend(file_map)
+            self.map = file_map
+            self.map_stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    """
+    `appended_to(self, file_map, stat)`: Tells whether the file is the one indexed, with at most rows appended since:
+    the same inode, at least the indexed size, and a line end where the indexed part stopped.
+    """
+    def appended_to(self, file_map, stat):
+        return bool(self.fieldnames) and self.inode == stat.st_ino and 0 < self.indexed_size <= stat.st_size and \
+            file_map[self.indexed_size - 1:self.indexed_size] == b"\n"
+
+    """
+    `release(self)`: Closes the memory map, before the file is replaced (Windows does not allow replacing a mapped file).
+    """
+    def release(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.map = None
+        self.map_stamp = None
+
+    """
+    `add_row(self, offset, end, row)`: Records a row just appended between the bytes `offset` and `end`, when the index
+    was up to date before the append. Otherwise the next `refresh` picks the row up.
+    """
+    def add_row(self, offset, end, row):
+        if self.map_stamp is None or offset != self.indexed_size:
+            return
+        self.offset_by_account[str(row["ACCOUNTNUMBER"])] = offset
+        self.account_by_phone[str(row["PHONENUMBER"])] = str(row["ACCOUNTNUMBER"])
+        self.indexed_size = end
+        with open(self.offsets_file, "r+b") as offsets:
+            offsets.seek(0, os.SEEK_END)
+            offsets.write(f"{row['ACCOUNTNUMBER']},{row['PHONENUMBER']},{offset}\n".encode())
+            offsets.flush()
+            self.write_header(offsets)
+
+    """
+    `get_row(self, account_number)`: Parses the one line of the account, returns its row dictionary or None.
+    """
+    def get_row(self, account_number):
+        self.refresh()
+        offset = self.offset_by_account.get(account_number)
+        if offset is None:
+            return None
+        end = self.map.find(b"\n", offset)
+        return dict(zip(self.fieldnames, split_line(self.map[offset:end])))
+
+    def get_account_number(self, phone_number):
+        self.refresh()
+        return self.account_by_phone.get(phone_number)
+
+    def has_account(self, account_number):
+        self.refresh()
+        return account_number in self.offset_by_account
+
+    def phone_numbers(self):
+        self.refresh()
+        return self.account_by_phone.keys()
+
+    def get_fieldnames(self):
+        self.refresh()
+        return self.fieldnames
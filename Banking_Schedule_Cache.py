@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from Banking_Metrics import instrument
+
+"""
+`ScheduleCache` class:
+   - This class is a bounded LRU cache of amortization schedules keyed by (loan amount, interest rate, loan term).
+   - A repeated quote skips the computation entirely. The saved loan CSV file stays the on-disk copy and is not
+    written again when it already exists.
+   - `hits` and `misses` count where each schedule came from, `stats()` reports them together with the size.
+"""
+
+
+class ScheduleCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.schedules = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    """
+    `get(self, loanRequired, interest, loanTerm)`: Returns the cached schedule for the loan, or computes and caches it.
+    """
+    @instrument("emi_schedule")
+    def get(self, loanRequired, interest, loanTerm):
+        key = (loanRequired, interest, loanTerm)
+        schedule = self.schedules.get(key)
+        if schedule is not None:
+            self.schedules.move_to_end(key)
+            self.hits += 1
+            return schedule
+        self.misses += 1
+        # NumPy is only imported once the first schedule is needed.
+        from Banking_Amortization import AmortizationSchedule
+
+        schedule = AmortizationSchedule(loanRequired, interest, loanTerm)
+        self.put(key, schedule)
+        return schedule
+
+    def put(self, key, schedule):
+        if self.maxsize <= 0:
+            return
+        self.schedules[key] = schedule
+        self.schedules.move_to_end(key)
+        while len(self.schedules) > self.maxsize:
+            self.schedules.popitem(last=False)
+
+    """
+    `resize(self, maxsize)`: Changes the number of schedules kept in memory, evicting the least recently used ones.
+    """
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while self.schedules and len(self.schedules) > max(maxsize, 0):
+            self.schedules.popitem(last=False)
+
+    def clear(self):
+        self.schedules.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.schedules),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import json
+import shlex
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Banking_Account_Records import MalformedBalanceError
+from Banking_Api import BankingApi, BankingError
+from Banking_Metrics import metrics
+from Banking_Storage import default_user_details_file, open_storage
+
+"""
+`BankingServer` class:
+   - This class serves the `BankingApi` operations to many branch terminals from one process, over TCP or a local Unix
+    socket, with one asyncio task per connected session.
+   - The protocol is one line per request and one line per response. A request is a command followed by its arguments,
+    quoted like a shell command line when a value contains spaces, for example `DEPOSIT 2610100000 500` or
+    `CREATE Asha Rao 1990-02-03 "Not mention" Engineer 9876543210 asha@mail.com 5000`.
+   - A response is `OK <json>` with the result, or `ERROR <error type> <message>`.
+   - Reads are answered straight from the shared account store. Every mutation is put on a queue and carried out by a
+    single writer task, one at a time, so two sessions can never interleave a read-modify-write of the same balance.
+   - The API calls do blocking file I/O (a CSV rewrite, waiting for a `FileLock`), so they run in threads and the event
+    loop keeps serving the other sessions meanwhile: the writer on its own single-thread executor, reads in the default
+    executor. The storage objects are not thread-safe, so one lock still lets only one API call run at a time.
+   - An unexpected error answers `ERROR InternalError <message>` and the session stays open, as does a line that is not
+    UTF-8, which answers `ERROR BadRequest`.
+   - `STATEMENT <account number> <from> <to>` answers with the ledger entries of the account between the two dates
+    (`YYYY-MM-DD`).
+   - `METRICS` answers with the current `Banking_Metrics` snapshot. Started with `--metrics`, the server also exports
+    the metrics to a file every `--metrics-interval` seconds and once more when it stops.
+"""
+
+READ_COMMANDS = {
+    "BALANCE": ("get_balance", 1),
+    "ACCOUNT": ("get_account", 1),
+    "PHONE": ("get_account_by_phone", 1),
+    "QUOTE": ("quote_emi", 3),
+    "STATEMENT": ("statement", 3),
+}
+
+WRITE_COMMANDS = {
+    "CREATE": ("create_account", 8),
+    "DEPOSIT": ("deposit", 2),
+    "WITHDRAW": ("withdraw", 2),
+    "EDIT": ("edit_field", 3),
+    "TRANSFER": ("transfer", 3),
+}
+
+# Arguments that are passed to the API as whole numbers.
+INTEGER_ARGUMENTS = {"deposit": (1,), "withdraw": (1,), "transfer": (2,)}
+
+
+def to_json(result):
+    if hasattr(result, "_asdict"):
+        result = result._asdict()
+    elif isinstance(result, list):
+        result = [item._asdict() if hasattr(item, "_asdict") else item for item in result]
+    # Statement entries carry a datetime, which is sent in ISO format.
+    return json.dumps(result, default=lambda value: value.isoformat(sep=" ", timespec="seconds"))
+
+
+class BankingServer:
+    def __init__(self, api, host="127.0.0.1", port=8765, unix_path=None, metrics_file=None, metrics_interval=15):
+        self.api = api
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self.export_task = None
+        self.write_queue = asyncio.Queue()
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="banking-writer")
+        self.api_lock = threading.Lock()
+        self.server = None
+        self.writer_task = None
+        self.sessions = 0
+        self.requests = 0
+
+    """
+    `parse_request(line)`: Splits a request line into the API method name, its arguments and whether it is a mutation.
+    Raises `ValueError` for an unknown command or a wrong number of arguments.
+    """
+    @staticmethod
+    def parse_request(line):
+        words = shlex.split(line)
+        if not words:
+            raise ValueError("Empty request")
+        command, args = words[0].upper(), words[1:]
+        if command in READ_COMMANDS:
+            (method, arity), is_write = READ_COMMANDS[command], False
+        elif command in WRITE_COMMANDS:
+            (method, arity), is_write = WRITE_COMMANDS[command], True
+        else:
+            raise ValueError(f"Unknown command {command}")
+        if len(args) != arity:
+            raise ValueError(f"{command} takes {arity} arguments, {len(args)} given")
+        for position in INTEGER_ARGUMENTS.get(method, ()):
+            if not args[position].isdigit():
+                raise ValueError("Amount must be a whole number")
+            args[position] = int(args[position])
+        return method, args, is_write
+
+    """
+    `write_loop(self)`: The single writer task, it carries out queued mutations in the order they arrived.
+    """
+    async def write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            method, args, result = await self.write_queue.get()
+            try:
+                result.set_result(await loop.run_in_executor(self.write_executor, self.call_api, method, args))
+            except Exception as e:
+                result.set_exception(e)
+            finally:
+                self.write_queue.task_done()
+
+    """
+    `call_api(self, method, args)`: Calls an API method in a worker thread, one call at a time.
+    """
+    def call_api(self, method, args):
+        with self.api_lock:
+            return getattr(self.api, method)(*args)
+
+    async def execute(self, line):
+        try:
+            method, args, is_write = self.parse_request(line)
+            if is_write:
+                result = asyncio.get_running_loop().create_future()
+                await self.write_queue.put((method, args, result))
+                value = await result
+            else:
+                value = await asyncio.get_running_loop().run_in_executor(None, self.call_api, method, args)
+            return f"OK {to_json(value)}"
+        except BankingError as e:
+            return f"ERROR {type(e).__name__} {e}"
+        except MalformedBalanceError as e:
+            return f"ERROR StorageError {e}"
+        except ValueError as e:
+            return f"ERROR ProtocolError {e}"
+        except OSError as e:
+            return f"ERROR StorageError {e}"
+        except Exception as e:
+            return f"ERROR InternalError {type(e).__name__}: {e}"
+
+    async def respond(self, line):
+        if line.upper() == "PING":
+            return "OK \"PONG\""
+        if line.upper() == "METRICS":
+            return f"OK {json.dumps(metrics.snapshot())}"
+        return await self.execute(line)
+
+    async def handle_session(self, reader, writer):
+        self.sessions += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    line = line.decode().strip()
+                except UnicodeDecodeError:
+                    response = "ERROR BadRequest The request is not valid UTF-8"
+                else:
+                    if not line:
+                        continue
+                    if line.upper() == "QUIT":
+                        break
+                    response = await self.respond(line)
+                self.requests += 1
+                writer.write(response.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def export_loop(self):
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            metrics.export(self.metrics_file)
+
+    async def start(self):
+        self.writer_task = asyncio.create_task(self.write_loop())
+        if self.metrics_file:
+            metrics.enable()
+            self.export_task = asyncio.create_task(self.export_loop())
+        if self.unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_session, path=self.unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_session, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        address = self.unix_path or f"{self.host}:{self.port}"
+        print(f"E-con Banking server listening on {address}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.write_queue.join()
+        self.writer_task.cancel()
+        self.write_executor.shutdown()
+        if self.export_task is not None:
+            self.export_task.cancel()
+            metrics.export(self.metrics_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the E-con Banking operations to many terminals.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--user-details", default=default_user_details_file(),
+                        help="User_details.csv, a SQLite .db file created by the SQLite storage engine, or a "
+                             "shard directory")
+    parser.add_argument("--journal", action="store_true",
+                        help="append balance and field changes to a journal instead of rewriting the CSV file")
+    parser.add_argument("--offset-index", action="store_true",
+                        help="read single accounts through a memory-mapped byte-offset index of the CSV file")
+    parser.add_argument("--balance-file", action="store_true",
+                        help="store balances in a fixed-width balance file, updated in place")
+    parser.add_argument("--metrics", help="export metrics to this file, Prometheus text for .prom, JSON otherwise")
+    parser.add_argument("--metrics-interval", type=float, default=15, help="seconds between metrics exports")
+    args = parser.parse_args(argv)
+
+    api = BankingApi(open_storage(args.user_details, args.journal, args.offset_index, args.balance_file))
+    server = BankingServer(api, args.host, args.port, args.unix, args.metrics, args.metrics_interval)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("Server stopped")
+    api.ledger.close()
+    if args.metrics:
+        metrics.export(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
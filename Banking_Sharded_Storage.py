@@ -0,0 +1,286 @@
+import csv
+import os
+import re
+import shutil
+import sys
+import zlib
+from array import array
+from Banking_Account_Records import to_balance
+from Banking_File_Lock import FileLock, atomic_write
+from Banking_Storage import ACCOUNT_FIELDNAMES, CSVStorage, StorageBackend
+
+"""
+`ShardedStorage` class:
+   - This class splits the user details over several CSV files in one directory, so a rewrite or a scan of one shard
+    no longer touches every customer.
+   - By default the shard is the `YYMM` prefix of the account number (`User_details_2401.csv`, ...), the month the
+    account was opened in. With `partition="hash:N"` accounts are spread over N shards by a CRC32 of the account
+    number instead (`User_details_h000.csv`, ...). The partitioning is recorded in a `partition.txt` file when the
+    directory is created, and always read back from there.
+   - Every shard is a `CSVStorage` with the same options (journal, offset index, balance file). The router sends a
+    lookup or update by account number to its shard. A phone number lookup asks each shard's index in turn.
+   - Writes hold one `FileLock` for the whole directory, so a read-modify-write such as a deposit stays atomic, and each
+    shard's own lock as well.
+   - `update_balances` across shards first writes the new balances to a `User_details.pending` file, which the next
+    `ShardedStorage` opened on the directory applies again if a crash cut the shard writes short.
+   - `map_shards` runs a function over every shard file in a process pool, for scans that can run in parallel.
+   - Only shards that have a file are kept open, so looking up account numbers of months that have no shard does not
+    grow the router.
+"""
+
+SHARD_FILE = re.compile(r"^User_details_(h?\d+)\.csv$")
+
+
+def shard_summary(csv_file):
+    accounts = 0
+    total_balance = 0
+    with open(csv_file, "r", newline="") as read_csv:
+        for row in csv.DictReader(read_csv):
+            accounts += 1
+            total_balance += to_balance(row["AMOUNT"], row["ACCOUNTNUMBER"])
+    return accounts, total_balance
+
+
+class ShardedStorage(StorageBackend):
+    def __init__(self, directory, partition="prefix", journal_mode=False, fsync=False, offset_index=False,
+                 balance_file=False):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.partition = self.read_partition(partition)
+        self.shard_count = int(self.partition.partition(":")[2] or 0)
+        self.options = {"journal_mode": journal_mode, "fsync": fsync, "offset_index": offset_index,
+                        "balance_file": balance_file}
+        self.file_lock = FileLock(os.path.join(directory, "User_details"))
+        self.shards = {}
+        self.recover()
+
+    def read_partition(self, partition):
+        partition_file = os.path.join(self.directory, "partition.txt")
+        if os.path.isfile(partition_file):
+            with open(partition_file, "r") as read_partition:
+                return read_partition.read().strip()
+        if partition != "prefix" and not re.match(r"^hash:[1-9]\d*$", partition):
+            raise ValueError(f"Unknown partitioning {partition!r}, use 'prefix' or 'hash:N'")
+        with open(partition_file, "w") as write_partition:
+            write_partition.write(partition + "\n")
+        return partition
+
+    """
+    `shard_key(self, account_number)`: Returns the shard an account number belongs to.
+    """
+    def shard_key(self, account_number):
+        account_number = str(account_number)
+        if self.shard_count:
+            return f"h{zlib.crc32(account_number.encode()) % self.shard_count:03d}"
+        return account_number[:4]
+
+    def shard_file(self, key):
+        return os.path.join(self.directory, f"User_details_{key}.csv")
+
+    def shard(self, key):
+        storage = self.shards.get(key)
+        if storage is None:
+            storage = CSVStorage(self.shard_file(key), **self.options)
+            if storage.exists():
+                self.shards[key] = storage
+        return storage
+
+    def shard_for(self, account_number):
+        return self.shard(self.shard_key(account_number))
+
+    """
+    `shard_keys(self)`: Returns the keys of the shards that have a file, in order. Shards created by another process are
+    picked up on the next call.
+    """
+    def shard_keys(self):
+        return sorted(match.group(1) for match in map(SHARD_FILE.match, os.listdir(self.directory)) if match)
+
+    def existing_shards(self):
+        return [self.shard(key) for key in self.shard_keys()]
+
+    def exists(self):
+        return any(shard.exists() for shard in self.existing_shards())
+
+    def fieldnames(self):
+        for shard in self.existing_shards():
+            return shard.fieldnames()
+        return list(ACCOUNT_FIELDNAMES)
+
+    def has_account(self, account_number):
+        shard = self.shard_for(account_number)
+        return shard.exists() and shard.has_account(str(account_number))
+
+    def get_account(self, account_number):
+        shard = self.shard_for(account_number)
+        return shard.get_account(str(account_number)) if shard.exists() else None
+
+    def get_balance(self, account_number):
+        shard = self.shard_for(account_number)
+        return shard.get_balance(str(account_number)) if shard.exists() else None
+
+    def get_account_number(self, phone_number):
+        for shard in self.existing_shards():
+            account_number = shard.get_account_number(phone_number)
+            if account_number is not None:
+                return account_number
+        return None
+
+    def phone_numbers(self):
+        phone_numbers = set()
+        for shard in self.existing_shards():
+            phone_numbers.update(shard.phone_numbers())
+        return phone_numbers
+
+    def accounts(self):
+        for shard in self.existing_shards():
+            yield from shard.accounts()
+
+    def balance_column(self):
+        account_numbers = []
+        balances = array("q")
+        with self.file_lock.shared():
+            for shard in self.existing_shards():
+                shard_account_numbers, shard_balances = shard.balance_column()
+                account_numbers.extend(shard_account_numbers)
+                balances.extend(shard_balances)
+        return account_numbers, balances
+
+    def write_lock(self):
+        return self.file_lock.exclusive()
+
+    def sidecar_file(self, extension):
+        return os.path.join(self.directory, "User_details" + extension)
+
+    def update_field(self, account_number, column, value):
+        with self.file_lock.exclusive():
+            self.shard_for(account_number).update_field(str(account_number), column, value)
+
+    def update_balances(self, balances):
+        balances_by_shard = {}
+        for account_number, balance in balances.items():
+            balances_by_shard.setdefault(self.shard_key(account_number), {})[str(account_number)] = balance
+        with self.file_lock.exclusive():
+            if len(balances_by_shard) > 1:
+                with atomic_write(self.sidecar_file(".pending"), fsync=True) as pending:
+                    csv.writer(pending).writerows(balances.items())
+            for key, shard_balances in balances_by_shard.items():
+                self.shard(key).update_balances(shard_balances)
+            if len(balances_by_shard) > 1:
+                os.remove(self.sidecar_file(".pending"))
+
+    """
+    `recover(self)`: Applies the balances of a cross-shard `update_balances` that did not finish. They are absolute
+    values, so applying them a second time is harmless.
+    """
+    def recover(self):
+        if not os.path.isfile(self.sidecar_file(".pending")):
+            return
+        with self.file_lock.exclusive():
+            if os.path.isfile(self.sidecar_file(".pending")):
+                with open(self.sidecar_file(".pending"), "r", newline="") as pending:
+                    balances = {account_number: int(balance) for account_number, balance in csv.reader(pending)}
+                for key in {self.shard_key(account_number) for account_number in balances}:
+                    self.shard(key).update_balances(
+                        {account_number: balance for account_number, balance in balances.items()
+                         if self.shard_key(account_number) == key}
+                    )
+                os.remove(self.sidecar_file(".pending"))
+
+    def add_account(self, row, fieldnames, write_header=None):
+        with self.file_lock.exclusive():
+            self.shard_for(row["ACCOUNTNUMBER"]).add_account(row, fieldnames)
+
+    def add_accounts(self, rows):
+        rows_by_shard = {}
+        for row in rows:
+            rows_by_shard.setdefault(self.shard_key(row["ACCOUNTNUMBER"]), []).append(row)
+        with self.file_lock.exclusive():
+            for key, shard_rows in rows_by_shard.items():
+                self.shard(key).add_accounts(shard_rows)
+
+    """
+    `rewrite_rows(self, transform)`: Rewrites the shards one after the other, so only one shard is copied at a time.
+    """
+    def rewrite_rows(self, transform):
+        with self.file_lock.exclusive():
+            for shard in self.existing_shards():
+                shard.rewrite_rows(transform)
+
+    """
+    `map_shards(self, function, workers=None)`: Calls `function(shard_csv_file)` for every shard in a process pool and
+    returns the results in shard order. `function` must be a module-level function, so it can be sent to the workers.
+    The shards are read as they are on disk, without journal entries or a balance file.
+    """
+    def map_shards(self, function, workers=None):
+        files = [shard.csv_file for shard in self.existing_shards()]
+        if len(files) <= 1 or workers == 1:
+            return [function(csv_file) for csv_file in files]
+        # The process pool is only imported by the first parallel scan, it is not needed to start the menu.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with self.file_lock.shared(), ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(function, files))
+
+    """
+    `summary(self, workers=None)`: Returns the number of accounts and the total balance of every shard, scanned in
+    parallel.
+    """
+    def summary(self, workers=None):
+        return dict(zip(self.shard_keys(), self.map_shards(shard_summary, workers)))
+
+
+"""
+`split_csv_into_shards(csv_file, directory, partition="prefix")`: Copies every account of a `User_details.csv` file
+into its shard and returns the number of accounts copied.
+    - The accounts are read through a `CSVStorage`, so balances held in a journal or balance file are copied too.
+    - The ledger and the record of accrued interest months are copied into the directory when it has none yet, so
+    statements and the once-a-month interest check carry over. The account number sequence is not: the allocator
+    scans the shards for used numbers on its first run.
+"""
+
+# Files next to the user details that move with the accounts.
+CARRIED_SIDECARS = (".ledger", ".interest")
+
+
+def split_csv_into_shards(csv_file, directory, partition="prefix"):
+    source = CSVStorage(csv_file)
+    if not source.exists():
+        raise FileNotFoundError(2, "No such file or directory", csv_file)
+    rows = [{field: row.get(field, "") for field in ACCOUNT_FIELDNAMES} for row in source.accounts()]
+    storage = ShardedStorage(directory, partition)
+    storage.add_accounts(rows)
+    for extension in CARRIED_SIDECARS:
+        if os.path.isfile(source.sidecar_file(extension)) and not os.path.exists(storage.sidecar_file(extension)):
+            shutil.copyfile(source.sidecar_file(extension), storage.sidecar_file(extension))
+    return len(rows)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Split the user details into shards, or summarise the shards.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    split = commands.add_parser("split", help="copy a User_details.csv file into a shard directory")
+    split.add_argument("csv_file")
+    split.add_argument("directory")
+    split.add_argument("--partition", default="prefix", help="'prefix' (YYMM of the account number) or 'hash:N'")
+    summary = commands.add_parser("summary", help="count the accounts and balances of every shard in parallel")
+    summary.add_argument("directory")
+    summary.add_argument("--workers", type=int, help="number of scanning processes, one per CPU by default")
+    args = parser.parse_args(argv)
+
+    if args.command == "split":
+        try:
+            count = split_csv_into_shards(args.csv_file, args.directory, args.partition)
+        except FileNotFoundError as e:
+            print(f"File not found in the given path: {e.filename}")
+            return 1
+        print(f"{count} accounts copied into {args.directory}")
+        return 0
+    for key, (accounts, total_balance) in ShardedStorage(args.directory).summary(args.workers).items():
+        print(f"{key}: {accounts} accounts, total balance {total_balance}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+"""
+Cold-start budget check:
+   - Imports `Banking_Home_Page` in a fresh interpreter several times and reports the fastest import time.
+   - The check fails when the import takes longer than the budget, or when it loads a module that should only be
+    imported once an EMI or display path needs it.
+"""
+
+IMPORT_BUDGET_MS = 100
+LAZY_MODULES = ["babel", "prettytable", "numpy", "sqlite3"]
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import Banking_Home_Page
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"import_ms": elapsed, "loaded": [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(runs=5):
+    probe = PROBE.format(path=os.path.dirname(os.path.abspath(__file__)), lazy=LAZY_MODULES)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+        results.append(json.loads(output.stdout))
+    return min(result["import_ms"] for result in results), results[0]["loaded"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the cold-start import budget of Banking_Home_Page.")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    import_ms, loaded = measure_import(args.runs)
+    print(f"Banking_Home_Page import: {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if loaded:
+        print(f"Modules loaded at import that should be lazy: {', '.join(loaded)}")
+    if import_ms > args.budget_ms or loaded:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,662 @@
+import contextlib
+import csv
+import os
+import sys
+from array import array
+from Banking_Account_Index import AccountIndex
+from Banking_Account_Records import ACCOUNT_FIELDNAMES, AccountRecord, to_balance
+from Banking_Balance_File import BalanceFile
+from Banking_Balance_Journal import BalanceJournal
+from Banking_File_Lock import FileLock, atomic_write
+from Banking_Metrics import metrics
+from Banking_Offset_Index import OffsetIndex
+
+"""
+Storage backends for the user details:
+   - `StorageBackend` is the interface the `BankingSystem` class calls for every read and write of account data.
+   - `CSVStorage` keeps the original `User_details.csv` behaviour, with the account index and the optional journal.
+   - `SQLiteStorage` keeps the accounts in a `sqlite3` database with indexed account and phone number columns.
+   - `migrate_csv_to_sqlite` copies an existing `User_details.csv` into a SQLite database in one transaction. The menu
+    runs it when `--storage sqlite` finds no database yet, and `python Banking_Storage.py User_details.csv
+    User_details.db` runs it by hand.
+   - `open_storage` opens the right backend for a user details path, for the command line tools.
+"""
+
+
+
+class StorageBackend:
+    """
+    Every method works on account rows given as dictionaries of strings, keyed by the CSV column names.
+    """
+
+    def exists(self):
+        raise NotImplementedError
+
+    def fieldnames(self):
+        raise NotImplementedError
+
+    def has_account(self, account_number):
+        raise NotImplementedError
+
+    def get_account(self, account_number):
+        raise NotImplementedError
+
+    def get_account_number(self, phone_number):
+        raise NotImplementedError
+
+    """
+    `get_balance(self, account_number)`: Returns the balance of an account as an integer, or None when it does not exist.
+    """
+    def get_balance(self, account_number):
+        row = self.get_account(account_number)
+        return to_balance(row["AMOUNT"], account_number) if row is not None else None
+
+    """
+    `get_record(self, account_number)`: Returns the typed `AccountRecord` of an account, or None when it does not exist.
+    """
+    def get_record(self, account_number):
+        row = self.get_account(account_number)
+        return AccountRecord.from_row(row) if row is not None else None
+
+    def phone_numbers(self):
+        raise NotImplementedError
+
+    def update_field(self, account_number, column, value):
+        raise NotImplementedError
+
+    def add_account(self, row, fieldnames, write_header=None):
+        raise NotImplementedError
+
+    """
+    `update_balances(self, balances)`: Stores new balances for several accounts, given as a dictionary of account number
+    to balance, in one write, so a transfer never leaves only one side changed.
+    """
+    def update_balances(self, balances):
+        raise NotImplementedError
+
+    """
+    `add_accounts(self, rows)`: Adds many new accounts, given as rows with all `ACCOUNT_FIELDNAMES`, in one write.
+    """
+    def add_accounts(self, rows):
+        for row in rows:
+            self.add_account(row, ACCOUNT_FIELDNAMES)
+
+    def accounts(self):
+        raise NotImplementedError
+
+    """
+    `balance_column(self)`: Returns the account numbers as a list and their balances as an `array("q")` in the same
+    order, read in one pass, for batch jobs that work on every balance at once.
+    """
+    def balance_column(self):
+        account_numbers = []
+        balances = array("q")
+        for row in self.accounts():
+            account_numbers.append(row["ACCOUNTNUMBER"])
+            balances.append(to_balance(row["AMOUNT"], row["ACCOUNTNUMBER"]))
+        return account_numbers, balances
+
+    """
+    `write_lock(self)`: Returns a context manager that keeps other writers out for a read-modify-write, such as reading
+    a balance and storing the new one. Writes made inside it do not take the lock again.
+    """
+    def write_lock(self):
+        return contextlib.nullcontext()
+
+    """
+    `sidecar_file(self, extension)`: Returns the path of a helper file kept next to the account data, such as the
+    account number sequence.
+    """
+    def sidecar_file(self, extension):
+        raise NotImplementedError
+
+    """
+    `rewrite_rows(self, transform)`: Calls `transform(row)` once for every account in a single pass, and stores the
+    rows for which it returned True.
+    """
+    def rewrite_rows(self, transform):
+        raise NotImplementedError
+
+
+"""
+`CSVStorage` class:
+   - Reads go through an `AccountIndex`, so lookups by account or phone number are dictionary accesses.
+   - Writes rewrite `User_details.csv` through a temporary file, or append to a `BalanceJournal` in journal mode.
+   - Every process using the same file shares one `FileLock`: writes hold it exclusively, reloads of the index hold it
+    shared. Rewrites go through a temporary file in the same directory and `os.replace`, with `fsync=True` the data is
+    also flushed to disk before the rename.
+   - With `offset_index=True` single-account reads go through an `OffsetIndex` instead, which memory-maps the file and
+    parses only the requested line. The in-memory `AccountIndex` is then only loaded for whole-file work such as
+    `accounts()`. The option is ignored in journal mode, where the CSV file alone does not hold the current values.
+   - With `balance_file=True` balances are stored in a fixed-width `BalanceFile`, one positional write per change,
+    and the `AMOUNT` column of the CSV file is only brought up to date by the next full rewrite.
+   - A journal or balance file found next to the CSV file holds newer values than the CSV file, so the storage always
+    opens in that mode, whatever the options say. A batch job or a menu started without the option therefore reads
+    and writes the same balances as the program that created the file.
+"""
+
+
+class CSVStorage(StorageBackend):
+    def __init__(self, csv_file, journal_mode=False, fsync=False, offset_index=False, balance_file=False):
+        self.csv_file = csv_file
+        self.fsync = fsync
+        journal_mode = journal_mode or os.path.isfile(self.sidecar_file(".journal"))
+        balance_file = balance_file or os.path.isfile(self.sidecar_file(".balances"))
+        self.file_lock = FileLock(csv_file)
+        self.balance_journal = BalanceJournal(csv_file, file_lock=self.file_lock, fsync=fsync) if journal_mode else None
+        self.balance_file = BalanceFile(self.sidecar_file(".balances"), self.file_lock, fsync) if balance_file else None
+        self.account_index = AccountIndex(csv_file, self.balance_journal, self.file_lock, self.balance_file)
+        self.offset_index = OffsetIndex(csv_file, self.file_lock) if offset_index and not journal_mode else None
+        # The index that answers single-account reads.
+        self.lookup_index = self.offset_index or self.account_index
+
+    def exists(self):
+        return os.path.isfile(self.csv_file)
+
+    def fieldnames(self):
+        return self.lookup_index.get_fieldnames()
+
+    def has_account(self, account_number):
+        return self.lookup_index.has_account(account_number)
+
+    def get_account(self, account_number):
+        row = self.lookup_index.get_row(account_number)
+        if row is not None and self.balance_file is not None:
+            # Read from the balance file itself, another process may have stored a balance since the index was loaded.
+            balance = self.stored_balance(account_number)
+            if balance is not None:
+                row["AMOUNT"] = str(balance)
+        return row
+
+    def get_account_number(self, phone_number):
+        return self.lookup_index.get_account_number(phone_number)
+
+    """
+    `get_record(self, account_number)`: Builds the record straight from the columns of the in-memory account table,
+    without a row dictionary, unless single-account reads go through the offset index or the balance file.
+    """
+    def get_record(self, account_number):
+        if self.offset_index is not None or self.balance_file is not None:
+            return super().get_record(account_number)
+        self.account_index.refresh()
+        return self.account_index.table.get_record(account_number)
+
+    def get_balance(self, account_number):
+        if self.balance_file is not None:
+            balance = self.stored_balance(account_number)
+            if balance is not None:
+                return balance
+        if self.offset_index is not None:
+            return super().get_balance(account_number)
+        self.account_index.refresh()
+        return self.account_index.table.get_balance(account_number)
+
+    def phone_numbers(self):
+        return self.lookup_index.phone_numbers()
+
+    def accounts(self):
+        self.account_index.refresh()
+        return iter(list(self.account_index.rows()))
+
+    """
+    `balance_column(self)`: Uses the account index when it is already loaded or a journal has to be applied, otherwise
+    reads only the `ACCOUNTNUMBER` and `AMOUNT` columns of the CSV file, with the balance file on top.
+    """
+    def balance_column(self):
+        with self.file_lock.shared():
+            if self.account_index.file_stamp is not None or self.balance_journal is not None:
+                self.account_index.refresh()
+                table = self.account_index.table
+                return list(table.positions), array("q", table.balances)
+            account_numbers = []
+            balances = array("q")
+            with open(self.csv_file, "r", newline="") as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, None) or ACCOUNT_FIELDNAMES
+                account_column, amount_column = header.index("ACCOUNTNUMBER"), header.index("AMOUNT")
+                for row in reader:
+                    if len(row) > amount_column:
+                        account_numbers.append(row[account_column])
+                        balances.append(to_balance(row[amount_column], row[account_column]))
+            metrics.file_scanned(self.csv_file)
+            if self.balance_file is not None and self.balance_file.exists():
+                positions = {account_number: position for position, account_number in enumerate(account_numbers)}
+                for account_number, balance in self.balance_file.balances():
+                    if account_number in positions:
+                        balances[positions[account_number]] = balance
+            return account_numbers, balances
+
+    """
+    `update_field(self, account_number, column, value)`: Changes one column of one account, through the journal when it
+    is enabled, otherwise by rewriting the CSV file.
+    """
+    def update_field(self, account_number, column, value):
+        with self.file_lock.exclusive():
+            if self.balance_file is not None and column == "AMOUNT":
+                self.store_balance(account_number, value)
+            elif self.balance_journal is not None:
+                self.journal_change(account_number, column, value)
+            else:
+                self.rewrite_field(account_number, column, value)
+
+    def write_lock(self):
+        return self.file_lock.exclusive()
+
+    def update_balances(self, balances):
+        balances = {str(account_number): balance for account_number, balance in balances.items()}
+        with self.file_lock.exclusive():
+            if self.balance_file is not None:
+                if not self.balance_file.exists():
+                    self.build_balance_file()
+                self.balance_file.set_many(balances)
+                self.account_index.update_balances(balances)
+            elif self.balance_journal is not None:
+                self.account_index.refresh()
+                self.balance_journal.append_changes(
+                    [(account_number, "AMOUNT", balance) for account_number, balance in balances.items()]
+                )
+                self.account_index.update_balances(balances)
+                if self.balance_journal.needs_compaction():
+                    self.balance_journal.compact(self.account_index)
+            else:
+                self.rewrite_balances(balances)
+
+    def stored_balance(self, account_number):
+        return self.balance_file.get(account_number) if self.balance_file.exists() else None
+
+    """
+    `store_balance(self, account_number, value)`: Writes a balance into the balance file, which is built from the CSV
+    file by the first balance change.
+    """
+    def store_balance(self, account_number, value):
+        if not self.balance_file.exists():
+            self.build_balance_file()
+        self.balance_file.set(account_number, int(value))
+        self.account_index.update_row(account_number, "AMOUNT", value)
+
+    """
+    `build_balance_file(self)`: Builds the balance file from the CSV file, after folding in a journal that holds newer
+    balances.
+    """
+    def build_balance_file(self):
+        if self.balance_journal is not None and self.balance_journal.size():
+            self.balance_journal.compact(self.account_index)
+        self.balance_file.build(self.csv_file)
+
+    """
+    `sync_account_index(self)`: Brings the in-memory index up to date before a write. With the offset index it is only
+    kept up to date once something has loaded it.
+    """
+    def sync_account_index(self):
+        if self.offset_index is None or self.account_index.file_stamp is not None:
+            self.account_index.refresh()
+
+    def release_offset_map(self):
+        if self.offset_index is not None:
+            self.offset_index.release()
+
+    def sidecar_file(self, extension):
+        return os.path.splitext(self.csv_file)[0] + extension
+
+    """
+    `journal_change(self, account_number, column, value)`: Appends one change to the balance journal, updates the
+    index, and folds the journal back into the CSV file once it passes the compaction threshold.
+    """
+    def journal_change(self, account_number, column, value):
+        self.account_index.refresh()
+        self.balance_journal.append(account_number, column, value)
+        self.account_index.update_row(account_number, column, value)
+        if self.balance_journal.needs_compaction():
+            self.balance_journal.compact(self.account_index)
+
+    """
+    `rewrite_field(self, account_number, column, value)`: Copies the CSV file into a temporary file with the one column
+    changed, and replaces the original with it.
+    """
+    def rewrite_field(self, account_number, column, value):
+        self.sync_account_index()
+        self.release_offset_map()
+        with open(self.csv_file, "r") as csvfile, atomic_write(self.csv_file, self.fsync) as temp_file:
+            reader = csv.DictReader(csvfile)
+            fieldnames = reader.fieldnames
+            writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in reader:
+                if row["ACCOUNTNUMBER"] == account_number:
+                    row[column] = value
+                writer.writerow(row)
+        metrics.file_scanned(self.csv_file)
+        metrics.file_rewritten(self.csv_file)
+        self.account_index.update_row(account_number, column, value)
+
+    """
+    `rewrite_balances(self, balances)`: Copies the CSV file into a temporary file with the `AMOUNT` of the given accounts
+    changed and replaces the original with it. Rows are copied as plain lists, without building a dictionary per row.
+    """
+    def rewrite_balances(self, balances):
+        if self.account_index.file_stamp is not None:
+            self.account_index.refresh()
+        self.release_offset_map()
+        with open(self.csv_file, "r", newline="") as csvfile, atomic_write(self.csv_file, self.fsync) as temp_file:
+            reader = csv.reader(csvfile)
+            writer = csv.writer(temp_file)
+            header = next(reader, None)
+            if header is not None:
+                writer.writerow(header)
+                account_column, amount_column = header.index("ACCOUNTNUMBER"), header.index("AMOUNT")
+                for row in reader:
+                    if len(row) > amount_column and row[account_column] in balances:
+                        row[amount_column] = balances[row[account_column]]
+                    if row:
+                        writer.writerow(row)
+        metrics.file_scanned(self.csv_file)
+        metrics.file_rewritten(self.csv_file)
+        self.account_index.update_balances(balances)
+
+    def rewrite_rows(self, transform):
+        with self.file_lock.exclusive():
+            self.sync_account_index()
+            self.release_offset_map()
+            if self.balance_journal is not None and self.balance_journal.size():
+                self.balance_journal.compact(self.account_index)
+            changed_rows = []
+            balances = {}
+            if self.balance_file is not None and self.balance_file.exists():
+                balances = dict(self.balance_file.balances())
+            with open(self.csv_file, "r") as csvfile, atomic_write(self.csv_file, self.fsync) as temp_file:
+                reader = csv.DictReader(csvfile)
+                writer = csv.DictWriter(temp_file, fieldnames=reader.fieldnames)
+                writer.writeheader()
+                for row in reader:
+                    if row["ACCOUNTNUMBER"] in balances:
+                        row["AMOUNT"] = str(balances[row["ACCOUNTNUMBER"]])
+                    if transform(row):
+                        row = {key: str(value) for key, value in row.items()}
+                        changed_rows.append(row)
+                        if row["ACCOUNTNUMBER"] in balances:
+                            self.balance_file.set(row["ACCOUNTNUMBER"], int(row["AMOUNT"]))
+                    writer.writerow(row)
+            metrics.file_scanned(self.csv_file)
+            metrics.file_rewritten(self.csv_file)
+            self.account_index.replace_rows(changed_rows)
+
+    def add_account(self, row, fieldnames, write_header=None):
+        with self.file_lock.exclusive():
+            if write_header is None:
+                write_header = not self.exists()
+            with open(self.csv_file, "a", newline="") as csvFile:
+                writer = csv.DictWriter(csvFile, fieldnames=fieldnames)
+                written = writer.writeheader() if write_header else 0
+                offset = csvFile.tell()
+                written += writer.writerow(row)
+                end = csvFile.tell()
+                metrics.count("csv_bytes_written", written)
+                if self.fsync:
+                    csvFile.flush()
+                    os.fsync(csvFile.fileno())
+            self.account_index.add_row(row)
+            if self.balance_file is not None and self.balance_file.exists():
+                self.balance_file.add(row["ACCOUNTNUMBER"], row["AMOUNT"])
+            if self.offset_index is not None:
+                self.offset_index.add_row(offset, end, row)
+
+    def add_accounts(self, rows):
+        with self.file_lock.exclusive():
+            write_header = not self.exists()
+            fieldnames = self.fieldnames() if not write_header else ACCOUNT_FIELDNAMES
+            with open(self.csv_file, "a", newline="", buffering=1024 * 1024) as csvFile:
+                start = csvFile.tell()
+                writer = csv.DictWriter(csvFile, fieldnames=fieldnames)
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(rows)
+                if metrics.enabled:
+                    metrics.count("csv_bytes_written", csvFile.tell() - start)
+                if self.fsync:
+                    csvFile.flush()
+                    os.fsync(csvFile.fileno())
+            if self.balance_file is not None and self.balance_file.exists():
+                for row in rows:
+                    self.balance_file.add(row["ACCOUNTNUMBER"], row["AMOUNT"])
+            self.account_index.replace_rows(rows)
+
+
+"""
+`SQLitePhoneNumbers` class:
+   - A set-like view of the phone numbers in a SQLite store, membership checks use the phone number index.
+"""
+
+
+class SQLitePhoneNumbers:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __contains__(self, phone_number):
+        cursor = self.connection.execute(
+            "SELECT 1 FROM accounts WHERE PHONENUMBER = ? LIMIT 1", (phone_number,)
+        )
+        return cursor.fetchone() is not None
+
+    def __iter__(self):
+        for (phone_number,) in self.connection.execute("SELECT PHONENUMBER FROM accounts"):
+            yield phone_number
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+
+
+"""
+`SQLiteStorage` class:
+   - Keeps the accounts in one `accounts` table, `ACCOUNTNUMBER` is the primary key and `PHONENUMBER` has its own index.
+   - The database runs in WAL mode, and every update is committed in its own transaction. `write_lock` opens a
+    `BEGIN IMMEDIATE` transaction instead, the updates made inside it are committed together when it ends.
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    def __init__(self, db_file):
+        import sqlite3
+
+        self.db_file = db_file
+        # The server calls the storage from its worker threads, one call at a time.
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.transaction_depth = 0
+        self.create_table()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        if self.transaction_depth == 0:
+            self.connection.execute("BEGIN IMMEDIATE")
+        self.transaction_depth += 1
+        try:
+            yield self.connection
+        except BaseException:
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.connection.rollback()
+            raise
+        self.transaction_depth -= 1
+        if self.transaction_depth == 0:
+            self.connection.commit()
+
+    def write_lock(self):
+        return self.transaction()
+
+    def sidecar_file(self, extension):
+        return os.path.splitext(self.db_file)[0] + extension
+
+    def create_table(self):
+        columns = ", ".join(
+            "AMOUNT INTEGER" if name == "AMOUNT" else
+            "ACCOUNTNUMBER TEXT PRIMARY KEY" if name == "ACCOUNTNUMBER" else
+            f"{name} TEXT"
+            for name in ACCOUNT_FIELDNAMES
+        )
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS accounts ({columns})")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS accounts_phone_number ON accounts (PHONENUMBER)"
+            )
+
+    @staticmethod
+    def row_to_dict(row):
+        return {name: str(value) for name, value in zip(ACCOUNT_FIELDNAMES, row)}
+
+    def exists(self):
+        return self.connection.execute("SELECT 1 FROM accounts LIMIT 1").fetchone() is not None
+
+    def fieldnames(self):
+        return list(ACCOUNT_FIELDNAMES)
+
+    def has_account(self, account_number):
+        return self.get_account(account_number) is not None
+
+    def get_account(self, account_number):
+        row = self.connection.execute(
+            "SELECT * FROM accounts WHERE ACCOUNTNUMBER = ?", (str(account_number),)
+        ).fetchone()
+        return self.row_to_dict(row) if row is not None else None
+
+    def get_account_number(self, phone_number):
+        row = self.connection.execute(
+            "SELECT ACCOUNTNUMBER FROM accounts WHERE PHONENUMBER = ?", (phone_number,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def get_balance(self, account_number):
+        row = self.connection.execute(
+            "SELECT AMOUNT FROM accounts WHERE ACCOUNTNUMBER = ?", (str(account_number),)
+        ).fetchone()
+        return int(row[0]) if row is not None else None
+
+    def phone_numbers(self):
+        return SQLitePhoneNumbers(self.connection)
+
+    def accounts(self):
+        for row in self.connection.execute("SELECT * FROM accounts ORDER BY rowid"):
+            yield self.row_to_dict(row)
+
+    def balance_column(self):
+        account_numbers = []
+        balances = array("q")
+        for account_number, balance in self.connection.execute(
+            "SELECT ACCOUNTNUMBER, AMOUNT FROM accounts ORDER BY rowid"
+        ):
+            account_numbers.append(account_number)
+            balances.append(int(balance))
+        return account_numbers, balances
+
+    def update_field(self, account_number, column, value):
+        if column not in ACCOUNT_FIELDNAMES:
+            raise KeyError(column)
+        with self.transaction():
+            self.connection.execute(
+                f"UPDATE accounts SET {column} = ? WHERE ACCOUNTNUMBER = ?", (value, str(account_number))
+            )
+
+    def update_balances(self, balances):
+        with self.transaction():
+            self.connection.executemany(
+                "UPDATE accounts SET AMOUNT = ? WHERE ACCOUNTNUMBER = ?",
+                [(int(balance), str(account_number)) for account_number, balance in balances.items()],
+            )
+
+    def rewrite_rows(self, transform):
+        assignments = ", ".join(f"{name} = ?" for name in ACCOUNT_FIELDNAMES)
+        with self.transaction():
+            rows = self.connection.execute("SELECT * FROM accounts ORDER BY rowid").fetchall()
+            for row in rows:
+                row = self.row_to_dict(row)
+                if transform(row):
+                    values = [row[name] for name in ACCOUNT_FIELDNAMES]
+                    self.connection.execute(
+                        f"UPDATE accounts SET {assignments} WHERE ACCOUNTNUMBER = ?",
+                        values + [row["ACCOUNTNUMBER"]],
+                    )
+
+    def add_account(self, row, fieldnames, write_header=None):
+        values = [row.get(name, "") for name in ACCOUNT_FIELDNAMES]
+        placeholders = ", ".join("?" for _ in ACCOUNT_FIELDNAMES)
+        with self.transaction():
+            self.connection.execute(f"INSERT INTO accounts VALUES ({placeholders})", values)
+
+    def add_accounts(self, rows):
+        placeholders = ", ".join("?" for _ in ACCOUNT_FIELDNAMES)
+        with self.transaction():
+            self.connection.executemany(
+                f"INSERT INTO accounts VALUES ({placeholders})",
+                ([row.get(name, "") for name in ACCOUNT_FIELDNAMES] for row in rows),
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+"""
+`migrate_csv_to_sqlite(csv_file, db_file)`: Copies every row of an existing `User_details.csv` into a SQLite database.
+    - All rows are inserted with one `executemany` inside a single transaction, with synchronous writes switched off
+    for the duration of the load. Returns the number of migrated accounts.
+"""
+
+
+def migrate_csv_to_sqlite(csv_file, db_file):
+    placeholders = ", ".join("?" for _ in ACCOUNT_FIELDNAMES)
+    # The accounts are read through a `CSVStorage`, so balances held in a journal or balance file are copied too. They
+    # are read before the database is created, so a wrong path does not leave an empty database behind.
+    source = CSVStorage(csv_file)
+    if not source.exists():
+        raise FileNotFoundError(2, "No such file or directory", csv_file)
+    rows = [[row.get(name, "") for name in ACCOUNT_FIELDNAMES] for row in source.accounts()]
+    storage = SQLiteStorage(db_file)
+    try:
+        storage.connection.execute("PRAGMA synchronous=OFF")
+        with storage.connection:
+            cursor = storage.connection.executemany(f"INSERT OR REPLACE INTO accounts VALUES ({placeholders})", rows)
+        storage.connection.execute("PRAGMA synchronous=FULL")
+        return cursor.rowcount
+    finally:
+        storage.close()
+
+
+def default_user_details_file():
+    user_details_path = os.path.join(os.path.expanduser("~"), "Desktop", "Banking", "UserDetails")
+    return user_details_path + "\\" + "User_details.csv"
+
+
+"""
+`open_storage(user_details_file, journal_mode=False, offset_index=False, balance_file=False)`: Returns a
+`SQLiteStorage` for a `.db` file, a `ShardedStorage` for a shard directory, otherwise a `CSVStorage` for the CSV file.
+A CSV file, or a shard, with a journal or balance file next to it is opened in that mode even without the option.
+"""
+
+
+def open_storage(user_details_file, journal_mode=False, offset_index=False, balance_file=False):
+    if user_details_file.endswith(".db"):
+        return SQLiteStorage(user_details_file)
+    if os.path.isdir(user_details_file):
+        from Banking_Sharded_Storage import ShardedStorage
+
+        return ShardedStorage(user_details_file, journal_mode=journal_mode, offset_index=offset_index,
+                              balance_file=balance_file)
+    return CSVStorage(user_details_file, journal_mode, offset_index=offset_index, balance_file=balance_file)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Copy the accounts of a User_details.csv file into a SQLite database.")
+    parser.add_argument("csv_file", help="User_details.csv")
+    parser.add_argument("db_file", help="SQLite database to create or update, for example User_details.db")
+    args = parser.parse_args(argv)
+    try:
+        count = migrate_csv_to_sqlite(args.csv_file, args.db_file)
+    except FileNotFoundError as e:
+        print(f"File not found in the given path: {e.filename}")
+        return 1
+    print(f"{count} accounts copied into {args.db_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Transaction rules:
+   - These are the limits the `Transaction` menu enforces, kept in one place so batch jobs apply exactly the same checks.
+   - Each check returns the message the menu prints when the rule is broken, or `None` when the transaction is allowed.
+"""
+
+MINIMUM_DEPOSIT = 100
+MINIMUM_WITHDRAWAL = 100
+MINIMUM_BALANCE = 1000
+MINIMUM_TRANSFER = 100
+# Yearly interest on savings balances in percent, credited every month by `Banking_Interest_Accrual`.
+SAVINGS_INTEREST_RATE = 3.5
+
+
+def deposit_error(balance, amount):
+    if amount < MINIMUM_DEPOSIT:
+        return f"Minimum Amount to be deposited will be more than {MINIMUM_DEPOSIT}"
+    return None
+
+
+def withdrawal_error(balance, amount):
+    if balance < MINIMUM_BALANCE:
+        return "Insufficient Balance"
+    if amount < MINIMUM_WITHDRAWAL:
+        return f"Minimum amount to be withdrawn must be {MINIMUM_WITHDRAWAL} or more."
+    if amount >= balance or balance - amount < MINIMUM_BALANCE:
+        return f"Minimum Balance should be {MINIMUM_BALANCE}. "
+    return None
+
+
+"""
+`transfer_error(from_balance, amount)`: A transfer debits the sending account like a withdrawal, so the same minimum
+balance applies to it.
+"""
+
+
+def transfer_error(from_balance, amount):
+    if from_balance < MINIMUM_BALANCE:
+        return "Insufficient Balance"
+    if amount < MINIMUM_TRANSFER:
+        return f"Minimum amount to be transferred must be {MINIMUM_TRANSFER} or more."
+    if amount >= from_balance or from_balance - amount < MINIMUM_BALANCE:
+        return f"Minimum Balance should be {MINIMUM_BALANCE}. "
+    return None
@@ -0,0 +1,67 @@
+import os
+import sys
+from collections import namedtuple
+
+import pytest
+
+# The Banking modules live at the top of the repository and import each other by name.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Banking_Api import BankingApi  # noqa: E402
+from Banking_Benchmarks import generate_user_details  # noqa: E402
+from Banking_Ledger import Ledger  # noqa: E402
+from Banking_Sharded_Storage import ShardedStorage, split_csv_into_shards  # noqa: E402
+from Banking_Storage import CSVStorage, SQLiteStorage, migrate_csv_to_sqlite, open_storage  # noqa: E402
+
+"""
+Shared fixtures of the test suite:
+   - `store` is a small account store in every storage mode the programs support, opened the way the menu opens it
+    (`storage`), together with the path the command line tools are given (`path`) and the synthetic accounts.
+   - `reopen(store)` opens the same store again with `open_storage` and no options, as a batch job or a new terminal
+    does, so a test can check what the next program reads.
+"""
+
+STORAGE_MODES = ["csv", "journal", "balance_file", "sqlite", "sharded"]
+ACCOUNT_COUNT = 50
+
+Store = namedtuple("Store", ["mode", "path", "storage", "accounts"])
+
+
+def open_store(mode, directory, count=ACCOUNT_COUNT):
+    csv_file = os.path.join(directory, "User_details.csv")
+    accounts = generate_user_details(csv_file, count)
+    if mode == "sqlite":
+        path = os.path.join(directory, "User_details.db")
+        migrate_csv_to_sqlite(csv_file, path)
+        storage = SQLiteStorage(path)
+    elif mode == "sharded":
+        path = os.path.join(directory, "Shards")
+        split_csv_into_shards(csv_file, path)
+        storage = ShardedStorage(path)
+    else:
+        path = csv_file
+        storage = CSVStorage(csv_file, journal_mode=mode == "journal", balance_file=mode == "balance_file")
+    return Store(mode, path, storage, [account_number for account_number, _ in accounts])
+
+
+def reopen(store):
+    return open_storage(store.path)
+
+
+def ledger_of(storage):
+    return Ledger(storage.sidecar_file(".ledger"))
+
+
+@pytest.fixture(params=STORAGE_MODES)
+def store(request, tmp_path):
+    store = open_store(request.param, str(tmp_path))
+    yield store
+    if hasattr(store.storage, "close"):
+        store.storage.close()
+
+
+@pytest.fixture
+def api(store):
+    api = BankingApi(store.storage)
+    yield api
+    api.ledger.close()
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from Banking_Account_Allocator import FIRST_SUFFIX, LAST_SUFFIX, AccountNumberAllocator, AccountNumbersExhausted
+from Banking_Account_Records import ACCOUNT_FIELDNAMES
+from Banking_Storage import CSVStorage
+
+
+class CountingStorage(CSVStorage):
+    """A CSV store that counts the full scans made through `accounts()`."""
+
+    scans = 0
+
+    def accounts(self):
+        self.scans += 1
+        return super().accounts()
+
+
+def storage_with_accounts(tmp_path, account_numbers):
+    storage = CountingStorage(str(tmp_path / "User_details.csv"))
+    storage.add_accounts([
+        dict(dict.fromkeys(ACCOUNT_FIELDNAMES, "x"), ACCOUNTNUMBER=account_number, AGE="30", AMOUNT="1000")
+        for account_number in account_numbers
+    ])
+    return storage
+
+
+def test_cutover_keeps_the_lowest_free_suffixes(tmp_path):
+    storage = storage_with_accounts(tmp_path, ["2610100000", "2610100002", "2611100001", "2611999999"])
+    allocator = AccountNumberAllocator(str(tmp_path / "User_details.sequence"), storage)
+
+    assert allocator.reserve(3, "2610") == ["2610100001", "2610100003", "2610100004"]
+    assert allocator.reserve(2, "2611") == ["2611100000", "2611100002"]
+    assert allocator.allocate("2610") == "2610100005"
+
+
+def test_storage_is_scanned_only_at_the_cutover(tmp_path):
+    storage = storage_with_accounts(tmp_path, ["2610100000"])
+    sequence_file = str(tmp_path / "User_details.sequence")
+    AccountNumberAllocator(sequence_file, storage).allocate("2610")
+    assert storage.scans == 1
+
+    # A new month, in a new process, starts at the first suffix without scanning the accounts again.
+    assert AccountNumberAllocator(sequence_file, storage).allocate("2611") == f"2611{FIRST_SUFFIX}"
+    assert AccountNumberAllocator(sequence_file, storage).allocate("2610") == "2610100002"
+    assert storage.scans == 1
+    assert not os.path.exists(sequence_file + ".2611")
+
+
+def test_exhausted_month_is_reported(tmp_path):
+    storage = storage_with_accounts(tmp_path, ["2610100000"])
+    allocator = AccountNumberAllocator(str(tmp_path / "User_details.sequence"), storage)
+    available = LAST_SUFFIX - FIRST_SUFFIX
+
+    with pytest.raises(AccountNumbersExhausted, match=f"Only {available} account numbers are left for 2610"):
+        allocator.reserve(available + 1, "2610")
+    assert len(allocator.reserve(available, "2610")) == available
+    with pytest.raises(AccountNumbersExhausted):
+        allocator.allocate("2610")
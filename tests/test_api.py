@@ -0,0 +1,40 @@
+import pytest
+from conftest import reopen
+
+from Banking_Api import DuplicateAccountError, TransactionRuleError
+
+
+def open_account(api, phone_number, account_number=None):
+    return api.create_account("Asha", "Rao", "1990-02-03", "Female", "Engineer", phone_number, "asha@mail.com", 5000,
+                              account_number=account_number)
+
+
+def test_phone_numbers_stay_unique(store, api):
+    account = open_account(api, "8000000001")
+
+    with pytest.raises(DuplicateAccountError, match="Phone Number already registered"):
+        open_account(api, "8000000001")
+    with pytest.raises(DuplicateAccountError):
+        api.edit_field(store.accounts[0], "PHONENUMBER", "8000000001")
+    assert api.edit_field(account.ACCOUNTNUMBER, "PHONENUMBER", "8000000001").PHONENUMBER == "8000000001"
+    assert reopen(store).get_account_number("8000000001") == account.ACCOUNTNUMBER
+
+
+def test_account_number_in_use_is_refused(store, api):
+    balance = api.get_balance(store.accounts[0])
+
+    with pytest.raises(DuplicateAccountError, match="already exists"):
+        open_account(api, "8000000002", account_number=store.accounts[0])
+    assert reopen(store).get_balance(store.accounts[0]) == balance
+
+
+def test_transactions_are_posted_to_the_ledger(store, api):
+    sender, receiver = store.accounts[1], store.accounts[2]
+    api.deposit(sender, 2000)
+    with pytest.raises(TransactionRuleError):
+        api.withdraw(sender, 10 ** 9)
+    api.transfer(sender, receiver, 1500)
+
+    entries = api.statement(sender)
+    assert [entry.type for entry in entries] == ["DEPOSIT", "TRANSFER_OUT"]
+    assert entries[-1].balance == reopen(store).get_balance(sender)
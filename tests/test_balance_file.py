@@ -0,0 +1,85 @@
+import csv
+import os
+
+from Banking_Balance_File import ACCOUNT, COPY, MAGIC, SLOT_SIZE, BalanceFile, export_csv
+from Banking_Benchmarks import generate_user_details
+from Banking_Storage import CSVStorage
+
+
+def build_balance_file(tmp_path, count=20, fsync=False):
+    csv_file = str(tmp_path / "User_details.csv")
+    accounts = [account_number for account_number, _ in generate_user_details(csv_file, count)]
+    balance_file = BalanceFile(str(tmp_path / "User_details.balances"), fsync=fsync)
+    balance_file.build(csv_file)
+    return csv_file, accounts, balance_file
+
+
+def test_balance_file_round_trip(tmp_path):
+    csv_file, accounts, balance_file = build_balance_file(tmp_path)
+    balance_file.set(accounts[0], 1234)
+    balance_file.set_many({accounts[1]: 2000, accounts[2]: 3000})
+    balance_file.add("2402100000", 4000)
+    balance_file.close()
+
+    reopened = BalanceFile(balance_file.balance_file)
+    assert [reopened.get(account) for account in accounts[:3]] == [1234, 2000, 3000]
+    assert reopened.get("2402100000") == 4000
+    assert dict(reopened.balances())[accounts[0]] == 1234
+    export_csv(csv_file, balance_file.balance_file, str(tmp_path / "export.csv"))
+    with open(tmp_path / "export.csv", "r", newline="") as read_csv:
+        assert {row["ACCOUNTNUMBER"]: int(row["AMOUNT"]) for row in csv.DictReader(read_csv)}[accounts[0]] == 1234
+
+
+def test_torn_write_falls_back_to_the_previous_balance(tmp_path):
+    _, accounts, balance_file = build_balance_file(tmp_path)
+    balance_file.set(accounts[0], 1111)
+    balance_file.set(accounts[0], 2222)
+    balance_file.close()
+
+    # Break the crc32 of the copy holding 2222, as a write cut short by a crash would.
+    with open(balance_file.balance_file, "r+b") as raw:
+        slot = raw.read(len(MAGIC) + SLOT_SIZE)[len(MAGIC):]
+        newest = next(ACCOUNT.size + position * COPY.size for position in (0, 1)
+                      if COPY.unpack_from(slot, ACCOUNT.size + position * COPY.size)[1] == 2222)
+        raw.seek(len(MAGIC) + newest + COPY.size - 4)
+        raw.write(bytes(4))
+    assert BalanceFile(balance_file.balance_file).get(accounts[0]) == 1111
+
+
+def test_pending_balances_are_applied_on_open(tmp_path):
+    _, accounts, balance_file = build_balance_file(tmp_path)
+    balance_file.close()
+    with open(balance_file.pending_file(), "w", newline="") as pending:
+        csv.writer(pending).writerows([(accounts[0], 5000), (accounts[1], 6000)])
+
+    reopened = BalanceFile(balance_file.balance_file)
+    assert (reopened.get(accounts[0]), reopened.get(accounts[1])) == (5000, 6000)
+    assert not os.path.exists(balance_file.pending_file())
+
+
+def test_set_many_syncs_the_slots_before_removing_the_pending_file(tmp_path, monkeypatch):
+    _, accounts, balance_file = build_balance_file(tmp_path, fsync=True)
+    balance_file.open()
+    events = []
+    fsync, remove = os.fsync, os.remove
+    monkeypatch.setattr(os, "fsync", lambda descriptor: (events.append(("fsync", descriptor)), fsync(descriptor)))
+    monkeypatch.setattr(os, "remove", lambda path: (events.append(("remove", path)), remove(path)))
+
+    # A batch over every account takes the path that writes the whole file back in one go.
+    balance_file.set_many({account: 7000 for account in accounts})
+    removed = events.index(("remove", balance_file.pending_file()))
+    assert ("fsync", balance_file.file.fileno()) in events[:removed]
+    assert [balance_file.get(account) for account in accounts] == [7000] * len(accounts)
+
+
+def test_storage_reopens_in_balance_file_mode(tmp_path):
+    csv_file = str(tmp_path / "User_details.csv")
+    account = generate_user_details(csv_file, 20)[0][0]
+    storage = CSVStorage(csv_file, balance_file=True)
+    storage.update_field(account, "AMOUNT", "8000")
+    storage.update_balances({account: 9000})
+
+    reopened = CSVStorage(csv_file)
+    assert reopened.balance_file is not None
+    assert reopened.get_balance(account) == 9000
+    assert reopened.get_account(account)["AMOUNT"] == "9000"
@@ -0,0 +1,63 @@
+import csv
+import os
+import shutil
+
+from Banking_Api import BankingApi
+from Banking_Benchmarks import generate_user_details
+from Banking_Storage import CSVStorage
+
+
+def stored_amount(csv_file, account_number):
+    with open(csv_file, "r", newline="") as read_csv:
+        for row in csv.DictReader(read_csv):
+            if row["ACCOUNTNUMBER"] == account_number:
+                return int(row["AMOUNT"])
+    return None
+
+
+def test_journal_round_trip(tmp_path):
+    csv_file = str(tmp_path / "User_details.csv")
+    (account, _), (other, _) = generate_user_details(csv_file, 20)[:2]
+    opening = stored_amount(csv_file, account)
+    api = BankingApi(CSVStorage(csv_file, journal_mode=True))
+    api.deposit(account, 700)
+    api.edit_field(account, "EMAIL", "new@mail.com")
+    api.transfer(account, other, 200)
+
+    # The CSV file is left alone, the changes are only in the journal.
+    assert stored_amount(csv_file, account) == opening
+    reopened = CSVStorage(csv_file)
+    assert reopened.balance_journal is not None
+    assert reopened.get_balance(account) == opening + 500
+    assert reopened.get_account(account)["EMAIL"] == "new@mail.com"
+    assert reopened.balance_column()[1][0] == opening + 500
+
+
+def test_compaction_folds_the_journal_into_the_csv_file(tmp_path):
+    csv_file = str(tmp_path / "User_details.csv")
+    account = generate_user_details(csv_file, 20)[0][0]
+    storage = CSVStorage(csv_file, journal_mode=True)
+    storage.balance_journal.compact_threshold = 1
+    BankingApi(storage).deposit(account, 700)
+
+    assert storage.balance_journal.size() == 0
+    assert stored_amount(csv_file, account) == storage.get_balance(account)
+    assert CSVStorage(csv_file).get_balance(account) == storage.get_balance(account)
+
+
+def test_journal_replayed_after_an_interrupted_compaction(tmp_path):
+    csv_file = str(tmp_path / "User_details.csv")
+    account = generate_user_details(csv_file, 20)[0][0]
+    storage = CSVStorage(csv_file, journal_mode=True)
+    api = BankingApi(storage)
+    api.deposit(account, 700)
+    api.deposit(account, 300)
+    balance = storage.get_balance(account)
+    journal_file = storage.balance_journal.journal_file
+    shutil.copyfile(journal_file, journal_file + ".copy")
+    storage.balance_journal.compact(storage.account_index)
+
+    # A crash after the CSV file was replaced but before the journal was emptied leaves both behind. Journal entries
+    # hold absolute values, so replaying them again gives the same balance.
+    os.replace(journal_file + ".copy", journal_file)
+    assert CSVStorage(csv_file).get_balance(account) == balance
@@ -0,0 +1,114 @@
+import csv
+
+import pytest
+from conftest import ledger_of, reopen
+
+from Banking_Bulk_Onboarding import BulkOnboarding
+from Banking_Bulk_Transactions import BulkTransactionProcessor, SettlementProcessor
+from Banking_Interest_Accrual import AccrualError, InterestAccrual
+
+# Every batch job runs on a store opened without options, after a terminal has changed a balance in the store's own
+# mode, the way a month-end job finds a live branch.
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as write_rows:
+        csv.writer(write_rows).writerows(rows)
+    return str(path)
+
+
+def read_rejects(path):
+    with open(path, "r", newline="") as read_rejects:
+        return list(csv.DictReader(read_rejects))
+
+
+def test_bulk_transactions_post_on_the_live_balance(store, api, tmp_path):
+    account, other = store.accounts[3], store.accounts[4]
+    live = api.deposit(account, 1000).balance
+    records = write_csv(tmp_path / "records.csv", [
+        ["ACCOUNTNUMBER", "TYPE", "AMOUNT"],
+        [account, "DEPOSIT", 20000],
+        [other, "WITHDRAW", 10 ** 9],
+        ["9999999999", "DEPOSIT", 500],
+    ])
+    processor = BulkTransactionProcessor(reopen(store))
+    accepted, rejected = processor.process(records, str(tmp_path / "rejects.csv"))
+    processor.ledger.close()
+
+    assert (accepted, rejected) == (1, 2)
+    assert reopen(store).get_balance(account) == live + 20000
+    assert ledger_of(store.storage).statement(account)[-1].balance == live + 20000
+    assert [reject["LINE"] for reject in read_rejects(tmp_path / "rejects.csv")] == ["3", "4"]
+
+
+def test_settlement_moves_both_balances(store, api, tmp_path):
+    sender, receiver = store.accounts[5], store.accounts[6]
+    api.deposit(sender, 5000)
+    sender_balance, receiver_balance = api.get_balance(sender), api.get_balance(receiver)
+    records = write_csv(tmp_path / "transfers.csv", [
+        ["FROM_ACCOUNT", "TO_ACCOUNT", "AMOUNT"],
+        [sender, receiver, 3000],
+        [sender, sender, 100],
+    ])
+    processor = SettlementProcessor(reopen(store))
+    assert processor.process(records, str(tmp_path / "rejects.csv")) == (1, 1)
+    processor.ledger.close()
+
+    reopened = reopen(store)
+    assert reopened.get_balance(sender) == sender_balance - 3000
+    assert reopened.get_balance(receiver) == receiver_balance + 3000
+    assert [entry.type for entry in ledger_of(store.storage).statement(receiver)][-1] == "TRANSFER_IN"
+
+
+def test_interest_accrual_credits_the_live_balances(store, api):
+    account = store.accounts[7]
+    api.deposit(account, 100000)
+    before = {account_number: api.get_balance(account_number) for account_number in store.accounts}
+    accrual = InterestAccrual(reopen(store), annual_rate=12)
+    summary = accrual.run("2026-09")
+    accrual.ledger.close()
+
+    reopened = reopen(store)
+    for account_number, balance in before.items():
+        assert reopened.get_balance(account_number) == balance + balance // 100
+    assert summary.credited == len(store.accounts)
+    entry = ledger_of(store.storage).statement(account)[-1]
+    assert (entry.type, entry.balance) == ("INTEREST", reopened.get_balance(account))
+    with pytest.raises(AccrualError, match="already been credited"):
+        InterestAccrual(reopen(store)).run("2026-09")
+
+
+def test_interrupted_interest_accrual_is_not_credited_again(store, api):
+    account = store.accounts[8]
+    balance = api.get_balance(account)
+    storage = reopen(store)
+
+    def crash(balances):
+        raise OSError("disk full")
+
+    storage.update_balances = crash
+    with pytest.raises(OSError):
+        InterestAccrual(storage).run("2026-10")
+    with pytest.raises(AccrualError, match="interrupted"):
+        InterestAccrual(reopen(store)).run("2026-10")
+    assert reopen(store).get_balance(account) == balance
+    assert [entry for entry in ledger_of(store.storage).statement(account) if entry.type == "INTEREST"] == []
+
+
+def test_bulk_onboarding_rejects_registered_phone_numbers(store, api, tmp_path):
+    api.deposit(store.accounts[0], 500)
+    header = ["FIRSTNAME", "LASTNAME", "DATE_OF_BIRTH", "GENDER", "PROFESSION", "PHONENUMBER", "EMAIL", "AMOUNT"]
+    customers = write_csv(tmp_path / "customers.csv", [
+        header,
+        ["Asha", "Rao", "1990-02-03", "Female", "Engineer", "8000000001", "asha@mail.com", 5000],
+        ["Ravi", "Rao", "1991-02-03", "Male", "Engineer", "8000000001", "ravi@mail.com", 5000],
+        ["Old", "Customer", "1980-02-03", "Male", "Teacher", "9000000000", "old@mail.com", 5000],
+    ])
+    onboarding = BulkOnboarding(reopen(store), workers=1)
+    assert onboarding.process(customers, str(tmp_path / "rejects.csv")) == (1, 2)
+    onboarding.ledger.close()
+
+    reopened = reopen(store)
+    account_number = reopened.get_account_number("8000000001")
+    assert reopened.get_balance(account_number) == 5000
+    assert {reject["REASON"] for reject in read_rejects(tmp_path / "rejects.csv")} == {"Phone Number already registered"}
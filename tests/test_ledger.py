@@ -0,0 +1,76 @@
+import os
+from datetime import date, datetime, timedelta
+
+from Banking_Ledger import RECORD, Ledger, Posting
+
+
+def append_deposits(ledger, count, accounts=("2610100000", "2610100001")):
+    for number in range(count):
+        account_number = accounts[number % len(accounts)]
+        moment = datetime(2026, 10, 1) + timedelta(hours=12 * number)
+        ledger.append([Posting(account_number, "DEPOSIT", 100, 1000 + number)], moment)
+
+
+def test_statement_follows_the_account_chain(tmp_path):
+    ledger = Ledger(str(tmp_path / "User_details.ledger"))
+    append_deposits(ledger, 56)
+    entries = ledger.statement("2610100000", date(2026, 10, 3), date(2026, 10, 5))
+
+    # Account 2610100000 gets the postings made at midnight, one a day.
+    assert [entry.timestamp.day for entry in entries] == [3, 4, 5]
+    assert [entry.balance for entry in entries] == [1004, 1006, 1008]
+    assert {entry.type for entry in entries} == {"DEPOSIT"}
+    assert ledger.statement("2610100009") == []
+
+
+def test_heads_are_checkpointed_on_close(tmp_path):
+    ledger_file = str(tmp_path / "User_details.ledger")
+    ledger = Ledger(ledger_file)
+    append_deposits(ledger, 10)
+    expected = ledger.statement("2610100001")
+    ledger.close()
+
+    assert os.path.exists(ledger_file + ".heads")
+    reopened = Ledger(ledger_file)
+    reopened.open()
+    assert reopened.scanned_size == reopened.checkpoint_size == os.path.getsize(ledger_file)
+    assert reopened.statement("2610100001") == expected
+
+
+def test_processes_that_never_close_leave_a_bounded_tail(tmp_path):
+    ledger_file = str(tmp_path / "User_details.ledger")
+    for _ in range(6):
+        ledger = Ledger(ledger_file, checkpoint_interval=20)
+        append_deposits(ledger, 15)
+        ledger.file.close()  # The process ends without `close()`.
+
+    fresh = Ledger(ledger_file, checkpoint_interval=20)
+    fresh.open()
+    assert (os.path.getsize(ledger_file) - fresh.checkpoint_size) // RECORD.size < 2 * 20
+    assert len(fresh.statement("2610100000")) == 6 * 8
+
+
+def test_heads_are_rebuilt_without_a_checkpoint(tmp_path):
+    ledger_file = str(tmp_path / "User_details.ledger")
+    ledger = Ledger(ledger_file)
+    append_deposits(ledger, 10)
+    expected = ledger.statement("2610100000")
+    ledger.close()
+    os.remove(ledger_file + ".heads")
+
+    assert Ledger(ledger_file).statement("2610100000") == expected
+
+
+def test_record_cut_short_is_left_out_and_overwritten(tmp_path):
+    ledger_file = str(tmp_path / "User_details.ledger")
+    ledger = Ledger(ledger_file)
+    append_deposits(ledger, 4)
+    ledger.close()
+    with open(ledger_file, "ab") as torn:
+        torn.write(b"\x01" * (RECORD.size // 2))
+
+    reopened = Ledger(ledger_file)
+    assert len(reopened.statement("2610100000")) == 2
+    reopened.append([Posting("2610100000", "WITHDRAW", 100, 900)])
+    assert [entry.type for entry in reopened.statement("2610100000")] == ["DEPOSIT", "DEPOSIT", "WITHDRAW"]
+    assert (os.path.getsize(ledger_file) - len(b"BANKING-LEDGER1\n")) % RECORD.size == 0